@@ -229,8 +229,11 @@ class CeilAIEngine:
             
         return "\n".join(clean_lines)
 
-    def generate_instructions(self, prompt, project_path, history=None, log_callback=None):
-        """Mission 4: Core reasoning and instruction generation with robust error handling and retry logic."""
+    def generate_instructions(self, prompt, project_path, history=None, log_callback=None, chunk_callback=None,
+                              history_summary=None):
+        """Mission 4: Core reasoning and instruction generation with robust error handling and retry logic.
+        If chunk_callback is given the response is streamed and each text chunk is passed to it as it arrives.
+        history_summary stands in for older messages left out of history (see ChatManager.get_context)."""
         full_context = self.build_full_context(project_path)
         
         # PROACTIVE FIGMA INJECTION:
@@ -256,6 +259,14 @@ class CeilAIEngine:
                     if log_callback: log_callback(f"Figma Fetch Failed: {error_msg}", "ERROR")
                     full_context += f"\nFIGMA FETCH ERROR: {error_msg}\n"
         
+        # The summary goes into the system instruction: as a history turn it would read as
+        # something the user said (and could sit next to another user turn)
+        system_instruction = self.system_instruction
+        if history_summary:
+            system_instruction += f"\n\nEARLIER CONVERSATION (summarized, for context only):\n{history_summary}"
+            header = history_summary.split("\n", 1)[0].rstrip(":")
+            if log_callback: log_callback(f"History: {header} sent as context.", "SYSTEM")
+
         # Convert history for Gemini format if provided
         gemini_history = []
         if history:
@@ -273,7 +284,7 @@ class CeilAIEngine:
             try:
                 model = genai.GenerativeModel(
                     model_name="gemini-2.5-pro", 
-                    system_instruction=self.system_instruction,
+                    system_instruction=system_instruction,
                     generation_config={
                         "temperature": 0.2,
                         "top_p": 0.95,
@@ -290,7 +301,13 @@ class CeilAIEngine:
                 
                 chat = model.start_chat(history=gemini_history)
                 full_query = f"{full_context}\n\nUSER PROMPT: {prompt}"
-                response = chat.send_message(full_query)
+                if chunk_callback:
+                    response = chat.send_message(full_query, stream=True)
+                    for chunk in response:
+                        if chunk.parts:
+                            chunk_callback(chunk.text)
+                else:
+                    response = chat.send_message(full_query)
                 
                 if not response or not response.text:
                     raise Exception("Empty response from AI")
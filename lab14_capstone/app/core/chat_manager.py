@@ -1,41 +1,282 @@
 import os
+import re
 import json
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from app.core import tracing
+from app.core.chat_store import ChatStore
+
+def write_json(path, data):
+    """Atomic JSON write: a crash leaves either the old or the new file, never half of one."""
+    fd, tmp = tempfile.mkstemp(prefix=".chat-", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class ChatManager(ChatStore):
+    """Chats stored under .marvelcode/chats/.
+
+    index.json holds the chat names and the active chat. Each chat has an append-only
+    log (<file>.jsonl, one {"seq", "sender", "message"} record per message) and, once
+    the log reaches COMPACT_EVERY records, a snapshot (<file>.json) the log is folded
+    into. Histories are loaded on first use and at most MAX_LOADED stay in memory.
+
+    add_message only updates memory: a writer thread appends the records, one write per
+    chat for each burst. flush() waits for them (sync=True also fsyncs), close() stops it.
+    """
+    COMPACT_EVERY = 500
 
-class ChatManager:
     def __init__(self, project_path):
+        super().__init__() # loaded: chat_id -> [history, last seq, records in the log]
         self.project_path = project_path
-        self.storage_path = os.path.join(project_path, ".marvelcode", "chats.json")
+        self.storage_dir = os.path.join(project_path, ".marvelcode", "chats")
+        self.storage_path = os.path.join(self.storage_dir, "index.json")
+        self.legacy_path = os.path.join(project_path, ".marvelcode", "chats.json") # Before the journal
+        self.queue = queue.Queue() # ("record", file, entry, record) / ("flush", event, sync) / ("stop",)
+        self.writer = None # Started by the first add_message
+        self.write_error = None # Raised by the next flush()
+        self.counters = {"flushes": 0, "records": 0, "max_queue_depth": 0,
+                         "flush_ms_total": 0.0, "flush_ms_max": 0.0, "last_flush_ms": 0.0}
+        self.counters_lock = threading.Lock()
         self.ensure_storage()
         self.chats = self.load_chats()
 
+    def default_index(self):
+        return {"active_chat_id": "default", "chats": {"default": {"name": "Default Chat", "file": "default"}}}
+
     def ensure_storage(self):
-        os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-        if not os.path.exists(self.storage_path):
-            with open(self.storage_path, "w") as f:
-                json.dump({"active_chat_id": "default", "chats": {"default": {"name": "Default Chat", "history": []}}}, f)
+        os.makedirs(self.storage_dir, exist_ok=True)
+        if os.path.exists(self.storage_path):
+            return
+        if os.path.exists(self.legacy_path):
+            self.migrate()
+        else:
+            write_json(self.storage_path, self.default_index())
+
+    def migrate(self):
+        """Moves chats.json into the journal (one snapshot per chat) and keeps the old
+        file as chats.json.migrated."""
+        try:
+            with open(self.legacy_path, "r") as f:
+                legacy = json.load(f)
+            chats = legacy["chats"]
+        except:
+            write_json(self.storage_path, self.default_index())
+            return
+        index = {"active_chat_id": legacy.get("active_chat_id", "default"), "chats": {}}
+        for chat_id, chat in chats.items():
+            file = self.new_file_name(chat_id, index)
+            index["chats"][chat_id] = {"name": chat.get("name", chat_id), "file": file}
+            history = chat.get("history", [])
+            write_json(self.chat_path(file, ".json"), {"seq": len(history), "history": history})
+        # The index goes last: until it exists, the next start migrates again
+        write_json(self.storage_path, index)
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
 
     def load_chats(self):
         try:
             with open(self.storage_path, "r") as f:
                 return json.load(f)
         except:
-            return {"active_chat_id": "default", "chats": {"default": {"name": "Default Chat", "history": []}}}
+            return self.default_index()
 
     def save_chats(self):
-        with open(self.storage_path, "w") as f:
-            json.dump(self.chats, f, indent=4)
+        """Writes the index (names and active chat); messages are saved as they arrive."""
+        write_json(self.storage_path, self.chats)
+
+    def chat_path(self, file, ext):
+        return os.path.join(self.storage_dir, file + ext)
+
+    def new_file_name(self, chat_id, index=None):
+        index = index or self.chats
+        base = re.sub(r'[^A-Za-z0-9_-]', '_', chat_id)[:64] or "chat"
+        taken = {c.get("file") for c in index["chats"].values()}
+        file, n = base, 1
+        while file in taken or os.path.exists(self.chat_path(file, ".jsonl")) or os.path.exists(self.chat_path(file, ".json")):
+            n += 1
+            file = f"{base}_{n}"
+        return file
+
+    def file_of(self, chat_id):
+        chat = self.chats["chats"][chat_id]
+        if "file" not in chat: # Index entry added by hand
+            chat["file"] = self.new_file_name(chat_id)
+            self.save_chats()
+        return chat["file"]
+
+    def read_history(self, chat_id):
+        """[history, last seq, log records] for chat_id: the snapshot plus the log after it."""
+        if self.queue.unfinished_tasks:
+            self.flush() # It may hold records of this chat from before it was evicted
+        file = self.file_of(chat_id)
+        history, seq, records = [], 0, 0
+        try:
+            with open(self.chat_path(file, ".json"), "r") as f:
+                snapshot = json.load(f)
+            history, seq = snapshot["history"], snapshot["seq"]
+        except (OSError, ValueError, KeyError):
+            pass
+        try:
+            with open(self.chat_path(file, ".jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # Torn last line of a crashed write
+                    records += 1
+                    if record["seq"] > seq: # Older ones are already in the snapshot
+                        history.append({"sender": record["sender"], "message": record["message"]})
+                        seq = record["seq"]
+        except OSError:
+            pass
+        return [history, seq, records]
+
+    def append_lines(self, file, lines):
+        data = "".join(lines)
+        with open(self.chat_path(file, ".jsonl"), "ab+") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = "\n" + data # Start after a torn line instead of extending it
+            f.write(data.encode("utf-8"))
+
+    def write_snapshot(self, file, entry, seq):
+        """Folds the log into the snapshot (the first seq messages) and empties the log."""
+        write_json(self.chat_path(file, ".json"), {"seq": seq, "history": entry[0][:seq]})
+        # A crash before this truncate is harmless: records up to seq are skipped on load
+        open(self.chat_path(file, ".jsonl"), "w").close()
+        entry[2] = 0
+
+    def compact(self, chat_id):
+        with self.lock:
+            self.flush()
+            entry = self.load_history(chat_id)
+            self.write_snapshot(self.file_of(chat_id), entry, entry[1])
+
+    def enqueue(self, item):
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write_loop, name="chat-writer", daemon=True)
+            self.writer.start()
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        with self.counters_lock:
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], depth)
+
+    def write_loop(self):
+        unsynced = set() # Files written since the last fsync
+        while True:
+            batch = [self.queue.get()]
+            while True: # Coalesce whatever else is already waiting
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                stop = self.write_batch(batch, unsynced)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def write_batch(self, batch, unsynced):
+        groups = OrderedDict() # file -> [entry, lines, last seq]
+        flushes = []
+        stop = False
+        for item in batch:
+            if item[0] == "record":
+                _, file, entry, record = item
+                group = groups.setdefault(file, [entry, [], 0])
+                group[1].append(json.dumps(record) + "\n")
+                group[2] = record["seq"]
+            elif item[0] == "flush":
+                flushes.append(item)
+            else:
+                stop = True
+        try:
+            if groups:
+                start = time.perf_counter()
+                records = sum(len(g[1]) for g in groups.values())
+                with tracing.span("chat flush", cat="io", records=records, chats=len(groups)):
+                    for file, (entry, lines, seq) in groups.items():
+                        self.append_lines(file, lines)
+                        unsynced.add(file)
+                        entry[2] += len(lines)
+                        if entry[2] >= self.COMPACT_EVERY:
+                            self.write_snapshot(file, entry, seq)
+                elapsed = (time.perf_counter() - start) * 1000
+                with self.counters_lock:
+                    c = self.counters
+                    c["flushes"] += 1
+                    c["records"] += records
+                    c["flush_ms_total"] += elapsed
+                    c["flush_ms_max"] = max(c["flush_ms_max"], elapsed)
+                    c["last_flush_ms"] = elapsed
+            if any(sync for _, _, sync in flushes):
+                for file in unsynced:
+                    path = self.chat_path(file, ".jsonl")
+                    if os.path.exists(path):
+                        with open(path, "ab") as f:
+                            os.fsync(f.fileno())
+                unsynced.clear()
+        except Exception as e: # The writer must survive to release flush() waiters
+            self.write_error = e
+        for _, event, _ in flushes:
+            event.set()
+        return stop
+
+    def flush(self, sync=False):
+        """Blocks until every queued message is written; sync=True also fsyncs them."""
+        if self.writer is not None:
+            event = threading.Event()
+            self.queue.put(("flush", event, sync))
+            event.wait()
+        if self.write_error is not None:
+            error, self.write_error = self.write_error, None
+            raise Exception(f"Chat history could not be saved: {error}")
+
+    def close(self):
+        """Writes (and fsyncs) what is queued and stops the writer thread."""
+        if self.writer is None:
+            return
+        try:
+            self.flush(sync=True)
+        finally:
+            self.queue.put(("stop",))
+            self.writer.join()
+            self.writer = None
+
+    def stats(self):
+        """Writer instrumentation: current and peak queue depth, flush count and latency."""
+        with self.counters_lock:
+            c = dict(self.counters)
+        c["queue_depth"] = self.queue.qsize()
+        c["avg_flush_ms"] = c["flush_ms_total"] / c["flushes"] if c["flushes"] else 0.0
+        return c
 
     def add_chat(self, chat_id, name):
-        self.chats["chats"][chat_id] = {"name": name, "history": []}
+        if chat_id in self.chats["chats"]:
+            self.flush() # Queued records must not land in the files deleted below
+            self.delete_files(chat_id)
+        self.forget(chat_id)
+        self.chats["chats"][chat_id] = {"name": name, "file": self.new_file_name(chat_id)}
         self.save_chats()
 
     def add_message(self, chat_id, sender, message):
         if chat_id in self.chats["chats"]:
-            self.chats["chats"][chat_id]["history"].append({"sender": sender, "message": message})
-            self.save_chats()
-
-    def get_history(self, chat_id):
-        return self.chats["chats"].get(chat_id, {}).get("history", [])
+            with self.lock: # One seq per message whichever thread adds it
+                entry = self.load_history(chat_id)
+                entry[1] += 1
+                entry[0].append({"sender": sender, "message": message})
+                record = {"seq": entry[1], "sender": sender, "message": message}
+                self.enqueue(("record", self.file_of(chat_id), entry, record))
 
     def rename_chat(self, chat_id, new_name):
         if chat_id in self.chats["chats"]:
@@ -44,7 +285,16 @@ class ChatManager:
 
     def delete_chat(self, chat_id):
         if chat_id in self.chats["chats"] and len(self.chats["chats"]) > 1:
+            self.flush()
+            self.delete_files(chat_id)
+            self.forget(chat_id)
             del self.chats["chats"][chat_id]
             if self.chats["active_chat_id"] == chat_id:
                 self.chats["active_chat_id"] = list(self.chats["chats"].keys())[0]
             self.save_chats()
+
+    def delete_files(self, chat_id):
+        file = self.chats["chats"][chat_id].get("file")
+        for ext in (".json", ".jsonl"):
+            if file and os.path.exists(self.chat_path(file, ext)):
+                os.remove(self.chat_path(file, ext))
@@ -0,0 +1,69 @@
+import abc
+import threading
+from collections import OrderedDict
+from app.core.history_window import HistoryWindow, DEFAULT_BUDGET
+
+class ChatStore(abc.ABC):
+    """What ChatManager and SqliteChatManager share: the loaded histories (at most
+    MAX_LOADED stay in memory, least recently used first out), paging and get_context.
+
+    Subclasses set self.chats and implement read_history(chat_id), which returns the
+    cache entry for a chat (a list whose first item is the history); read_page may
+    answer get_page for a chat that is not loaded.
+    """
+    MAX_LOADED = 8
+
+    def __init__(self):
+        self.loaded = OrderedDict() # chat_id -> entry from read_history
+        self.lock = threading.RLock() # loaded and its entries: the AI thread reads histories too
+        self.window = HistoryWindow() # Cached token estimates and summaries for get_context
+
+    @abc.abstractmethod
+    def read_history(self, chat_id):
+        """The cache entry for chat_id: a list whose first item is the history."""
+
+    def read_page(self, chat_id, limit, before):
+        """get_page result read from storage, or None to load the whole history."""
+        return None
+
+    def load_history(self, chat_id):
+        with self.lock:
+            entry = self.loaded.get(chat_id)
+            if entry is not None:
+                self.loaded.move_to_end(chat_id)
+                return entry
+            entry = self.loaded[chat_id] = self.read_history(chat_id)
+            while len(self.loaded) > self.MAX_LOADED:
+                self.loaded.popitem(last=False)
+            return entry
+
+    def forget(self, chat_id):
+        """Drops a replaced or deleted chat from memory."""
+        with self.lock:
+            self.loaded.pop(chat_id, None)
+        self.window.forget(chat_id)
+
+    def get_history(self, chat_id):
+        if chat_id not in self.chats["chats"]:
+            return []
+        return self.load_history(chat_id)[0]
+
+    def get_page(self, chat_id, limit=50, before=None):
+        """(first_seq, messages): up to limit messages, oldest first, ending just before
+        seq `before` (the newest ones if None). Seqs count from 1, so pass first_seq as
+        `before` for the previous page; first_seq 1 means the start of the chat."""
+        if chat_id not in self.chats["chats"]:
+            return 1, []
+        with self.lock:
+            if chat_id not in self.loaded:
+                page = self.read_page(chat_id, limit, before)
+                if page is not None:
+                    return page
+            history = self.load_history(chat_id)[0]
+        end = len(history) if before is None else max(0, min(before - 1, len(history)))
+        start = max(0, end - limit)
+        return start + 1, history[start:end]
+
+    def get_context(self, chat_id, budget=DEFAULT_BUDGET):
+        """(summary or None, newest messages) fitting ~budget tokens (see HistoryWindow)."""
+        return self.window.select(chat_id, self.get_history(chat_id), budget)
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from app.core import tracing
+from collections import OrderedDict
+
+class ProgramCache:
+    """LRU cache of lexed and parsed CEIL programs.
+
+    Entries are keyed by a SHA-256 of the CEIL text, so a hit skips CeilLexer and
+    CeilParser. The audit is never cached: its verdict depends on the role, the policy
+    settings and the symlinks on disk, any of which may change between two runs of the
+    same text, so compile() runs SecurityEngine.audit_ast on every call. The cache is
+    bounded both by entry count and by the total size of the cached CEIL texts (the
+    AST keeps spans into them).
+    """
+    def __init__(self, max_entries=32, max_chars=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.entries = OrderedDict() # key -> (ast, len(ceil))
+        self.total_chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(ceil):
+        return hashlib.sha256(ceil.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def get(self, ceil):
+        key = self.key(ceil)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            # A fresh list so callers can't reorder the cached program
+            return list(entry[0])
+
+    def put(self, ceil, ast):
+        if len(ceil) > self.max_chars:
+            return
+        key = self.key(ceil)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_chars -= old[1]
+            self.entries[key] = (list(ast), len(ceil))
+            self.total_chars += len(ceil)
+            while len(self.entries) > self.max_entries or self.total_chars > self.max_chars:
+                _, (_, size) = self.entries.popitem(last=False)
+                self.total_chars -= size
+
+    def compile(self, ceil, role, lexer, parser, sec):
+        """Returns the audited AST for ceil, lexing and parsing only on a miss.
+        The audit runs every time; security failures raise as usual."""
+        ast = self.get(ceil)
+        if ast is None:
+            with tracing.span("lex", chars=len(ceil)):
+                tokens = lexer.tokenize(ceil)
+            with tracing.span("parse", tokens=len(tokens)):
+                ast = parser.set_tokens(tokens).parse()
+            self.put(ceil, ast)
+        with tracing.span("audit", commands=len(ast)):
+            return sec.audit_ast(ast, role)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_chars = 0
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "chars": self.total_chars,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
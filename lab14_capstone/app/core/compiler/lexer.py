@@ -1,45 +1,140 @@
 import re
 from .tokens import Token, TokenType
 
+# Rule order matters: the first rule that matches at a position wins,
+# exactly like the original rule-by-rule scan (so 'CREATED' is CREATE + WORD 'D').
+RULES = [
+    ('CREATE', r'CREATE'),
+    ('PATCH', r'PATCH'),
+    ('DELETE', r'DELETE'),
+    ('RUN', r'RUN'),
+    ('FETCH_FIGMA', r'FETCH_FIGMA'),
+    ('SEARCH', r'SEARCH'),
+    ('REPLACE', r'REPLACE'),
+    # Only the opener is matched here, tokenize() jumps to the closing '>>>' with str.find
+    ('BLOCK', r'<<<'),
+    # Value groups capture the payload only, so no quote stripping is needed
+    ('DQ_STRING', r'"(?P<DQ_STRING>[^"]*)"'),
+    ('SQ_STRING', r"'(?P<SQ_STRING>[^']*)'"),
+    ('WORD', r'[a-zA-Z0-9_\./\\-]+'),
+    # Whitespace is skipped, any other unknown character is skipped one at a time
+    ('SKIP', r'\s+|[\s\S]'),
+]
+
+def _compile_master(rules):
+    parts = []
+    for name, pattern in rules:
+        # Rules with a payload group already name themselves, the rest get wrapped
+        parts.append(pattern if f'(?P<{name}>' in pattern else f'(?P<{name}>{pattern})')
+    return re.compile('|'.join(parts))
+
+# Compiled once per process and shared by every CeilLexer instance
+MASTER_PATTERN = _compile_master(RULES)
+
+GROUP_TYPES = {
+    'CREATE': TokenType.CREATE,
+    'PATCH': TokenType.PATCH,
+    'DELETE': TokenType.DELETE,
+    'RUN': TokenType.RUN,
+    'FETCH_FIGMA': TokenType.FETCH_FIGMA,
+    'SEARCH': TokenType.SEARCH,
+    'REPLACE': TokenType.REPLACE,
+    'BLOCK': TokenType.BLOCK,
+    'DQ_STRING': TokenType.STRING,
+    'SQ_STRING': TokenType.STRING,
+    'WORD': TokenType.WORD,
+}
+
 class CeilLexer:
     def __init__(self):
-        self.rules = [
-            (TokenType.CREATE, r'CREATE'),
-            (TokenType.PATCH, r'PATCH'),
-            (TokenType.DELETE, r'DELETE'),
-            (TokenType.RUN, r'RUN'),
-            (TokenType.FETCH_FIGMA, r'FETCH_FIGMA'),
-            (TokenType.SEARCH, r'SEARCH'),
-            (TokenType.REPLACE, r'REPLACE'),
-            (TokenType.BLOCK, r'<<<[\s\S]*?>>>'),
-            (TokenType.STRING, r'"[^"]*"'),
-            (TokenType.STRING, r"'[^']*'"),
-            (TokenType.WORD, r'[a-zA-Z0-9_\./\\-]+'),
-        ]
+        self.pattern = MASTER_PATTERN
+        # Streaming mode: text not turned into tokens yet. While an open '<<<' waits
+        # for its '>>>', chunks are only collected and joined once the closer arrives.
+        self.buffer = ""
+        self.pending = []
+        self.tail = ""
+        self.consumed = 0 # Characters already dropped from the front of the buffer
 
     def tokenize(self, code):
+        tokens, _ = self.scan(code)
+        tokens.append(Token(TokenType.EOF, None))
+        return tokens
+
+    def scan(self, code, final=True, offset=0):
+        """Scans code and returns (tokens, end). With final=False the scan stops at the
+        first token that more input could still change (an open block or string, a
+        word touching the end of the text) and end is where it stopped.
+        offset is the position of code[0] in the whole CEIL text."""
         tokens = []
+        append = tokens.append
+        match_at = self.pattern.match
         pos = 0
-        while pos < len(code):
-            match = None
-            if code[pos].isspace():
-                pos += 1
+        length = len(code)
+        unclosed = False # Once no '>>>' is left, every later '<<<' is unterminated too
+        while pos < length:
+            # SKIP matches any character, so there is always a match
+            match = match_at(code, pos)
+            kind = match.lastgroup
+            if kind == 'BLOCK':
+                close = -1 if unclosed else code.find('>>>', match.end())
+                if close == -1:
+                    if not final:
+                        break # The closing '>>>' may still arrive
+                    unclosed = True
+                    pos += 1 # Unterminated block: skip the '<' like any unknown char
+                    continue
+                append(Token.from_span(TokenType.BLOCK, code, match.end(), close, offset))
+                pos = close + 3
                 continue
-            for type, pattern in self.rules:
-                regex = re.compile(pattern)
-                match = regex.match(code, pos)
-                if match:
-                    val = match.group(0)
-                    if type in [TokenType.BLOCK, TokenType.STRING]:
-                        # Strip quotes or <<< >>>
-                        if type == TokenType.BLOCK:
-                            val = val[3:-3]
-                        else:
-                            val = val[1:-1]
-                    tokens.append(Token(type, val))
-                    pos = match.end()
+            if kind == 'SKIP':
+                if not final and self._may_grow(code, pos):
                     break
-            if not match:
-                pos += 1 # Skip unknown
+                pos = match.end()
+                continue
+            if not final and match.end() == length:
+                break # A keyword, word or string touching the end may still grow
+            start, end = match.span(kind)
+            append(Token.from_span(GROUP_TYPES[kind], code, start, end, offset))
+            pos = match.end()
+        return tokens, pos
+
+    @staticmethod
+    def _may_grow(code, pos):
+        char = code[pos]
+        if char in "\"'":
+            return True # Unmatched quote: the closing one may still arrive
+        # A trailing '<' or '<<' may become a block opener
+        return char == '<' and '<<<'.startswith(code[pos:pos + 3]) and pos + 3 > len(code)
+
+    # --- STREAMING MODE ---
+    def feed(self, chunk):
+        """Push-based mode: buffers chunk and returns the tokens that are now complete."""
+        if self.pending:
+            self.pending.append(chunk)
+            window = self.tail + chunk
+            self.tail = window[-2:]
+            if '>>>' not in window:
+                return []
+            self.buffer = "".join(self.pending)
+            self.pending = []
+        else:
+            self.buffer += chunk
+        tokens, end = self.scan(self.buffer, final=False, offset=self.consumed)
+        self.consumed += end
+        self.buffer = self.buffer[end:]
+        if self.buffer.startswith('<<<'):
+            # Stopped on a block with no '>>>' anywhere after it yet
+            self.pending = [self.buffer]
+            self.tail = self.buffer[-2:]
+            self.buffer = ""
+        return tokens
+
+    def close(self):
+        """Ends the stream: flushes the buffered tail and appends EOF."""
+        tokens, _ = self.scan(self.buffer + "".join(self.pending), offset=self.consumed)
         tokens.append(Token(TokenType.EOF, None))
+        self.buffer = ""
+        self.pending = []
+        self.tail = ""
+        self.consumed = 0
         return tokens
@@ -0,0 +1,90 @@
+class Command:
+    """Base class of the typed CEIL AST.
+    start/end are character offsets of the command in the CEIL text it was parsed from."""
+    __slots__ = ('start', 'end')
+    type = None
+    fields = ()
+
+    @property
+    def target(self):
+        """The file (or URL for FETCH_FIGMA) the command acts on."""
+        return getattr(self, self.fields[0])
+
+    def to_dict(self):
+        """Compatibility view matching the dicts the parser used to return (plain str values)."""
+        d = {'type': self.type}
+        for name in self.fields:
+            value = getattr(self, name)
+            d[name] = value if isinstance(value, str) else str(value)
+        return d
+
+    def __eq__(self, other):
+        if not isinstance(other, Command):
+            return NotImplemented
+        return self.type == other.type and all(getattr(self, n) == getattr(other, n) for n in self.fields)
+
+    __hash__ = None
+
+    def __repr__(self):
+        args = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.fields)
+        return f"{self.__class__.__name__}({args})"
+
+class CreateCmd(Command):
+    __slots__ = ('file', 'content')
+    type = 'CREATE'
+    fields = ('file', 'content')
+
+    def __init__(self, file, content, start=None, end=None):
+        self.file = file
+        self.content = content
+        self.start = start
+        self.end = end
+
+class PatchCmd(Command):
+    __slots__ = ('file', 'search', 'replace')
+    type = 'PATCH'
+    fields = ('file', 'search', 'replace')
+
+    def __init__(self, file, search, replace, start=None, end=None):
+        self.file = file
+        self.search = search
+        self.replace = replace
+        self.start = start
+        self.end = end
+
+class DeleteCmd(Command):
+    __slots__ = ('file',)
+    type = 'DELETE'
+    fields = ('file',)
+
+    def __init__(self, file, start=None, end=None):
+        self.file = file
+        self.start = start
+        self.end = end
+
+class RunCmd(Command):
+    __slots__ = ('file',)
+    type = 'RUN'
+    fields = ('file',)
+
+    def __init__(self, file, start=None, end=None):
+        self.file = file
+        self.start = start
+        self.end = end
+
+class FetchFigmaCmd(Command):
+    __slots__ = ('url',)
+    type = 'FETCH_FIGMA'
+    fields = ('url',)
+
+    def __init__(self, url, start=None, end=None):
+        self.url = url
+        self.start = start
+        self.end = end
+
+NODE_TYPES = {cls.type: cls for cls in (CreateCmd, PatchCmd, DeleteCmd, RunCmd, FetchFigmaCmd)}
+
+def from_dict(d):
+    """Builds a typed node from a legacy command dict."""
+    cls = NODE_TYPES[d['type']]
+    return cls(*(d[name] for name in cls.fields))
@@ -1,17 +1,36 @@
-from .tokens import TokenType
+from .tokens import Token, TokenType
+from .nodes import CreateCmd, PatchCmd, DeleteCmd, RunCmd, FetchFigmaCmd
+
+class NeedMoreTokens(Exception):
+    """Raised in streaming mode when a command is not complete yet."""
+
+# Closing delimiter length per token type, used for the end position of a command
+_CLOSER_LEN = {TokenType.BLOCK: 3, TokenType.STRING: 1}
 
 class CeilParser:
     def __init__(self):
         self.tokens = []
         self.pos = 0
+        self.streaming = False
+        # Dispatch table: verb token -> method building the typed node
+        self.handlers = {
+            TokenType.CREATE: self.parse_create,
+            TokenType.PATCH: self.parse_patch,
+            TokenType.DELETE: self.parse_delete,
+            TokenType.RUN: self.parse_run,
+            TokenType.FETCH_FIGMA: self.parse_fetch_figma,
+        }
 
     def set_tokens(self, tokens):
         self.tokens = tokens
         self.pos = 0
+        self.streaming = False
         return self
 
     def consume(self, expected_type=None):
         if self.pos >= len(self.tokens):
+            if self.streaming:
+                raise NeedMoreTokens()
             raise Exception("Unexpected EOF")
         token = self.tokens[self.pos]
         if expected_type and token.type != expected_type:
@@ -20,36 +39,88 @@ class CeilParser:
         return token
 
     def consume_string_or_word(self):
+        if self.streaming and self.pos >= len(self.tokens):
+            raise NeedMoreTokens()
         token = self.tokens[self.pos]
         if token.type not in [TokenType.STRING, TokenType.WORD]:
             raise Exception(f"Expected STRING or WORD, got {token.type}")
         self.pos += 1
         return token
 
+    def end_of(self, token):
+        """Position just after token, including its closing '>>>' or quote."""
+        return token.offset + token.end + _CLOSER_LEN.get(token.type, 0)
+
+    # --- COMMAND HANDLERS (called with the verb already consumed) ---
+    def parse_create(self, verb):
+        file = self.consume_string_or_word()
+        # Large block payloads stay as spans into the CEIL text until the executor writes them
+        content = self.consume(TokenType.BLOCK)
+        return CreateCmd(file.value, content.payload(), verb.offset + verb.start, content.offset + content.end + 3)
+
+    def parse_patch(self, verb):
+        file = self.consume_string_or_word()
+        self.consume(TokenType.SEARCH)
+        search = self.consume(TokenType.BLOCK)
+        self.consume(TokenType.REPLACE)
+        replace = self.consume(TokenType.BLOCK)
+        return PatchCmd(file.value, search.payload(), replace.payload(),
+                        verb.offset + verb.start, replace.offset + replace.end + 3)
+
+    def parse_delete(self, verb):
+        file = self.consume_string_or_word()
+        return DeleteCmd(file.value, verb.offset + verb.start, self.end_of(file))
+
+    def parse_run(self, verb):
+        file = self.consume_string_or_word()
+        return RunCmd(file.value, verb.offset + verb.start, self.end_of(file))
+
+    def parse_fetch_figma(self, verb):
+        url = self.consume_string_or_word()
+        return FetchFigmaCmd(url.value, verb.offset + verb.start, self.end_of(url))
+
+    def parse_command(self):
+        """Parses the command at the current position, returns None for skipped tokens."""
+        token = self.tokens[self.pos]
+        self.pos += 1
+        handler = self.handlers.get(token.type)
+        if handler is None:
+            return None
+        return handler(token)
+
     def parse(self):
         ast = []
         while self.pos < len(self.tokens) and self.tokens[self.pos].type != TokenType.EOF:
-            t = self.tokens[self.pos].type
-            if t == TokenType.CREATE:
-                self.consume()
-                ast.append({'type': 'CREATE', 'file': self.consume_string_or_word().value, 'content': self.consume(TokenType.BLOCK).value})
-            elif t == TokenType.PATCH:
-                self.consume()
-                ast.append({
-                    'type': 'PATCH', 
-                    'file': self.consume_string_or_word().value,
-                    'search': (self.consume(TokenType.SEARCH), self.consume(TokenType.BLOCK))[1].value,
-                    'replace': (self.consume(TokenType.REPLACE), self.consume(TokenType.BLOCK))[1].value
-                })
-            elif t == TokenType.DELETE:
-                self.consume()
-                ast.append({'type': 'DELETE', 'file': self.consume_string_or_word().value})
-            elif t == TokenType.RUN:
-                self.consume()
-                ast.append({'type': 'RUN', 'file': self.consume_string_or_word().value})
-            elif t == TokenType.FETCH_FIGMA:
-                self.consume()
-                ast.append({'type': 'FETCH_FIGMA', 'url': self.consume_string_or_word().value})
-            else:
-                self.pos += 1
+            cmd = self.parse_command()
+            if cmd is not None:
+                ast.append(cmd)
+        return ast
+
+    # --- STREAMING MODE ---
+    def feed(self, tokens):
+        """Push-based mode: appends tokens and returns every command completed by them.
+        A command cut short by the end of the tokens stays buffered until the next feed()."""
+        if not self.streaming:
+            self.set_tokens([])
+            self.streaming = True
+        self.tokens.extend(tokens)
+        ast = []
+        while self.pos < len(self.tokens):
+            start = self.pos
+            try:
+                cmd = self.parse_command()
+            except NeedMoreTokens:
+                self.pos = start
+                break
+            if cmd is not None:
+                ast.append(cmd)
+        # Drop consumed tokens so a long stream does not keep them alive
+        del self.tokens[:self.pos]
+        self.pos = 0
         return ast
+
+    def close(self):
+        """Ends the stream: parses whatever is buffered with the normal EOF rules."""
+        tokens = self.tokens if self.streaming else []
+        self.set_tokens(tokens + [Token(TokenType.EOF, None)])
+        return self.parse()
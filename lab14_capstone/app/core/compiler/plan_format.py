@@ -0,0 +1,134 @@
+"""Versioned binary format for CEIL ASTs (pending plans).
+
+Layout (little endian):
+    header   b'CEILPLAN' | version u16 | reserved u16 | command count u32
+    command  opcode u8 | field count u8 | start u64 | end u64
+             then per field: byte length u64 | UTF-8 bytes
+
+Every field is length-prefixed, so a loader can slice block payloads straight out of
+the buffer (bytes or mmap) without copying them; they are decoded only when written.
+"""
+import codecs
+import mmap
+import os
+import struct
+
+from .nodes import CreateCmd, PatchCmd, DeleteCmd, RunCmd, FetchFigmaCmd
+from .tokens import SMALL_PAYLOAD
+
+MAGIC = b'CEILPLAN'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHHI')
+_COMMAND = struct.Struct('<BBQQ')
+_LENGTH = struct.Struct('<Q')
+_NO_POS = 0xFFFFFFFFFFFFFFFF
+
+# Opcodes are part of the on-disk format: never renumber, only append
+OPCODES = {'CREATE': 1, 'PATCH': 2, 'DELETE': 3, 'RUN': 4, 'FETCH_FIGMA': 5}
+NODE_CLASSES = {1: CreateCmd, 2: PatchCmd, 3: DeleteCmd, 4: RunCmd, 5: FetchFigmaCmd}
+# Fields that may carry large payloads and are therefore loaded lazily
+PAYLOAD_FIELDS = {'content', 'search', 'replace'}
+
+class Utf8Span:
+    """UTF-8 payload viewed in a plan buffer, decoded only on str() or write_to()."""
+    __slots__ = ('view',)
+
+    WRITE_CHUNK = 1 << 20
+
+    def __init__(self, view):
+        self.view = view
+
+    def __str__(self):
+        return codecs.decode(self.view, 'utf-8', 'surrogatepass')
+
+    def __eq__(self, other):
+        if isinstance(other, str) or hasattr(other, 'write_to'):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f"Utf8Span({len(self.view)} bytes)"
+
+    def write_to(self, f):
+        """Decodes in chunks so a large payload is never a single str in memory."""
+        decoder = codecs.getincrementaldecoder('utf-8')('surrogatepass')
+        view = self.view
+        step = self.WRITE_CHUNK
+        for pos in range(0, len(view), step):
+            f.write(decoder.decode(view[pos:pos + step]))
+        f.write(decoder.decode(b'', final=True))
+
+def _encode(value):
+    if isinstance(value, Utf8Span):
+        return value.view # Already UTF-8, no need to round-trip through str
+    return str(value).encode('utf-8', 'surrogatepass')
+
+def dump_plan(ast):
+    """Serializes a list of command nodes to bytes."""
+    out = [_HEADER.pack(MAGIC, VERSION, 0, len(ast))]
+    for cmd in ast:
+        start = _NO_POS if cmd.start is None else cmd.start
+        end = _NO_POS if cmd.end is None else cmd.end
+        out.append(_COMMAND.pack(OPCODES[cmd.type], len(cmd.fields), start, end))
+        for name in cmd.fields:
+            data = _encode(getattr(cmd, name))
+            out.append(_LENGTH.pack(len(data)))
+            out.append(data)
+    return b"".join(out)
+
+def save_plan(ast, path):
+    """Writes the plan atomically (temp file + rename)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(dump_plan(ast))
+    os.replace(tmp, path)
+
+def load_plan_buffer(buffer):
+    """Rebuilds the command nodes from a bytes-like object or mmap.
+    Large payloads stay views into buffer, so it must outlive the returned nodes."""
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise Exception("Invalid CEIL plan: truncated header")
+    magic, version, _, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise Exception("Invalid CEIL plan: bad magic")
+    if version != VERSION:
+        raise Exception(f"Unsupported CEIL plan version {version}")
+    pos = _HEADER.size
+    ast = []
+    for _ in range(count):
+        opcode, field_count, start, end = _COMMAND.unpack_from(view, pos)
+        pos += _COMMAND.size
+        cls = NODE_CLASSES.get(opcode)
+        if cls is None or field_count != len(cls.fields):
+            raise Exception(f"Invalid CEIL plan: unknown command {opcode}")
+        values = []
+        for name in cls.fields:
+            (length,) = _LENGTH.unpack_from(view, pos)
+            pos += _LENGTH.size
+            if pos + length > len(view):
+                raise Exception("Invalid CEIL plan: truncated field")
+            data = view[pos:pos + length]
+            pos += length
+            if name in PAYLOAD_FIELDS and length > SMALL_PAYLOAD:
+                values.append(Utf8Span(data))
+            else:
+                values.append(codecs.decode(data, 'utf-8', 'surrogatepass'))
+        ast.append(cls(*values, start=None if start == _NO_POS else start, end=None if end == _NO_POS else end))
+    return ast
+
+def load_plan(path, use_mmap=True):
+    """Loads a plan file. With use_mmap the payloads are read straight from the page cache;
+    otherwise the file is read once into memory (keeps no mapping open, e.g. on Windows
+    where a mapped file can't be replaced)."""
+    with open(path, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+    return load_plan_buffer(buffer)
@@ -0,0 +1,25 @@
+from .lexer import CeilLexer
+from .parser import CeilParser
+
+class CeilStream:
+    """Incremental CEIL front end fed with partial AI output.
+
+    feed() returns the commands whose text is complete (e.g. a CREATE as soon as its
+    closing '>>>' arrives); anything unterminated stays buffered until more text or close().
+    """
+    def __init__(self):
+        self.lexer = CeilLexer()
+        self.parser = CeilParser()
+
+    def feed(self, chunk):
+        return self.parser.feed(self.lexer.feed(chunk))
+
+    def close(self):
+        return self.parser.feed(self.lexer.close()[:-1]) + self.parser.close()
+
+def stream_commands(chunks):
+    """Generator version: yields each command as soon as the chunks complete it."""
+    stream = CeilStream()
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
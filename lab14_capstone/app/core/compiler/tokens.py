@@ -13,9 +13,100 @@ class TokenType(Enum):
     BLOCK = auto()
     EOF = auto()
 
+    # Members are singletons, so identity hashing is valid and keeps the parser's
+    # TokenType-keyed dispatch table off Enum's pure-Python __hash__
+    __hash__ = object.__hash__
+
+class TextSpan:
+    """A (start, end) window into the original CEIL text.
+    The text is only copied when str() is called; write_to() streams it in chunks instead."""
+    __slots__ = ('source', 'start', 'end')
+
+    WRITE_CHUNK = 1 << 20 # 1M characters per write
+
+    def __init__(self, source, start=0, end=None):
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+
+    def __str__(self):
+        # A span covering the whole source returns it as-is without copying
+        return self.source[self.start:self.end]
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __eq__(self, other):
+        if isinstance(other, (TextSpan, str)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f"TextSpan({self.start}, {self.end})"
+
+    def write_to(self, f):
+        """Writes the span to a text file without materializing it as one string."""
+        step = self.WRITE_CHUNK
+        if len(self) <= step:
+            f.write(str(self))
+            return
+        for pos in range(self.start, self.end, step):
+            f.write(self.source[pos:min(pos + step, self.end)])
+
+# Payloads up to this many characters are materialized eagerly
+SMALL_PAYLOAD = 4096
+
+def write_text(f, value):
+    """Writes a command payload that is either a plain str or a TextSpan."""
+    if isinstance(value, str):
+        f.write(value)
+    else:
+        value.write_to(f)
+
 class Token:
+    # offset is the position of source[0] in the whole CEIL text (non-zero when streaming)
+    __slots__ = ('type', 'source', 'start', 'end', 'offset')
+
     def __init__(self, type, value):
         self.type = type
-        self.value = value
+        self.source = value
+        self.start = 0
+        self.end = len(value) if value is not None else 0
+        self.offset = 0
+
+    @classmethod
+    def from_span(cls, type, source, start, end, offset=0):
+        """Token pointing into source without copying the matched text."""
+        token = cls.__new__(cls)
+        token.type = type
+        token.source = source
+        token.start = start
+        token.end = end
+        token.offset = offset
+        return token
+
+    @property
+    def pos(self):
+        return self.offset + self.start
+
+    @property
+    def value(self):
+        if self.source is None:
+            return None
+        return self.source[self.start:self.end]
+
+    def span(self):
+        return TextSpan(self.source, self.start, self.end)
+
+    def payload(self):
+        """Block/string payload: small ones are copied (cheaper than a span object),
+        large ones stay a zero-copy TextSpan."""
+        if self.end - self.start <= SMALL_PAYLOAD:
+            return self.source[self.start:self.end]
+        return TextSpan(self.source, self.start, self.end)
+
     def __repr__(self):
         return f"Token({self.type}, {repr(self.value)})"
@@ -0,0 +1,174 @@
+import asyncio
+import codecs
+import locale
+import os
+import threading
+from .runner import RunResult
+from .run_limits import RunLimits, OutputBuffer, kill_tree, limited_result
+
+UNLIMITED = RunLimits()
+
+class AsyncRunEngine:
+    """RUN backend built on asyncio subprocesses.
+
+    The event loop lives in its own daemon thread, so it can be driven from the Tk
+    thread or from executor threads alike. Output is read as it is produced and every
+    complete line is passed to on_output(label, stream, line) on the loop thread (it
+    must not wait on another thread), where stream is 'stdout' or 'stderr'; the full
+    text is still collected for the receipt. At most max_concurrent processes run at
+    once, and cancel_all() kills whatever is running or queued.
+    Optional RunLimits add a timeout, rlimits and bounded output capture.
+    """
+    READ_CHUNK = 64 * 1024
+
+    def __init__(self, on_output=None, max_concurrent=4, limits=None):
+        self.on_output = on_output
+        self.limits = limits
+        self.max_concurrent = max_concurrent
+        self.encoding = locale.getpreferredencoding(False) # Same decoding as text=True
+        self.loop = asyncio.new_event_loop()
+        self.tasks = set()
+        self.closed = False
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        # The semaphore must be created on the loop that uses it
+        self.semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(), self.loop).result()
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _make_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrent)
+
+    # --- Runner interface (see SubprocessRunner) ---
+    def run_script(self, full_path):
+        return self.submit(['python', full_path], label=os.path.basename(full_path), script=full_path).result()
+
+    def run_shell(self, command):
+        return self.submit(command, shell=True).result()
+
+    # --- Async API ---
+    def submit(self, command, shell=False, label=None, cwd=None, script=None):
+        """Starts a command and returns a concurrent.futures.Future of its RunResult.
+        script is the Python file command runs, if any (GUI scripts get gui_timeout)."""
+        if self.closed:
+            raise Exception("RUN engine is closed")
+        if label is None:
+            label = command if shell else " ".join(command)
+        return asyncio.run_coroutine_threadsafe(self._track(command, shell, label, cwd, script), self.loop)
+
+    def run_many(self, commands, shell=False):
+        """Runs several commands concurrently (bounded by max_concurrent) and returns
+        their RunResults in the same order."""
+        futures = [self.submit(c, shell=shell) for c in commands]
+        return [f.result() for f in futures]
+
+    def cancel_all(self):
+        """Kills every running process and drops the queued ones. Returns how many were cancelled.
+
+        Does not wait for the loop thread: the caller may be the thread on_output
+        hands lines to (the Tk thread), and blocking it here could deadlock."""
+        def cancel():
+            for task in list(self.tasks):
+                task.cancel()
+        if self.closed:
+            return 0
+        count = len(self.tasks)
+        self.loop.call_soon_threadsafe(cancel)
+        return count
+
+    def running(self):
+        return len(self.tasks)
+
+    def close(self):
+        if self.closed:
+            return
+        self.cancel_all()
+        self.closed = True
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    # --- Internals ---
+    async def _track(self, command, shell, label, cwd, script):
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            return await self._run(command, shell, label, cwd, script)
+        except asyncio.CancelledError:
+            return RunResult("", "RUN cancelled by user.", None)
+        finally:
+            self.tasks.discard(task)
+
+    async def _run(self, command, shell, label, cwd, script):
+        limits = self.limits or UNLIMITED
+        timeout = limits.timeout_for(script) if script else limits.timeout
+        command, shell = limits.wrap(command, shell)
+        async with self.semaphore:
+            # Unbuffered child output, otherwise Python scripts only flush at exit when piped
+            env = dict(os.environ, PYTHONUNBUFFERED="1")
+            options = dict(stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, cwd=cwd, env=env,
+                           start_new_session=True)
+            if shell:
+                proc = await asyncio.create_subprocess_shell(command, **options)
+            else:
+                proc = await asyncio.create_subprocess_exec(*command, **options)
+            stdout, stderr = OutputBuffer(limits.max_output), OutputBuffer(limits.max_output)
+            timed_out = False
+            try:
+                await asyncio.wait_for(asyncio.gather(
+                    self._pump(proc.stdout, stdout, label, 'stdout'),
+                    self._pump(proc.stderr, stderr, label, 'stderr'),
+                    proc.wait()), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                kill_tree(proc.pid)
+                await proc.wait()
+            except asyncio.CancelledError:
+                if proc.returncode is None:
+                    kill_tree(proc.pid)
+                    await proc.wait()
+                raise
+        return limited_result(stdout, stderr, proc.returncode, timeout, timed_out)
+
+    async def _pump(self, stream, buffer, label, name):
+        """Reads a pipe to EOF into buffer, reporting each complete line until the
+        buffer stops keeping output (the receipt then shows the head and the tail)."""
+        decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        held = "" # Trailing '\r' that may be the first half of '\r\n'
+        line = "" # Incomplete last line, reported once its newline arrives
+        muted = False
+        while True:
+            data = await stream.read(self.READ_CHUNK)
+            final = not data
+            buffer.write(data)
+            if muted:
+                if final:
+                    return
+                continue
+            text = held + decoder.decode(data, final=final)
+            held = ""
+            if not final and text.endswith('\r'):
+                held, text = '\r', text[:-1]
+            # Universal newlines, like text=True
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+            if text:
+                lines = (line + text).split('\n')
+                line = lines.pop()
+                for complete in lines:
+                    self._report(label, name, complete)
+            if buffer.full():
+                muted = True
+                self._report(label, name, "... output truncated, head and tail kept in the receipt ...")
+            if final:
+                break
+        if line and not muted:
+            self._report(label, name, line)
+
+    def _report(self, label, name, line):
+        if self.on_output is None:
+            return
+        try:
+            self.on_output(label, name, line)
+        except Exception:
+            pass # A broken UI callback must not kill the process reader
@@ -1,65 +1,106 @@
 import os
-import subprocess
+from app.core import tracing
+from app.core.compiler.tokens import write_text
+from .runner import SubprocessRunner
+from .patch_engine import patch_file, receipt as patch_receipt
 
 class CeilExecutor:
-    def __init__(self, base_path):
+    def __init__(self, base_path, runner=None, run_cache=None):
         self.base_path = base_path
+        # RUN backend: anything with run_script(path) / run_shell(command) returning a RunResult
+        self.runner = runner or SubprocessRunner()
+        # Optional RunCache: scripts re-run against an unchanged tree reuse their last output
+        self.run_cache = run_cache
 
-    def execute(self, audited_ast):
-        results = []
-        for cmd in audited_ast:
-            try:
-                # Only calculate path if 'file' key exists (FETCH_FIGMA uses 'url')
-                path = os.path.join(self.base_path, cmd['file']) if 'file' in cmd else None
-                
-                if cmd['type'] == 'CREATE':
-                    os.makedirs(os.path.dirname(path), exist_ok=True)
-                    with open(path, 'w') as f: f.write(cmd['content'])
-                    results.append(f"CREATED: {cmd['file']}")
-                elif cmd['type'] == 'PATCH':
-                    with open(path, 'r') as f: content = f.read()
-                    new_content = content.replace(cmd['search'], cmd['replace'])
-                    with open(path, 'w') as f: f.write(new_content)
-                    results.append(f"PATCHED: {cmd['file']}")
-                elif cmd['type'] == 'DELETE':
-                    if os.path.exists(path):
-                        os.remove(path)
-                        results.append(f"DELETED: {cmd['file']}")
-                elif cmd['type'] == 'RUN':
-                    # Clean the command string
-                    raw_cmd = cmd['file'].strip()
-                    
-                    # Mission 3: Robust RUN Handling
-                    # 1. Handle "python main.py" or "main.py"
-                    if raw_cmd.startswith("python "):
-                        target_file = raw_cmd.replace("python ", "").strip()
-                    elif raw_cmd == "python":
-                        # AI hallucination: wrote 'RUN python' without a file
-                        target_file = "main.py" # Intelligent fallback
-                    else:
-                        target_file = raw_cmd
-                    
-                    # 2. System Command Detection
-                    system_verbs = ['pip', 'npm', 'git', 'node', 'npx']
-                    is_system = any(target_file.startswith(v) for v in system_verbs)
-                    
-                    if is_system:
-                        res = subprocess.run(target_file, shell=True, capture_output=True, text=True)
-                        results.append(f"SHELL {target_file}: {res.stdout or res.stderr}")
+    def execute(self, audited_ast, optimize=False, parallel=False, max_workers=8):
+        """Runs the commands in order. With optimize=True per-file operations are
+        coalesced first (see PlanOptimizer); with parallel=True independent files are
+        written concurrently (see ParallelPlanRunner). The returned results are the same."""
+        with tracing.span("execute", commands=len(audited_ast)):
+            if parallel:
+                from .parallel import ParallelPlanRunner
+                return ParallelPlanRunner(self, optimize=optimize, max_workers=max_workers).execute(audited_ast)
+            if optimize:
+                from .optimizer import PlanOptimizer
+                return PlanOptimizer(self).execute(audited_ast)
+            results = []
+            for cmd in audited_ast:
+                result = self.execute_command(cmd)
+                if result is not None:
+                    results.append(result)
+            return results
+
+    def execute_command(self, cmd):
+        """Executes one command and returns its receipt line (None if it has nothing to report)."""
+        if not tracing.enabled():
+            return self._execute_command(cmd)
+        with tracing.span(f"{cmd.type} {cmd.target}", cat="command"):
+            return self._execute_command(cmd)
+
+    def _execute_command(self, cmd):
+        try:
+            # Only calculate path if the command has a file (FETCH_FIGMA uses 'url')
+            path = os.path.join(self.base_path, cmd.file) if cmd.type != 'FETCH_FIGMA' else None
+
+            if cmd.type == 'CREATE':
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f: write_text(f, cmd.content)
+                tracing.file_io(path, "written")
+                return f"CREATED: {cmd.file}"
+            elif cmd.type == 'PATCH':
+                (count,) = patch_file(path, [(cmd.search, cmd.replace)])
+                return patch_receipt(cmd.file, count)
+            elif cmd.type == 'DELETE':
+                if os.path.exists(path):
+                    os.remove(path)
+                    return f"DELETED: {cmd.file}"
+            elif cmd.type == 'RUN':
+                # Clean the command string
+                raw_cmd = cmd.file.strip()
+
+                # Mission 3: Robust RUN Handling
+                # 1. Handle "python main.py" or "main.py"
+                if raw_cmd.startswith("python "):
+                    target_file = raw_cmd.replace("python ", "").strip()
+                elif raw_cmd == "python":
+                    # AI hallucination: wrote 'RUN python' without a file
+                    target_file = "main.py" # Intelligent fallback
+                else:
+                    target_file = raw_cmd
+
+                # 2. System Command Detection
+                system_verbs = ['pip', 'npm', 'git', 'node', 'npx']
+                is_system = any(target_file.startswith(v) for v in system_verbs)
+
+                if is_system:
+                    with tracing.span(target_file, cat="subprocess"):
+                        res = self.runner.run_shell(target_file)
+                    return self.run_receipt("SHELL", target_file, res)
+                else:
+                    # 3. Resolve Path
+                    full_path = os.path.join(self.base_path, target_file)
+                    if not os.path.exists(full_path):
+                        # Try basename fallback
+                        full_path = os.path.join(self.base_path, os.path.basename(target_file))
+
+                    if os.path.exists(full_path):
+                        with tracing.span(target_file, cat="subprocess"):
+                            if self.run_cache is not None:
+                                res = self.run_cache.run_script(full_path, self.runner)
+                            else:
+                                res = self.runner.run_script(full_path)
+                        return self.run_receipt("RUN", target_file, res)
                     else:
-                        # 3. Resolve Path
-                        full_path = os.path.join(self.base_path, target_file)
-                        if not os.path.exists(full_path):
-                            # Try basename fallback
-                            full_path = os.path.join(self.base_path, os.path.basename(target_file))
-                        
-                        if os.path.exists(full_path):
-                            res = subprocess.run(['python', full_path], capture_output=True, text=True)
-                            results.append(f"RUN {target_file}: {res.stdout or res.stderr}")
-                        else:
-                            results.append(f"ERROR: File {target_file} not found for RUN.")
-                elif cmd['type'] == 'FETCH_FIGMA':
-                    results.append(f"FETCH_FIGMA {cmd['url']}: Data retrieved from Figma.")
-            except Exception as e:
-                results.append(f"ERROR on {cmd['file']}: {str(e)}")
-        return results
+                        return f"ERROR: File {target_file} not found for RUN."
+            elif cmd.type == 'FETCH_FIGMA':
+                return f"FETCH_FIGMA {cmd.url}: Data retrieved from Figma."
+        except Exception as e:
+            return f"ERROR on {cmd.target}: {str(e)}"
+        return None
+
+    @staticmethod
+    def run_receipt(kind, target, res):
+        if res.timed_out or res.returncode is None or res.returncode < 0:
+            # Timeouts, limit kills and cancels say nothing about the code: no ERROR, no self-healing
+            return f"STOPPED: {kind} {target}: {res.stdout}{res.stderr}"
+        return f"{kind} {target}: {res.stdout or res.stderr}"
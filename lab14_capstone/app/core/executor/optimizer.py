@@ -0,0 +1,174 @@
+import errno
+import os
+from collections import OrderedDict
+from app.core import tracing
+from app.core.compiler.tokens import write_text
+from .patch_engine import apply_pairs, patch_file, receipt as patch_receipt
+
+# Commands that act as ordering barriers: a RUN may read any file, so every write
+# queued before it must reach the disk first
+BARRIER_TYPES = ('RUN', 'FETCH_FIGMA')
+
+_UNKNOWN = object() # File state not read yet: whatever is on disk
+_DELETED = object()
+
+def split_segments(audited_ast, base_path):
+    """Yields (groups, barrier): the per-file groups of the commands before a barrier
+    (an OrderedDict key -> [(index, cmd)]) and then the barrier itself as (index, cmd)."""
+    groups = OrderedDict()
+    for index, cmd in enumerate(audited_ast):
+        if cmd.type in BARRIER_TYPES:
+            yield groups, (index, cmd)
+            groups = OrderedDict()
+        else:
+            groups.setdefault(file_key(base_path, cmd.file), []).append((index, cmd))
+    yield groups, None
+
+def file_key(base_path, file):
+    """Normalized identity of a target so 'a.py', './a.py' and a symlink to it share one group."""
+    return os.path.normcase(os.path.realpath(os.path.join(base_path, file)))
+
+def cluster_groups(groups):
+    """Merges per-file groups whose paths depend on each other (one is an ancestor
+    directory of the other, e.g. 'pkg' and 'pkg/mod.py'), so they never run concurrently.
+    Returns a list of clusters, each a list of group keys."""
+    parent = {key: key for key in groups}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for key in groups:
+        ancestor = os.path.dirname(key)
+        while ancestor:
+            if ancestor in parent:
+                parent[find(key)] = find(ancestor)
+            next_ancestor = os.path.dirname(ancestor)
+            if next_ancestor == ancestor:
+                break
+            ancestor = next_ancestor
+
+    clusters = {}
+    for key in groups:
+        clusters.setdefault(find(key), []).append(key)
+    return list(clusters.values())
+
+class PlanOptimizer:
+    """Optimization pass between auditing and execution.
+
+    Between two RUN barriers, the commands are grouped by target file. All of a file's
+    operations are applied to one in-memory copy (one read, one write), consecutive
+    PATCHes are applied in a single scan (see patch_engine), and operations that
+    cancel out (CREATE then DELETE, PATCH then DELETE...) never touch the disk.
+    Files whose paths are nested in each other keep their original interleaving.
+    The receipt lines are identical to running the commands one by one.
+    """
+    def __init__(self, executor, coalesce=True):
+        self.executor = executor
+        self.coalesce = coalesce
+
+    def execute(self, audited_ast):
+        slots = [None] * len(audited_ast)
+        for groups, barrier in split_segments(audited_ast, self.executor.base_path):
+            for cluster in cluster_groups(groups):
+                for index, result in self.execute_cluster([groups[key] for key in cluster]):
+                    slots[index] = result
+            if barrier is not None:
+                index, cmd = barrier
+                slots[index] = self.executor.execute_command(cmd)
+        return [r for r in slots if r is not None]
+
+    def execute_cluster(self, cluster):
+        """Runs a cluster of per-file groups (see cluster_groups) and returns [(index, result)]."""
+        if len(cluster) == 1 and self.coalesce:
+            return self.execute_group(cluster[0])
+        # Several related paths: plain execution in the original order
+        items = sorted((item for group in cluster for item in group), key=lambda item: item[0])
+        return [(index, self.executor.execute_command(cmd)) for index, cmd in items]
+
+    def execute_group(self, items):
+        """Runs every command of one file and returns [(index, result)]."""
+        if len(items) == 1:
+            index, cmd = items[0]
+            return [(index, self.executor.execute_command(cmd))]
+        try:
+            with tracing.span(f"coalesced {items[0][1].file}", cat="command", commands=len(items)):
+                return self._coalesce(items)
+        except Exception:
+            # The final write failed (permissions, encoding...): replay one by one so
+            # the receipt reports the error exactly where sequential execution would
+            return [(index, self.executor.execute_command(cmd)) for index, cmd in items]
+
+    def _coalesce(self, items):
+        base = self.executor.base_path
+        results = []
+        state = _UNKNOWN
+        created = False
+        pos = 0
+        while pos < len(items):
+            index, cmd = items[pos]
+            path = os.path.join(base, cmd.file)
+            if cmd.type == 'CREATE':
+                state = cmd.content # Kept as-is (possibly a span) unless a PATCH needs the text
+                created = True
+                results.append((index, f"CREATED: {cmd.file}"))
+            elif cmd.type == 'PATCH':
+                # Every consecutive PATCH of the file goes through the engine in one scan
+                # (a replacement with '\r' ends the batch: sequentially it is normalized on re-read;
+                # so does another spelling of the path, which errors would quote differently)
+                end = pos
+                while end < len(items) and items[end][1].type == 'PATCH' and items[end][1].file == cmd.file:
+                    end += 1
+                    if '\r' in str(items[end - 1][1].replace):
+                        break
+                run = items[pos:end]
+                pairs = [(c.search, c.replace) for _, c in run]
+                pos = end
+                if state is _DELETED:
+                    err = FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+                    results.extend((i, f"ERROR on {c.file}: {err}") for i, c in run)
+                    continue
+                if state is _UNKNOWN and end == len(items):
+                    # Only patches left: straight from disk to disk (streamed for large files).
+                    # On failure the group is replayed one command at a time by execute_group.
+                    counts = patch_file(path, pairs)
+                    results.extend((i, patch_receipt(c.file, n)) for (i, c), n in zip(run, counts))
+                    continue
+                if state is _UNKNOWN:
+                    try:
+                        with open(path, 'r') as f: text = f.read()
+                        tracing.file_io(path, "read")
+                    except Exception as e:
+                        results.extend((i, f"ERROR on {c.file}: {str(e)}") for i, c in run)
+                        continue
+                else:
+                    # Sequentially this text would have been written and read back,
+                    # which applies universal newline translation
+                    text = str(state)
+                    if '\r' in text:
+                        text = text.replace('\r\n', '\n').replace('\r', '\n')
+                state, counts = apply_pairs(text, pairs)
+                results.extend((i, patch_receipt(c.file, n)) for (i, c), n in zip(run, counts))
+                continue
+            elif cmd.type == 'DELETE':
+                exists = os.path.exists(path) if state is _UNKNOWN else state is not _DELETED
+                if exists:
+                    state = _DELETED
+                    results.append((index, f"DELETED: {cmd.file}"))
+            pos += 1
+        self._flush(os.path.join(base, items[-1][1].file), state, created)
+        return results
+
+    def _flush(self, path, state, created):
+        """One disk operation for the final state of the file (none if it never changed)."""
+        if created:
+            # A CREATE leaves its parent folders behind even if the file is deleted later
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if state is _DELETED:
+            if os.path.exists(path):
+                os.remove(path)
+        elif state is not _UNKNOWN:
+            with open(path, 'w') as f: write_text(f, state)
+            tracing.file_io(path, "written")
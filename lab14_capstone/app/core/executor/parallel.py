@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+from .optimizer import PlanOptimizer, split_segments, cluster_groups
+
+class ParallelPlanRunner:
+    """Executes commands on independent files concurrently in a bounded thread pool.
+
+    Commands on the same path (or on paths nested inside each other) keep their relative
+    order; RUN commands are barriers that wait for every earlier write. Results are
+    returned in the original command order, so the receipt is unchanged.
+    """
+    def __init__(self, executor, optimize=True, max_workers=8):
+        self.executor = executor
+        self.optimizer = PlanOptimizer(executor, coalesce=optimize)
+        self.max_workers = max_workers
+
+    def execute(self, audited_ast):
+        slots = [None] * len(audited_ast)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for groups, barrier in split_segments(audited_ast, self.executor.base_path):
+                futures = [pool.submit(self.optimizer.execute_cluster, [groups[key] for key in cluster])
+                           for cluster in cluster_groups(groups)]
+                for future in futures:
+                    for index, result in future.result():
+                        slots[index] = result
+                if barrier is not None:
+                    index, cmd = barrier
+                    slots[index] = self.executor.execute_command(cmd)
+        return [r for r in slots if r is not None]
@@ -0,0 +1,165 @@
+"""PATCH engine: applies every SEARCH/REPLACE pair of a file in one scan.
+
+Sequential semantics are the reference: pair 1 is replaced everywhere (str.replace),
+then pair 2 on the result, and so on. When the pairs cannot interact (see
+independent()), a single left-to-right scan with a regex of all the searches gives
+exactly the same text. Otherwise the pairs are applied one after the other.
+
+Large files are patched as bytes from an mmap and streamed to a temp file that
+replaces the original, so the file is never held in memory as a str. That only
+happens when it is byte-for-byte equivalent to the text-mode read/write it replaces.
+"""
+import codecs
+import itertools
+import locale
+import mmap
+import os
+import re
+import shutil
+from app.core import tracing
+
+LARGE_FILE = 4 * 1024 * 1024
+VALIDATE_CHUNK = 1 << 20
+
+def _overlaps(a, b):
+    """True if a non-empty suffix of a is a prefix of b."""
+    if not a or not b:
+        return False
+    first = b[:1]
+    p = a.find(first, max(0, len(a) - len(b)))
+    while p != -1:
+        if b.startswith(a[p:]):
+            return True
+        p = a.find(first, p + 1)
+    return False
+
+def _touches(a, b):
+    """True if an occurrence of a and an occurrence of b can share characters."""
+    return a in b or b in a or _overlaps(a, b) or _overlaps(b, a)
+
+def independent(pairs):
+    """True if one scan gives the same result as applying the pairs in order:
+    no two searches can overlap, and no replacement can create or cover a match
+    of a later search."""
+    searches = [s for s, _ in pairs]
+    if not all(searches) or len(set(searches)) != len(searches):
+        return False
+    for i, (search, replace) in enumerate(pairs):
+        for later, _ in pairs[i + 1:]:
+            if _touches(search, later):
+                return False
+            # A later search must neither match inside the inserted text nor straddle it
+            if later in replace or replace in later or _overlaps(replace, later) or _overlaps(later, replace):
+                return False
+    return True
+
+def _alternation(words):
+    """Regex source matching any of words, factored by common prefix like a trie so
+    the regex engine never retries one alternative per search at every position."""
+    alts = []
+    for _, group in itertools.groupby(sorted(words), key=lambda w: w[:1]):
+        group = list(group)
+        if len(group) == 1:
+            alts.append(re.escape(group[0]))
+            continue
+        prefix = os.path.commonprefix(group)
+        rest = [w[len(prefix):] for w in group]
+        optional = any(not w for w in rest)
+        inner = _alternation([w for w in rest if w])
+        alts.append(re.escape(prefix) + inner + (b'?' if isinstance(prefix, bytes) else '?') * optional)
+    joined = (b'|' if isinstance(words[0], bytes) else '|').join(alts)
+    return (b'(?:%s)' % joined) if isinstance(joined, bytes) else f'(?:{joined})'
+
+def compile_searches(searches):
+    return re.compile(_alternation(list(searches)))
+
+def _scan(buffer, pairs, counts, write):
+    """Single scan over buffer (str, bytes or mmap); passes the output pieces to write."""
+    replacements = {s: r for s, r in pairs}
+    index = {s: i for i, (s, _) in enumerate(pairs)}
+    pos = 0
+    for match in compile_searches(replacements).finditer(buffer):
+        search = match.group()
+        counts[index[search]] += 1
+        write(buffer[pos:match.start()])
+        write(replacements[search])
+        pos = match.end()
+    write(buffer[pos:])
+
+def apply_pairs(text, pairs):
+    """Returns (new_text, counts) where counts[i] is the number of replacements made
+    by pairs[i], exactly as with sequential str.replace calls."""
+    pairs = [(str(s), str(r)) for s, r in pairs]
+    counts = [0] * len(pairs)
+    if len(pairs) > 1 and independent(pairs):
+        out = []
+        _scan(text, pairs, counts, out.append)
+        return "".join(out), counts
+    for i, (search, replace) in enumerate(pairs):
+        counts[i] = text.count(search)
+        if counts[i]:
+            text = text.replace(search, replace)
+    return text, counts
+
+def _streamable():
+    """Bytes on disk equal the text-mode str: UTF-8 locale and no newline translation."""
+    if os.linesep != '\n':
+        return False
+    return codecs.lookup(locale.getpreferredencoding(False)).name == 'utf-8'
+
+def _valid_utf8(buffer):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for pos in range(0, len(buffer), VALIDATE_CHUNK):
+            decoder.decode(buffer[pos:pos + VALIDATE_CHUNK])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def _patch_mapped(path, pairs):
+    """Streams the patched file through a temp file. Returns counts, or None when the
+    file needs the text path (CR newlines, invalid UTF-8, dependent pairs...)."""
+    try:
+        encoded = [(str(s).encode('utf-8'), str(r).encode('utf-8')) for s, r in pairs]
+    except UnicodeEncodeError:
+        return None
+    if not independent(encoded):
+        return None
+    with open(path, 'rb') as src:
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped.find(b'\r') != -1 or not _valid_utf8(mapped):
+                return None
+            counts = [0] * len(encoded)
+            tmp = f"{path}.patch.tmp"
+            try:
+                with open(tmp, 'wb') as dst:
+                    _scan(mapped, encoded, counts, dst.write)
+                shutil.copymode(path, tmp)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+    os.replace(tmp, path) # After the mapping is closed (required on Windows)
+    return counts
+
+def receipt(file, count):
+    return f"PATCHED: {file} ({count} match{'' if count == 1 else 'es'})"
+
+def patch_file(path, pairs):
+    """Applies pairs [(search, replace)] to the file at path and returns the per-pair
+    replacement counts. Errors (missing file, bad encoding...) raise like open() would."""
+    tracing.file_io(path, "read")
+    counts = _patch(path, pairs)
+    tracing.file_io(path, "written")
+    return counts
+
+def _patch(path, pairs):
+    if len(pairs) and os.path.getsize(path) >= LARGE_FILE and _streamable():
+        counts = _patch_mapped(path, pairs)
+        if counts is not None:
+            return counts
+    with open(path, 'r') as f: content = f.read()
+    content, counts = apply_pairs(content, pairs)
+    with open(path, 'w') as f: f.write(content)
+    return counts
@@ -0,0 +1,27 @@
+"""Exec shim used by RunLimits.wrap: applies rlimits, then becomes the real command.
+
+    python rlimit_exec.py CPU_SECONDS MEMORY_MB COMMAND [ARGS...]
+
+A limit of "-" is left unset. Runs as its own process, so the limits never touch the
+IDE and no Python code has to run between fork and exec (preexec_fn is unsafe in a
+process with threads). Standard library only: it is started by path, not imported.
+"""
+import os
+import resource
+import sys
+
+def main(argv):
+    cpu, memory, command = argv[0], argv[1], argv[2:]
+    if cpu != "-":
+        resource.setrlimit(resource.RLIMIT_CPU, (int(cpu), int(cpu) + 1))
+    if memory != "-":
+        size = int(memory) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (size, size))
+    try:
+        os.execvp(command[0], command)
+    except OSError as e:
+        sys.stderr.write(f"{command[0]}: {e}\n")
+        os._exit(127)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from .runner import RunResult
+
+# Folders that never hold importable project code
+SKIP_DIRS = {'__pycache__', 'node_modules'}
+
+class RunCache:
+    """Opt-in memo of RUN results, stored in <root>/.marvelcode/run_cache.json.
+
+    The key is the script path plus a Merkle hash of every .py file under the project
+    (the files the script can import): each file hash is reused while its (mtime, size)
+    is unchanged, and each folder hashes the sorted hashes of its children. A hit
+    returns the recorded stdout/stderr without spawning a process, so only enable it
+    for scripts whose output depends on the code alone. Only clean runs (exit code 0)
+    are recorded: failed, timed out, cancelled or killed runs always run again. Least
+    recently used entries are evicted beyond max_entries.
+    """
+    FILE_NAME = "run_cache.json"
+    MAX_OUTPUT = 1024 * 1024 # Larger outputs are not worth keeping
+    RACY_SECONDS = 2 # Files modified this recently are re-hashed on every lookup
+
+    def __init__(self, root, max_entries=64):
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, ".marvelcode", self.FILE_NAME)
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # key -> [stdout, stderr, returncode]
+        self.file_hashes = {} # relative path -> [mtime_ns, size, sha256]
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            # Older cache files may still hold failed or cancelled runs
+            self.entries = OrderedDict((k, v) for k, v in data.get("entries", []) if self.cacheable(RunResult(*v)))
+            self.file_hashes = data.get("files", {})
+        except (OSError, ValueError, TypeError):
+            pass # Missing or corrupt cache: start empty
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"entries": list(self.entries.items()), "files": self.file_hashes}, f)
+        os.replace(tmp, self.path)
+
+    # --- Merkle hash of the project ---
+    def file_hash(self, full_path, rel, st):
+        cached = self.file_hashes.get(rel)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        if time.time() - st.st_mtime > self.RACY_SECONDS:
+            self.file_hashes[rel] = [st.st_mtime_ns, st.st_size, digest.hexdigest()]
+        # else: a same-size rewrite within the timestamp granularity would go unnoticed
+        return digest.hexdigest()
+
+    def tree_hash(self, folder=None, seen=None):
+        """Hash of every .py file under folder (the project root by default)."""
+        top = seen is None
+        if top:
+            folder, seen = self.root, set()
+        digest = hashlib.sha256()
+        try:
+            entries = sorted(os.scandir(folder), key=lambda e: e.name)
+        except OSError:
+            entries = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.startswith('.') or entry.name in SKIP_DIRS:
+                        continue
+                    if os.path.exists(os.path.join(entry.path, "pyvenv.cfg")):
+                        continue # Virtual environments
+                    child = self.tree_hash(entry.path, seen)
+                elif entry.name.endswith(".py") and entry.is_file():
+                    rel = os.path.relpath(entry.path, self.root)
+                    seen.add(rel)
+                    child = self.file_hash(entry.path, rel, entry.stat())
+                else:
+                    continue
+            except OSError:
+                continue
+            digest.update(f"{entry.name}\0{child}\n".encode("utf-8", "surrogatepass"))
+        if top:
+            # Forget files that no longer exist
+            for rel in [r for r in self.file_hashes if r not in seen]:
+                del self.file_hashes[rel]
+        return digest.hexdigest()
+
+    def key(self, full_path):
+        try:
+            rel = os.path.relpath(os.path.abspath(full_path), self.root)
+        except ValueError:
+            rel = os.path.abspath(full_path) # Other drive (Windows)
+        script = "" # Scripts outside the tree or without .py are hashed on their own
+        if not rel.endswith(".py") or rel.startswith(".."):
+            st = os.stat(full_path)
+            script = self.file_hash(full_path, rel, st)
+        return f"{rel}:{self.tree_hash()}{script}"
+
+    # --- Lookups ---
+    def run_script(self, full_path, runner):
+        """Returns the recorded result for this script and tree, or runs it with runner."""
+        with self.lock:
+            key = self.key(full_path)
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return RunResult(*entry)
+            self.misses += 1
+        result = runner.run_script(full_path)
+        self.put(key, result)
+        return result
+
+    @staticmethod
+    def cacheable(result):
+        return result.returncode == 0 and not result.timed_out
+
+    def put(self, key, result):
+        if not self.cacheable(result) or len(result.stdout or "") + len(result.stderr or "") > self.MAX_OUTPUT:
+            return
+        with self.lock:
+            self.entries[key] = list(result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            try:
+                self.save()
+            except OSError:
+                pass # The cache is an optimization; never fail a RUN over it
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,134 @@
+import locale
+import os
+import re
+import signal
+import sys
+from app.core.settings import SettingsHandler
+from .runner import RunResult
+
+try:
+    import resource # POSIX only
+except ImportError:
+    resource = None
+
+# Built-in limits; the "run_limits" setting overrides them per role:
+#   {"default": {"timeout": 120}, "developer": {"timeout": 30, "cpu_seconds": 20, "memory_mb": 1024}}
+DEFAULT_LIMITS = {
+    "timeout": 120, # Wall-clock seconds before the process (group) is killed
+    "gui_timeout": None, # Same for scripts that import a GUI toolkit; None waits until the window is closed
+    "cpu_seconds": None, # RLIMIT_CPU
+    "memory_mb": None, # RLIMIT_AS
+    "max_output_kb": 1024, # Per stream; the head and the tail are kept
+}
+
+# Scripts importing one of these run until the user closes them
+GUI_IMPORT = re.compile(r'^\s*(?:import|from)\s+(?:tkinter|Tkinter|turtle|pygame|PyQt[56]|PySide[26]|wx|kivy|customtkinter)\b', re.M)
+
+# Applies the rlimits in its own process right before exec (see wrap)
+RLIMIT_SHIM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rlimit_exec.py")
+
+class RunLimits:
+    def __init__(self, timeout=None, cpu_seconds=None, memory_mb=None, max_output_kb=None, gui_timeout=None):
+        self.timeout = timeout
+        self.gui_timeout = gui_timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_output = max_output_kb * 1024 if max_output_kb else None
+
+    @staticmethod
+    def for_role(role):
+        configured = SettingsHandler.get("run_limits", {}) or {}
+        values = dict(DEFAULT_LIMITS)
+        values.update(configured.get("default", {}))
+        values.update(configured.get(role, {}))
+        return RunLimits(**{k: v for k, v in values.items() if k in DEFAULT_LIMITS})
+
+    def timeout_for(self, full_path):
+        """Wall-clock timeout of a RUN of this script: gui_timeout for GUI programs."""
+        try:
+            with open(full_path, "r", encoding="utf-8", errors="replace") as f:
+                source = f.read()
+        except OSError:
+            return self.timeout
+        return self.gui_timeout if GUI_IMPORT.search(source) else self.timeout
+
+    def wrap(self, command, shell=False):
+        """(command, shell) that applies the rlimits before running command, through
+        the RLIMIT_SHIM exec shim. Unchanged where unsupported or unset."""
+        if resource is None or (not self.cpu_seconds and not self.memory_mb):
+            return command, shell
+        argv = ["/bin/sh", "-c", command] if shell else list(command)
+        cpu = str(int(self.cpu_seconds)) if self.cpu_seconds else "-"
+        memory = str(int(self.memory_mb)) if self.memory_mb else "-"
+        return [sys.executable, RLIMIT_SHIM, cpu, memory] + argv, False
+
+def kill_tree(pid):
+    """Kills a process started with start_new_session=True, including its children."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except OSError:
+        pass # Already gone
+
+class OutputBuffer:
+    """Captured bytes of one stream, bounded: once over limit only the first and the
+    last limit/2 bytes are kept and the bytes in between are counted as truncated."""
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.head_limit = limit // 2 if limit else None
+        self.tail_limit = limit - self.head_limit if limit else None
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data):
+        self.total += len(data)
+        if self.limit is None:
+            self.head += data
+            return
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_limit:
+            self.tail += data
+            if len(self.tail) > 2 * self.tail_limit: # Trim in batches, not on every write
+                del self.tail[:-self.tail_limit]
+
+    def full(self):
+        """True once new output is no longer kept in the head."""
+        return self.limit is not None and len(self.head) >= self.head_limit
+
+    @property
+    def truncated(self):
+        kept = len(self.head) + min(len(self.tail), self.tail_limit or 0)
+        return self.total - kept
+
+    def getvalue(self, encoding=None):
+        """Decoded text with universal newlines, like subprocess text=True."""
+        encoding = encoding or locale.getpreferredencoding(False)
+        if not self.truncated: # One decode: a character or '\r\n' may straddle head and tail
+            return decode_output(bytes(self.head + self.tail), encoding)
+        head = decode_output(bytes(self.head), encoding)
+        tail = decode_output(bytes(self.tail[-self.tail_limit:]), encoding)
+        return f"{head}\n... [{self.truncated} bytes truncated] ...\n{tail}"
+
+def decode_output(data, encoding):
+    text = data.decode(encoding, errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def limited_result(stdout, stderr, returncode, timeout, timed_out):
+    """Builds the RunResult, adding a note to stderr when the process was killed."""
+    err = stderr.getvalue()
+    if timed_out:
+        err += f"\nRUN timed out after {timeout}s and was killed."
+    elif returncode is not None and returncode < 0:
+        try:
+            name = signal.Signals(-returncode).name
+        except ValueError:
+            name = f"signal {-returncode}"
+        reason = " (CPU time limit)" if name == "SIGXCPU" else ""
+        err += f"\nRUN was killed by {name}{reason}."
+    return RunResult(stdout.getvalue(), err, returncode, timed_out)
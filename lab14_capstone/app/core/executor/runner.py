@@ -0,0 +1,15 @@
+import subprocess
+from collections import namedtuple
+
+RunResult = namedtuple("RunResult", ["stdout", "stderr", "returncode", "timed_out"], defaults=[False])
+
+class SubprocessRunner:
+    """Default RUN backend: a blocking subprocess per command with captured output."""
+
+    def run_script(self, full_path):
+        res = subprocess.run(['python', full_path], capture_output=True, text=True)
+        return RunResult(res.stdout, res.stderr, res.returncode)
+
+    def run_shell(self, command):
+        res = subprocess.run(command, shell=True, capture_output=True, text=True)
+        return RunResult(res.stdout, res.stderr, res.returncode)
@@ -0,0 +1,184 @@
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from .runner import RunResult, SubprocessRunner
+from .run_limits import RunLimits, OutputBuffer, kill_tree, limited_result
+
+# Imported once in the warm server, so every RUN finds them already loaded.
+# Missing ones are skipped silently by the server.
+DEFAULT_PRELOAD = ('json', 're', 'collections', 'datetime', 'pathlib', 'typing', 'random',
+                   'subprocess', 'threading', 'asyncio', 'sqlite3', 'csv', 'unittest')
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_server.py")
+
+class WarmRunner:
+    """RUN backend that forks scripts from a pre-warmed interpreter.
+
+    warm_server.py is started once with the preload modules imported, and every RUN is
+    a fork of it that executes the script with fresh globals. This saves the interpreter
+    startup and the common imports on every RUN (the self-healing loop re-runs main.py
+    up to three times). The server never imports the IDE, and each fork drops every
+    non-stdlib module, and every module a file next to the script shadows, and resets
+    sys.path and the working directory first, so the script sees what a cold
+    `python script.py` would. Shell commands, and scripts on
+    platforms without fork (Windows), go to the fallback runner.
+
+    Limits are the runner's own, else the fallback's (see RunLimits): timeout, rlimits
+    and output caps as for cold RUNs. cancel_all() kills the running scripts. Output is
+    returned when the RUN ends rather than streamed.
+
+    The warm interpreter is sys.executable, whereas cold RUNs use 'python' from PATH.
+    """
+    READ_CHUNK = 64 * 1024
+
+    def __init__(self, preload=DEFAULT_PRELOAD, fallback=None, limits=None):
+        self.fallback = fallback or SubprocessRunner()
+        self.preload = list(preload)
+        self.limits = limits
+        self.available = hasattr(os, "fork") and hasattr(socket, "send_fds")
+        self.server = None
+        self.control = None # Our end of the server's request socket
+        self.lock = threading.Lock()
+        self.running = {} # pid -> cancelled
+        self.running_lock = threading.Lock()
+
+    def warm_up(self):
+        """Starts the server now instead of on the first RUN."""
+        if self.available:
+            with self.lock:
+                self._ensure_server()
+
+    def _ensure_server(self):
+        if self.server is not None and self.server.poll() is None:
+            return
+        self._stop_server()
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            # Unbuffered output like cold RUNs, so a killed script still shows what it printed
+            env = dict(os.environ, PYTHONUNBUFFERED="1")
+            self.server = subprocess.Popen([sys.executable, SERVER, str(theirs.fileno())] + self.preload,
+                                           stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                           pass_fds=[theirs.fileno()], env=env, start_new_session=True)
+        except OSError:
+            ours.close()
+            raise
+        finally:
+            theirs.close()
+        self.control = ours
+
+    def _stop_server(self):
+        if self.server is not None:
+            self.server.stdin.close() # The server exits on EOF
+            self.server.wait()
+            self.server = None
+        if self.control is not None:
+            self.control.close()
+            self.control = None
+
+    def close(self):
+        with self.lock:
+            self._stop_server()
+
+    def current_limits(self):
+        return self.limits or getattr(self.fallback, "limits", None) or RunLimits()
+
+    def run_shell(self, command):
+        return self.fallback.run_shell(command)
+
+    def run_script(self, full_path):
+        if not self.available:
+            return self.fallback.run_script(full_path)
+        full_path = os.path.abspath(full_path)
+        limits = self.current_limits()
+        timeout = limits.timeout_for(full_path)
+        request = {"path": full_path, "cwd": os.getcwd(),
+                   "cpu_seconds": limits.cpu_seconds, "memory_mb": limits.memory_mb}
+        (out_r, out_w), (err_r, err_w), (status_r, status_w) = os.pipe(), os.pipe(), os.pipe()
+        try:
+            with self.lock:
+                self._ensure_server()
+                socket.send_fds(self.control, [json.dumps(request).encode()], [out_w, err_w, status_w])
+        except OSError:
+            for fd in (out_r, err_r, status_r):
+                os.close(fd)
+            return self.fallback.run_script(full_path) # Server could not be reached: cold start instead
+        finally:
+            for fd in (out_w, err_w, status_w):
+                os.close(fd)
+
+        stdout, stderr = OutputBuffer(limits.max_output), OutputBuffer(limits.max_output)
+        readers = [threading.Thread(target=self._drain, args=(fd, buffer), daemon=True)
+                   for fd, buffer in ((out_r, stdout), (err_r, stderr))]
+        for reader in readers:
+            reader.start()
+        try:
+            pid, returncode, timed_out = self._wait(status_r, timeout)
+        finally:
+            os.close(status_r)
+        for reader in readers:
+            reader.join(timeout=5) # A grandchild that left the session could keep a pipe open
+        if pid is None:
+            return self.fallback.run_script(full_path) # The server died before starting it
+        with self.running_lock:
+            cancelled = self.running.pop(pid)
+        if cancelled:
+            return RunResult("", "RUN cancelled by user.", None)
+        return limited_result(stdout, stderr, returncode, timeout, timed_out)
+
+    def _wait(self, status_fd, timeout):
+        """Reads "<pid>\\n<exit code>\\n" from the status pipe, killing the script once
+        timeout passes. Returns (pid, exit code, timed out)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        data, pid, timed_out = b"", None, False
+        while data.count(b"\n") < 2:
+            if pid is None and b"\n" in data:
+                pid = int(data.split(b"\n")[0])
+                with self.running_lock:
+                    self.running[pid] = False
+            wait = None if deadline is None else max(0, deadline - time.monotonic())
+            if not select.select([status_fd], [], [], wait)[0]:
+                timed_out, deadline = True, None
+                self._kill(pid)
+                continue
+            chunk = os.read(status_fd, 64)
+            if not chunk:
+                break # Server gone
+            data += chunk
+        lines = data.split(b"\n")
+        if pid is None and len(lines) > 1:
+            pid = int(lines[0])
+            with self.running_lock:
+                self.running[pid] = False
+        returncode = int(lines[1]) if len(lines) > 2 else None
+        return pid, returncode, timed_out
+
+    @staticmethod
+    def _kill(pid):
+        if pid is None:
+            return
+        kill_tree(pid)
+        try:
+            os.kill(pid, signal.SIGKILL) # Not yet its own process group
+        except OSError:
+            pass
+
+    def cancel_all(self):
+        """Kills every running script. Returns how many were cancelled."""
+        with self.running_lock:
+            pids = [pid for pid, cancelled in self.running.items() if not cancelled]
+            for pid in pids:
+                self.running[pid] = True
+        for pid in pids:
+            self._kill(pid)
+        return len(pids)
+
+    def _drain(self, fd, buffer):
+        with open(fd, "rb", buffering=0) as pipe:
+            for data in iter(lambda: pipe.read(self.READ_CHUNK), b""):
+                buffer.write(data)
@@ -0,0 +1,169 @@
+"""Warm interpreter behind WarmRunner (standard library only: started by path, never
+imported by the IDE).
+
+    python warm_server.py CONTROL_FD PRELOAD...
+
+Imports the preload modules once, then waits for requests on the CONTROL_FD datagram
+socket: a JSON {"path", "cwd", "cpu_seconds", "memory_mb"} with three pipe ends
+attached (stdout, stderr, status). Each request forks a supervisor, which forks the
+script and writes "<pid>\\n" and then "<exit code>\\n" (negative for a signal) to the
+status pipe. The server exits when its stdin (held open by the IDE) closes.
+"""
+import sys
+
+# What a cold `python script.py` starts with: site, .pth hooks and the like
+BASELINE_MODULES = set(sys.modules)
+
+import atexit
+import importlib
+import importlib.machinery
+import json
+import os
+import runpy
+import select
+import signal
+import socket
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BASE_PATH = sys.path[1:] # sys.path[0] is this folder; each script gets its own
+
+def load_preload(names):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass # Missing ones are skipped
+
+def reset_modules():
+    """Forgets everything but the startup modules and the standard library, so the
+    script imports its own packages (an `app` of the user is not ours)."""
+    stdlib = sys.stdlib_module_names
+    for name in list(sys.modules):
+        if name not in BASELINE_MODULES and name.partition('.')[0] not in stdlib:
+            del sys.modules[name]
+    sys.path_importer_cache.clear()
+    importlib.invalidate_caches()
+
+def drop_shadowed(script_dir):
+    """Forgets the loaded modules a file in script_dir replaces (a project `random.py`
+    is imported instead of the stdlib one under a cold run too). Startup, built-in and
+    frozen modules win over script_dir under a cold run as well, so they stay."""
+    for top in {name.partition('.')[0] for name in sys.modules}:
+        if (top in BASELINE_MODULES or top in sys.builtin_module_names
+                or importlib.machinery.FrozenImporter.find_spec(top) is not None):
+            continue
+        spec = importlib.machinery.PathFinder.find_spec(top, [script_dir])
+        if spec is None or spec.loader is None:
+            continue # Not there, or a namespace portion, which any regular package beats
+        for name in list(sys.modules):
+            if name == top or name.startswith(top + '.'):
+                del sys.modules[name]
+
+def run_script(request, out, err):
+    """Script child: behaves like `python path` started in cwd."""
+    os.setsid() # Its own process group, so a timeout or cancel kills its children too
+    os.dup2(out, 1) # fd level, so C extensions and child processes are captured too
+    os.dup2(err, 2)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    for fd in (out, err, devnull):
+        os.close(fd)
+    path = request["path"]
+    code = 0
+    try:
+        if resource is not None and request.get("cpu_seconds"):
+            cpu = int(request["cpu_seconds"])
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        if resource is not None and request.get("memory_mb"):
+            size = int(request["memory_mb"]) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (size, size))
+        os.chdir(request["cwd"])
+        reset_modules()
+        sys.argv = [path]
+        sys.path[:] = [os.path.dirname(path)] + BASE_PATH
+        drop_shadowed(sys.path[0])
+        runpy.run_path(path, run_name='__main__') # Fresh globals for every run
+    except SystemExit as e:
+        code = exit_code(e)
+    except BaseException as e:
+        # Hide the runpy frames so the traceback reads like a plain `python` run
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != path:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb or e.__traceback__)
+        code = 1
+    code = finish(code)
+    os._exit(code)
+
+def exit_code(e):
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+def finish(code):
+    """Interpreter shutdown as `python` does it: non-daemon threads, then atexit."""
+    try:
+        shutdown = getattr(sys.modules.get("threading"), "_shutdown", None)
+        if shutdown is not None: # The script may have its own threading.py
+            shutdown()
+        atexit._run_exitfuncs()
+    except SystemExit as e:
+        code = exit_code(e)
+    except BaseException:
+        traceback.print_exc()
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    return code
+
+def supervise(request, fds):
+    """Supervisor: starts the script child and reports its pid and exit code."""
+    out, err, status = fds
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL) # So waitpid works here
+    pid = os.fork()
+    if pid == 0:
+        os.close(status)
+        run_script(request, out, err)
+    os.close(out)
+    os.close(err)
+    os.write(status, f"{pid}\n".encode())
+    _, wait_status = os.waitpid(pid, 0)
+    os.write(status, f"{os.waitstatus_to_exitcode(wait_status)}\n".encode())
+
+def serve(control):
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN) # Supervisors are never waited for
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        ready, _, _ = select.select([control, sys.stdin], [], [])
+        if sys.stdin in ready and not os.read(sys.stdin.fileno(), 1):
+            return # The IDE is gone
+        if control not in ready:
+            continue
+        message, fds, _, _ = socket.recv_fds(control, 65536, 3)
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            continue
+        if os.fork() == 0:
+            try:
+                control.close()
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                supervise(json.loads(message), fds)
+            finally:
+                os._exit(0)
+        for fd in fds:
+            os.close(fd)
+
+if __name__ == "__main__":
+    load_preload(sys.argv[2:])
+    serve(socket.socket(fileno=int(sys.argv[1])))
@@ -0,0 +1,77 @@
+import math
+import re
+
+DEFAULT_BUDGET = 8000 # Tokens of history per AI request, overridable with "history_token_budget"
+SUMMARY_SHARE = 0.2 # Part of the budget kept for the summary of older messages
+SUMMARY_LINE_WORDS = 40 # Longest excerpt of one message in the summary
+
+def estimate_tokens(text):
+    """Rough token count: 1 word ~= 1.3 tokens (same estimate as build_full_context)."""
+    return math.ceil(len(text.split()) * 1.3)
+
+def summary_line(msg):
+    """Extractive summary of one message: its first sentence, at most SUMMARY_LINE_WORDS words."""
+    text = msg.get('message', '').strip()
+    first = re.split(r'(?<=[.!?])\s|\n', text, maxsplit=1)[0]
+    words = first.split()
+    if len(words) > SUMMARY_LINE_WORDS:
+        first = " ".join(words[:SUMMARY_LINE_WORDS]) + " ..."
+    return f"- {msg.get('sender', 'USER')}: {first}"
+
+class HistoryWindow:
+    """Picks the newest messages of a chat that fit a token budget and folds the older
+    ones into a rolling summary.
+
+    Token estimates are cached per message and the summary per chat. History is
+    append-only, so both only grow at the end: when the window start moves, just the
+    newly folded messages are summarized, and the oldest summary lines are dropped
+    once the summary outgrows its share of the budget.
+    """
+    def __init__(self):
+        self.tokens = {} # chat_id -> estimate per message, in history order
+        self.summaries = {} # chat_id -> [folded count, lines, line tokens, dropped lines, budget]
+
+    def forget(self, chat_id):
+        self.tokens.pop(chat_id, None)
+        self.summaries.pop(chat_id, None)
+
+    def token_counts(self, chat_id, history):
+        counts = self.tokens.get(chat_id)
+        if counts is None or len(counts) > len(history): # New or replaced chat
+            counts = self.tokens[chat_id] = []
+        for msg in history[len(counts):]:
+            counts.append(estimate_tokens(msg.get('message', '')))
+        return counts
+
+    def select(self, chat_id, history, budget=DEFAULT_BUDGET):
+        """(summary or None, recent messages) for a request of at most ~budget tokens."""
+        history = history[:] # The writer side may append while we read
+        counts = self.token_counts(chat_id, history)
+        if sum(counts) <= budget:
+            return None, history
+        summary_budget = int(budget * SUMMARY_SHARE)
+        start, used = len(history), 0
+        while start > 0 and used + counts[start - 1] <= budget - summary_budget:
+            start -= 1
+            used += counts[start]
+        return self.summary(chat_id, history, start, summary_budget), history[start:]
+
+    def summary(self, chat_id, history, folded, budget):
+        state = self.summaries.get(chat_id)
+        if state is None or state[0] > folded or state[4] != budget:
+            state = self.summaries[chat_id] = [0, [], [], 0, budget]
+        if state[0] < folded: # The window moved: fold the messages that left it
+            for msg in history[state[0]:folded]:
+                line = summary_line(msg)
+                state[1].append(line)
+                state[2].append(estimate_tokens(line))
+            state[0] = folded
+            total = sum(state[2])
+            while total > budget and state[1]:
+                state[1].pop(0)
+                total -= state[2].pop(0)
+                state[3] += 1
+        header = f"Summary of the {folded} earlier messages of this chat"
+        if state[3]:
+            header += f" (the oldest {state[3]} omitted)"
+        return header + ":\n" + "\n".join(state[1])
@@ -1,17 +1,149 @@
 import sqlite3
+import csv
+import math
+import multiprocessing
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 import bcrypt
+from app.core.settings import SettingsHandler
+from .sessions import SessionStore
+
+# Work factor limits for calibrate_rounds (each extra round doubles the hashing time)
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+DEFAULT_TARGET_MS = 250 # Overridable with the "bcrypt_target_ms" setting
+
+def hash_password(password, rounds=None):
+    """bcrypt hash of a str password (module level so process pools can pickle it).
+    rounds=None uses bcrypt's default cost."""
+    salt = bcrypt.gensalt() if rounds is None else bcrypt.gensalt(rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt)
+
+def hash_passwords(passwords, workers=None, rounds=None):
+    """Hashes passwords in order, spread over a process pool when there are several
+    cores and several passwords."""
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(passwords) < 2:
+        return [hash_password(p, rounds) for p in passwords]
+    # forkserver: forking the GUI process (which runs threads) is not safe
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+    workers = min(workers, len(passwords))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(hash_password, passwords, [rounds] * len(passwords),
+                             chunksize=max(1, len(passwords) // (workers * 4))))
+
+def hash_rounds(hashed):
+    """Work factor stored in a bcrypt hash ($2b$12$... -> 12)."""
+    try:
+        return int(hashed[4:6])
+    except ValueError:
+        return None
+
+def hash_seconds(rounds, samples=3):
+    best = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def calibrate_rounds(target_ms=DEFAULT_TARGET_MS, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """Highest work factor whose hash takes at most target_ms on this machine,
+    extrapolated from a cheap probe and kept within [min_rounds, max_rounds]."""
+    probe = 8
+    seconds = hash_seconds(probe)
+    rounds = probe + math.floor(math.log2(target_ms / 1000 / seconds)) if seconds > 0 else max_rounds
+    rounds = max(min_rounds, min(max_rounds, rounds))
+    # The extrapolation is rough: check the pick once
+    if rounds > min_rounds and hash_seconds(rounds, 1) * 1000 > target_ms * 1.25:
+        rounds -= 1
+    return rounds
+
+class ConnectionPool:
+    """Small thread-safe pool of SQLite connections.
+
+    Connections are opened lazily up to size and reused afterwards, in WAL mode with
+    synchronous=NORMAL (readers never block the writer, commits skip the extra fsync).
+    They run in autocommit mode: writes go through SecurityDB.transaction().
+    """
+    def __init__(self, db_path, size=4, timeout=30):
+        self.db_path = db_path
+        # Every ':memory:' connection would be a different database
+        self.size = 1 if db_path == ":memory:" else size
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                               check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = None
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+            else:
+                conn = self.idle.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self.lock:
+                self.opened -= 1
 
 class SecurityDB:
-    def __init__(self, db_path="app_security.db"):
+    # Constant SQL strings, so each connection's statement cache reuses the prepared statements
+    SQL_EXISTS = "SELECT 1 FROM users WHERE username=?"
+    SQL_INSERT = "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)"
+    SQL_LOOKUP = "SELECT password_hash, role FROM users WHERE username=?"
+    SQL_REHASH = "UPDATE users SET password_hash=? WHERE username=? AND password_hash=?"
+
+    def __init__(self, db_path="app_security.db", pool_size=4):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.sessions = SessionStore()
+        # bcrypt cost for new hashes, from calibrate() (None: bcrypt's default)
+        self.rounds = SettingsHandler.get("bcrypt_rounds")
+        self.auth_workers = None # Created on the first authenticate_async/calibrate_async
+        self.auth_lock = threading.Lock()
         self.init_db()
         # Seed admin account if not exists
         if not self.user_exists("admin"):
             self.create_account("admin", "admin123", "admin")
 
     def init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS users (
                     username TEXT PRIMARY KEY,
@@ -19,27 +151,136 @@ class SecurityDB:
                     role TEXT DEFAULT 'developer'
                 )
             """)
-            conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """Pooled connection inside BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error)."""
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
 
     def user_exists(self, username):
-        with sqlite3.connect(self.db_path) as conn:
-            return conn.execute("SELECT 1 FROM users WHERE username=?", (username,)).fetchone() is not None
+        with self.pool.connection() as conn:
+            return conn.execute(self.SQL_EXISTS, (username,)).fetchone() is not None
 
     def create_account(self, username, password, role='developer'):
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        hashed = hash_password(password, self.rounds)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", 
-                             (username, hashed, role))
-                conn.commit()
+            with self.transaction() as conn:
+                conn.execute(self.SQL_INSERT, (username, hashed, role))
             return True
         except sqlite3.IntegrityError:
             return False
 
+    def create_accounts(self, accounts, workers=None):
+        """Bulk create_account for (username, password) or (username, password, role) rows.
+
+        Passwords are hashed in parallel (see hash_passwords) and all rows are inserted
+        in one transaction. Returns [(username, created)] in input order; created is False
+        for existing usernames and for repeats within the batch.
+        """
+        rows = []
+        seen = set()
+        results = []
+        for account in accounts:
+            username, password = account[0], account[1]
+            role = account[2] if len(account) > 2 and account[2] else 'developer'
+            results.append([username, False])
+            if username not in seen:
+                seen.add(username)
+                rows.append((len(results) - 1, username, password, role))
+
+        # Skip the (slow) hashing for accounts that already exist
+        with self.pool.connection() as conn:
+            existing = {u for u in seen if conn.execute(self.SQL_EXISTS, (u,)).fetchone()}
+        rows = [r for r in rows if r[1] not in existing]
+        hashes = hash_passwords([r[2] for r in rows], workers, self.rounds)
+
+        with self.transaction() as conn:
+            # Accounts created by someone else while we were hashing
+            rows = [(r, h) for r, h in zip(rows, hashes)
+                    if conn.execute(self.SQL_EXISTS, (r[1],)).fetchone() is None]
+            conn.executemany(self.SQL_INSERT, [(r[1], h, r[3]) for r, h in rows])
+        for r, _ in rows:
+            results[r[0]][1] = True
+        return [tuple(r) for r in results]
+
+    def import_accounts_csv(self, path, workers=None):
+        """create_accounts from a CSV file with username,password[,role] columns.
+        A header row naming the columns (in any order) is optional."""
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [row for row in csv.reader(f) if any(c.strip() for c in row)]
+        order = [0, 1, 2]
+        first = 1
+        header = [c.strip().lower() for c in rows[0]] if rows else []
+        if 'username' in header and 'password' in header:
+            order = [header.index(c) for c in ('username', 'password', 'role') if c in header]
+            rows.pop(0)
+            first = 2
+        accounts = []
+        for line, row in enumerate(rows, first):
+            account = [row[i] if i < len(row) else '' for i in order]
+            if not account[0].strip() or not account[1]:
+                raise Exception(f"Invalid account row {line} in {path}: expected username,password[,role]")
+            accounts.append([account[0].strip(), account[1]] + [c.strip() for c in account[2:]])
+        return self.create_accounts(accounts, workers)
+
     def authenticate(self, username, password):
-        with sqlite3.connect(self.db_path) as conn:
-            user = conn.execute("SELECT password_hash, role FROM users WHERE username=?", (username,)).fetchone()
-            if user and bcrypt.checkpw(password.encode('utf-8'), user[0]):
-                return True, user[1]
+        with self.pool.connection() as conn:
+            user = conn.execute(self.SQL_LOOKUP, (username,)).fetchone()
+        # The connection goes back to the pool before the (slow) hash check
+        if user and bcrypt.checkpw(password.encode('utf-8'), user[0]):
+            if self.rounds is not None and hash_rounds(user[0]) != self.rounds:
+                self.rehash(username, password, user[0])
+            return True, user[1]
         return False, None
+
+    def rehash(self, username, password, old_hash):
+        """Re-hashes a verified password at the current cost. Skipped if the stored hash
+        changed meanwhile; a failure only means trying again on the next login."""
+        new_hash = hash_password(password, self.rounds)
+        try:
+            with self.transaction() as conn:
+                conn.execute(self.SQL_REHASH, (new_hash, username, old_hash))
+        except sqlite3.Error:
+            pass
+
+    def calibrate(self, target_ms=None):
+        """Picks the work factor for the "bcrypt_target_ms" latency on this machine and
+        stores it as the "bcrypt_rounds" setting. Existing hashes move to it on login."""
+        if target_ms is None:
+            target_ms = SettingsHandler.get("bcrypt_target_ms", DEFAULT_TARGET_MS)
+        self.rounds = calibrate_rounds(target_ms)
+        SettingsHandler.set("bcrypt_rounds", self.rounds)
+        return self.rounds
+
+    def calibrate_async(self, target_ms=None):
+        return self.workers().submit(self.calibrate, target_ms)
+
+    def login(self, username, password):
+        """authenticate() plus a session token: (success, role, token)."""
+        success, role = self.authenticate(username, password)
+        if not success:
+            return False, None, None
+        return True, role, self.sessions.issue(username, role)
+
+    def authenticate_async(self, username, password):
+        """Runs login() on a worker thread (bcrypt releases the GIL while hashing) and
+        returns a concurrent.futures.Future of (success, role, token)."""
+        return self.workers().submit(self.login, username, password)
+
+    def workers(self):
+        with self.auth_lock:
+            if self.auth_workers is None:
+                self.auth_workers = ThreadPoolExecutor(max_workers=2, thread_name_prefix="auth")
+            return self.auth_workers
+
+    def close(self):
+        if self.auth_workers is not None:
+            self.auth_workers.shutdown(wait=False)
+        self.pool.close()
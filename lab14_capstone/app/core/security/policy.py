@@ -0,0 +1,151 @@
+import os
+import re
+from app.core.settings import SettingsHandler
+
+ALL_VERBS = ('CREATE', 'PATCH', 'DELETE', 'RUN', 'FETCH_FIGMA')
+
+# Defaults, overridable with the "path_policy" and "role_verbs" settings:
+#   "path_policy": {"allow": ["src/**", "*.py"], "deny": [".env"]}
+#   "role_verbs": {"admin": ["CREATE", "PATCH", "DELETE", "RUN", "FETCH_FIGMA"], "*": ["CREATE", "PATCH"]}
+DEFAULT_ALLOW = ('**',)
+DEFAULT_DENY = ('.marvelcode', '.git') # IDE state and version control
+DEFAULT_ROLE_VERBS = {
+    'admin': ALL_VERBS,
+    '*': ('CREATE', 'PATCH', 'DELETE', 'FETCH_FIGMA'), # Any other role
+}
+
+def glob_to_regex(pattern):
+    """Regex source for a project-relative glob: '*' and '?' stay within one folder,
+    '**' spans folders, a pattern without '/' matches at any depth, and a pattern
+    that names a folder also covers everything inside it."""
+    pattern = pattern.replace('\\', '/').strip('/')
+    anchored = '/' in pattern
+    if pattern.endswith('/**'):
+        pattern = pattern[:-3] # 'dir/**' covers 'dir' itself too (see the suffix below)
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    body = ''.join(out)
+    if not anchored:
+        body = '(?:.*/)?' + body
+    return body + '(?:/.*)?'
+
+def compile_globs(patterns):
+    """One regex for a whole list of globs (None if the list is empty)."""
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0 # Case-insensitive file systems
+    return re.compile('(?:' + '|'.join(glob_to_regex(p) for p in patterns) + ')', flags)
+
+class PathPolicy:
+    """Allow/deny globs and per-role verbs, compiled once.
+
+    A path is accepted when it resolves (symlinks included) inside the project root,
+    matches an allow glob and no deny glob.
+    """
+    def __init__(self, allow=DEFAULT_ALLOW, deny=DEFAULT_DENY, role_verbs=None):
+        self.allow = compile_globs(list(allow))
+        self.allow_all = '**' in allow
+        self.deny = compile_globs(list(deny))
+        role_verbs = role_verbs or DEFAULT_ROLE_VERBS
+        self.role_verbs = {role: frozenset(verbs) for role, verbs in role_verbs.items()}
+        self.default_verbs = self.role_verbs.get('*', frozenset())
+
+    @staticmethod
+    def from_settings():
+        paths = SettingsHandler.get("path_policy", {}) or {}
+        return PathPolicy(allow=paths.get("allow", DEFAULT_ALLOW),
+                          deny=paths.get("deny", DEFAULT_DENY),
+                          role_verbs=SettingsHandler.get("role_verbs"))
+
+    def verbs_for(self, role):
+        return self.role_verbs.get(role, self.default_verbs)
+
+    def allows(self, rel):
+        """rel is the '/'-separated path relative to the root ('' for the root itself)."""
+        if not self.allow_all and (self.allow is None or not self.allow.fullmatch(rel)):
+            return False
+        return self.deny is None or not self.deny.fullmatch(rel)
+
+class PathResolver:
+    """Resolves command paths against a root, with symlinks resolved like realpath.
+    Each folder is resolved and scanned for symlinks once, so checking a file is a
+    set lookup instead of an lstat. Meant to live for one audit: the tree may change."""
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self.root_prefix = os.path.join(self.root, '')
+        self.folders = {} # absolute folder -> (real path, names of the symlinks inside)
+        self.rel_folders = {} # relative folder -> (real relative path or None, symlink names)
+
+    def relative(self, file):
+        """'/'-separated path of file relative to the root, or None if it resolves outside."""
+        parts = file.replace('\\', '/').split('/')
+        if '..' in parts:
+            # '..' after a symlink goes up from the link target: let the OS semantics decide
+            return self.relative_of(os.path.realpath(os.path.join(self.root, file)))
+        if '' in parts or '.' in parts or os.path.isabs(file):
+            return self.relative_of(self.resolve(os.path.abspath(os.path.join(self.root, file))))
+        # Already normalized (the usual case): only the folder needs resolving, once
+        name = parts.pop()
+        folder = '/'.join(parts)
+        info = self.rel_folders.get(folder)
+        if info is None:
+            real = self.resolve(os.path.join(self.root, *parts)) if parts else self.root
+            info = self.rel_folders[folder] = (self.relative_of(real), self.folder_info(real)[1])
+        real_rel, links = info
+        if name in links:
+            return self.relative_of(os.path.realpath(os.path.join(self.root, *parts, name)))
+        if real_rel is None:
+            return None
+        return f"{real_rel}/{name}" if real_rel else name
+
+    def relative_of(self, real):
+        if real == self.root:
+            return ''
+        if os.path.normcase(real).startswith(os.path.normcase(self.root_prefix)):
+            return real[len(self.root_prefix):].replace(os.sep, '/')
+        return None
+
+    def resolve(self, path):
+        """realpath(path) for a normalized absolute path."""
+        folder, name = os.path.split(path)
+        if not name:
+            return path
+        real_folder, links = self.folder_info(folder)
+        candidate = os.path.join(real_folder, name)
+        if name in links:
+            return os.path.realpath(candidate)
+        return candidate
+
+    def folder_info(self, folder):
+        info = self.folders.get(folder)
+        if info is None:
+            info = self.folders[folder] = self.scan(folder)
+        return info
+
+    def scan(self, folder):
+        if folder == self.root or not folder.startswith(self.root_prefix):
+            real = os.path.realpath(folder)
+        else:
+            real = self.resolve(folder)
+        try:
+            with os.scandir(real) as entries:
+                links = {e.name for e in entries if e.is_symlink()}
+        except OSError:
+            links = set() # Missing folder: nothing inside can be a link yet
+        return real, links
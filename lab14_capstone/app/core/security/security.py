@@ -1,18 +1,36 @@
 import os
+from .policy import PathPolicy, PathResolver
 
 class SecurityEngine:
-    def __init__(self, base_path):
+    def __init__(self, base_path, policy=None):
         self.base_path = os.path.abspath(base_path)
+        # Compiled once: allow/deny globs and per-role verbs (see PathPolicy)
+        self.policy = policy or PathPolicy.from_settings()
 
     def audit_ast(self, ast, role="USER"):
         audited = []
+        verbs = self.policy.verbs_for(role)
+        resolver = PathResolver(self.base_path)
+        verdicts = {} # file -> error message or None, so repeated files cost one lookup
         for cmd in ast:
-            file_path = os.path.abspath(os.path.join(self.base_path, cmd['file']))
-            if not file_path.startswith(self.base_path):
-                raise Exception(f"SECURITY ALERT: Path traversal detected: {cmd['file']}")
-            
-            if cmd['type'] == 'RUN' and role != 'admin':
-                raise Exception(f"SECURITY ALERT: Unauthorized RUN command for role {role}")
-            
+            if cmd.type != 'FETCH_FIGMA': # FETCH_FIGMA targets a URL, not a path
+                if cmd.file in verdicts:
+                    error = verdicts[cmd.file]
+                else:
+                    error = verdicts[cmd.file] = self.check_path(resolver, cmd.file)
+                if error:
+                    raise Exception(error)
+
+            if cmd.type not in verbs:
+                raise Exception(f"SECURITY ALERT: Unauthorized {cmd.type} command for role {role}")
+
             audited.append(cmd)
         return audited
+
+    def check_path(self, resolver, file):
+        rel = resolver.relative(file)
+        if rel is None:
+            return f"SECURITY ALERT: Path traversal detected: {file}"
+        if not self.policy.allows(rel):
+            return f"SECURITY ALERT: Path denied by policy: {file}"
+        return None
@@ -0,0 +1,53 @@
+import secrets
+import threading
+import time
+
+class SessionStore:
+    """In-memory session tokens issued after a successful login.
+
+    A token maps to (username, role) so role checks are a dict lookup instead of a
+    new bcrypt verification. Sessions expire after ttl seconds without use.
+    """
+    def __init__(self, ttl=8 * 3600):
+        self.ttl = ttl
+        self.sessions = {} # token -> [username, role, expires_at]
+        self.lock = threading.Lock()
+
+    def issue(self, username, role):
+        token = secrets.token_urlsafe(32)
+        with self.lock:
+            self.purge_expired()
+            self.sessions[token] = [username, role, time.monotonic() + self.ttl]
+        return token
+
+    def get(self, token):
+        """(username, role) for a live token, or None. Using a token extends it."""
+        with self.lock:
+            session = self.sessions.get(token)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if session[2] < now:
+                del self.sessions[token]
+                return None
+            session[2] = now + self.ttl
+            return session[0], session[1]
+
+    def role(self, token):
+        session = self.get(token)
+        return session[1] if session else None
+
+    def revoke(self, token):
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def revoke_user(self, username):
+        """Ends every session of username (e.g. after a password or role change)."""
+        with self.lock:
+            for token in [t for t, s in self.sessions.items() if s[0] == username]:
+                del self.sessions[token]
+
+    def purge_expired(self):
+        now = time.monotonic()
+        for token in [t for t, s in self.sessions.items() if s[2] < now]:
+            del self.sessions[token]
@@ -1,30 +1,166 @@
+import atexit
+import copy
 import json
 import os
+import shutil
+import tempfile
+import threading
+import time
 
 class SettingsHandler:
+    """settings.json behind a process-wide cache.
+
+    Reads reload the file only when its mtime/size changes. Writes update the cache at
+    once and reach the disk in one atomic write (temp file + rename) DEBOUNCE_SECONDS
+    after the last change, or on flush() / interpreter exit.
+    """
     SETTINGS_FILE = "settings.json"
+    DEBOUNCE_SECONDS = 0.5
+
+    _lock = threading.RLock()
+    _cache = None
+    _stamp = None # (path, mtime_ns, size) the cache was read from or written as
+    _pending = {} # Keys changed since the last write
+    _replace = False # save() replaced everything: write the cache as is
+    _timer = None
+    _deadline = 0 # When the debounced write is due
 
     @staticmethod
-    def load():
-        if os.path.exists(SettingsHandler.SETTINGS_FILE):
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return (path, None, None)
+        return (path, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _read(path):
+        if os.path.exists(path):
             try:
-                with open(SettingsHandler.SETTINGS_FILE, "r") as f:
-                    return json.load(f)
+                with open(path, "r") as f:
+                    settings = json.load(f)
+                return settings if isinstance(settings, dict) else {}
             except:
                 return {}
         return {}
 
+    @staticmethod
+    def _current():
+        """The cached settings, reloaded if the file changed on disk (call with _lock held)."""
+        cls = SettingsHandler
+        path = cls.SETTINGS_FILE
+        if cls._stamp is not None and cls._stamp[0] != path:
+            cls.flush() # SETTINGS_FILE was pointed elsewhere: finish the old file first
+        stamp = cls._stat(path)
+        if cls._cache is None or stamp != cls._stamp:
+            if cls._replace:
+                pass # The pending save() wins over the file
+            else:
+                cls._cache = cls._read(path)
+                cls._cache.update(cls._pending) # Unwritten changes win over the file
+            cls._stamp = stamp
+        return cls._cache
+
+    @staticmethod
+    def load():
+        with SettingsHandler._lock:
+            return copy.deepcopy(SettingsHandler._current())
+
     @staticmethod
     def save(settings):
-        with open(SettingsHandler.SETTINGS_FILE, "w") as f:
-            json.dump(settings, f, indent=4)
+        cls = SettingsHandler
+        with cls._lock:
+            cls._current()
+            cls._cache = copy.deepcopy(settings)
+            cls._pending = {}
+            cls._replace = True
+            cls._schedule()
 
     @staticmethod
     def get(key, default=None):
-        return SettingsHandler.load().get(key, default)
+        with SettingsHandler._lock:
+            value = SettingsHandler._current().get(key, default)
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value) # Callers may modify it
+        return value
 
     @staticmethod
     def set(key, value):
-        settings = SettingsHandler.load()
-        settings[key] = value
-        SettingsHandler.save(settings)
+        SettingsHandler.update({key: value})
+
+    @staticmethod
+    def update(values):
+        """Sets several keys at once (one write)."""
+        cls = SettingsHandler
+        with cls._lock:
+            values = copy.deepcopy(dict(values))
+            cls._current().update(values)
+            cls._pending.update(values)
+            cls._schedule()
+
+    @staticmethod
+    def _schedule():
+        # Moving the deadline is enough: a running timer re-arms itself until it passes
+        cls = SettingsHandler
+        cls._deadline = time.monotonic() + cls.DEBOUNCE_SECONDS
+        if cls._timer is None:
+            cls._start_timer(cls.DEBOUNCE_SECONDS)
+
+    @staticmethod
+    def _start_timer(delay):
+        cls = SettingsHandler
+        cls._timer = threading.Timer(delay, cls._on_timer)
+        cls._timer.daemon = True
+        cls._timer.start()
+
+    @staticmethod
+    def _on_timer():
+        cls = SettingsHandler
+        with cls._lock:
+            if threading.current_thread() is not cls._timer:
+                return # Cancelled by a flush()
+            remaining = cls._deadline - time.monotonic()
+            if remaining > 0:
+                cls._start_timer(remaining)
+                return
+        cls.flush()
+
+    @staticmethod
+    def flush():
+        """Writes pending changes now."""
+        cls = SettingsHandler
+        with cls._lock:
+            if cls._timer is not None:
+                cls._timer.cancel()
+                cls._timer = None
+            if not cls._pending and not cls._replace:
+                return
+            path = cls._stamp[0] if cls._stamp else cls.SETTINGS_FILE
+            settings = cls._cache
+            if not cls._replace and cls._stat(path) != cls._stamp:
+                # Edited on disk since we read it: keep those edits, apply ours on top
+                settings = cls._read(path)
+                settings.update(cls._pending)
+            folder = os.path.dirname(os.path.abspath(path))
+            fd, tmp = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=folder)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(settings, f, indent=4)
+                if os.path.exists(path):
+                    shutil.copymode(path, tmp)
+                else:
+                    os.chmod(tmp, 0o644) # mkstemp creates it private
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            cls._pending = {}
+            cls._replace = False
+            if path == cls.SETTINGS_FILE:
+                cls._cache = settings
+                cls._stamp = cls._stat(path)
+            else:
+                cls._cache = None
+                cls._stamp = None
+
+atexit.register(SettingsHandler.flush)
@@ -0,0 +1,190 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from app.core.chat_manager import ChatManager
+from app.core.chat_store import ChatStore
+
+class SqliteChatManager(ChatStore):
+    """ChatManager backed by .marvelcode/chats.db, with full-text search.
+
+    Same API as ChatManager. Opening a project reads only the chat list; histories are
+    loaded on first use (at most MAX_LOADED stay in memory) and search() runs on an
+    FTS5 index over the message text (a LIKE scan where SQLite lacks FTS5).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS chats (id TEXT PRIMARY KEY, name TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY,
+            chat_id TEXT NOT NULL REFERENCES chats(id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            sender TEXT NOT NULL,
+            message TEXT NOT NULL,
+            UNIQUE (chat_id, seq)
+        );
+    """
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(message, content='messages', content_rowid='id');
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, message) VALUES (new.id, new.message);
+        END;
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        END;
+    """
+    SQL_HISTORY = "SELECT seq, sender, message FROM messages WHERE chat_id=? ORDER BY seq"
+    SQL_PAGE = "SELECT seq, sender, message FROM messages WHERE chat_id=? AND seq<? ORDER BY seq DESC LIMIT ?"
+    SQL_LAST_SEQ = "SELECT COALESCE(MAX(seq), 0) FROM messages WHERE chat_id=?"
+    SQL_INSERT = "INSERT INTO messages (chat_id, seq, sender, message) VALUES (?, ?, ?, ?)"
+    SQL_SEARCH = """
+        SELECT m.chat_id, c.name, m.seq, m.sender, snippet(messages_fts, 0, '[', ']', '...', 12)
+        FROM messages_fts
+        JOIN messages m ON m.id = messages_fts.rowid
+        JOIN chats c ON c.id = m.chat_id
+        WHERE messages_fts MATCH ?
+        ORDER BY bm25(messages_fts), m.id DESC
+        LIMIT ? OFFSET ?
+    """
+    SQL_SEARCH_LIKE = """
+        SELECT m.chat_id, c.name, m.seq, m.sender, substr(m.message, 1, 120)
+        FROM messages m JOIN chats c ON c.id = m.chat_id
+        WHERE {}
+        ORDER BY m.id DESC
+        LIMIT ? OFFSET ?
+    """
+
+    def __init__(self, project_path):
+        super().__init__() # loaded: chat_id -> [history, last seq]; lock also guards the connection
+        self.project_path = project_path
+        self.storage_path = os.path.join(project_path, ".marvelcode", "chats.db")
+        self.ensure_storage()
+        self.chats = self.load_chats()
+
+    def ensure_storage(self):
+        os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.storage_path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(self.SCHEMA)
+        try:
+            self.conn.executescript(self.FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError: # SQLite built without FTS5
+            self.fts = False
+        if self.conn.execute("SELECT 1 FROM chats LIMIT 1").fetchone() is None:
+            self.import_chats()
+
+    def import_chats(self):
+        """First start: copies the JSON chat store (chats/ or chats.json) if the project has one."""
+        marvel = os.path.dirname(self.storage_path)
+        if os.path.exists(os.path.join(marvel, "chats", "index.json")) or os.path.exists(os.path.join(marvel, "chats.json")):
+            source = ChatManager(self.project_path)
+            chats, active = source.chats["chats"], source.chats.get("active_chat_id", "default")
+        else:
+            source, chats, active = None, {"default": {"name": "Default Chat"}}, "default"
+        with self.transaction():
+            for chat_id, chat in chats.items():
+                self.conn.execute("INSERT INTO chats (id, name) VALUES (?, ?)", (chat_id, chat["name"]))
+                history = source.get_history(chat_id) if source else []
+                self.conn.executemany(self.SQL_INSERT, ((chat_id, seq, m["sender"], m["message"])
+                                                        for seq, m in enumerate(history, 1)))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('active_chat_id', ?)", (active,))
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error), holding the lock throughout."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def load_chats(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT id, name FROM chats ORDER BY rowid").fetchall()
+            active = self.conn.execute("SELECT value FROM meta WHERE key='active_chat_id'").fetchone()
+        chats = {chat_id: {"name": name} for chat_id, name in rows}
+        active_id = active[0] if active and active[0] in chats else next(iter(chats), "default")
+        return {"active_chat_id": active_id, "chats": chats}
+
+    def save_chats(self):
+        """Stores the active chat (names are saved by add_chat/rename_chat)."""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('active_chat_id', ?)",
+                              (self.chats["active_chat_id"],))
+
+    def read_history(self, chat_id):
+        with self.lock:
+            rows = self.conn.execute(self.SQL_HISTORY, (chat_id,)).fetchall()
+        history = [{"sender": sender, "message": message} for _, sender, message in rows]
+        return [history, rows[-1][0] if rows else 0]
+
+    def read_page(self, chat_id, limit, before):
+        """Only the page is read for a chat that is not loaded."""
+        last = 2 ** 62 if before is None else before
+        with self.lock:
+            rows = self.conn.execute(self.SQL_PAGE, (chat_id, last, limit)).fetchall()[::-1]
+        return (rows[0][0] if rows else 1), [{"sender": s, "message": m} for _, s, m in rows]
+
+    def add_chat(self, chat_id, name):
+        with self.transaction():
+            self.conn.execute("DELETE FROM messages WHERE chat_id=?", (chat_id,))
+            self.conn.execute("INSERT OR REPLACE INTO chats (id, name) VALUES (?, ?)", (chat_id, name))
+        self.forget(chat_id)
+        self.chats["chats"][chat_id] = {"name": name}
+
+    def add_message(self, chat_id, sender, message):
+        if chat_id in self.chats["chats"]:
+            with self.lock:
+                entry = self.loaded.get(chat_id)
+                if entry is not None:
+                    seq = entry[1] + 1
+                else: # No need to load the history just to append to it
+                    seq = self.conn.execute(self.SQL_LAST_SEQ, (chat_id,)).fetchone()[0] + 1
+                self.conn.execute(self.SQL_INSERT, (chat_id, seq, sender, message))
+                if entry is not None:
+                    entry[1] = seq
+                    entry[0].append({"sender": sender, "message": message})
+
+    def rename_chat(self, chat_id, new_name):
+        if chat_id in self.chats["chats"]:
+            with self.lock:
+                self.conn.execute("UPDATE chats SET name=? WHERE id=?", (new_name, chat_id))
+            self.chats["chats"][chat_id]["name"] = new_name
+
+    def delete_chat(self, chat_id):
+        if chat_id in self.chats["chats"] and len(self.chats["chats"]) > 1:
+            with self.transaction():
+                self.conn.execute("DELETE FROM messages WHERE chat_id=?", (chat_id,))
+                self.conn.execute("DELETE FROM chats WHERE id=?", (chat_id,))
+            self.forget(chat_id)
+            del self.chats["chats"][chat_id]
+            if self.chats["active_chat_id"] == chat_id:
+                self.chats["active_chat_id"] = list(self.chats["chats"].keys())[0]
+            self.save_chats()
+
+    def search(self, query, limit=20, offset=0):
+        """Messages of every chat matching all words of query, best match first.
+        Returns dicts with chat_id, chat_name, seq (1-based position), sender and snippet."""
+        words = query.split()
+        if not words:
+            return []
+        with self.lock:
+            if self.fts:
+                # Each word quoted: the user's text is never parsed as FTS5 query syntax
+                match = " ".join('"' + w.replace('"', '""') + '"' for w in words)
+                rows = self.conn.execute(self.SQL_SEARCH, (match, limit, offset)).fetchall()
+            else:
+                where = " AND ".join(["m.message LIKE ? ESCAPE '\\'"] * len(words))
+                patterns = ["%" + w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for w in words]
+                rows = self.conn.execute(self.SQL_SEARCH_LIKE.format(where), (*patterns, limit, offset)).fetchall()
+        return [{"chat_id": chat_id, "chat_name": name, "seq": seq, "sender": sender, "snippet": snippet}
+                for chat_id, name, seq, sender, snippet in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,178 @@
+"""Span-based tracing for the CEIL pipeline (lexer, parser, audit, executor).
+
+Instrumented code wraps its work in `with tracing.span(name):`. While no tracer is
+started that returns a shared no-op object, so disabled tracing costs one global
+lookup per span. A started Tracer records wall time, thread CPU time, bytes read and
+written (reported with add_io) and exports Chrome trace-event JSON, viewable in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+import json
+import os
+import threading
+import time
+
+_active = None # The running Tracer, if any
+_local = threading.local() # Per-thread stack of open spans
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __bool__(self):
+        return False
+
+    def add(self, **counters):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start', 'cpu_start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        cpu = time.thread_time() - self.cpu_start
+        _local.stack.pop()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self, end, cpu)
+        return False
+
+    def add(self, **counters):
+        for key, value in counters.items():
+            self.args[key] = self.args.get(key, 0) + value
+
+def span(name, cat="pipeline", **args):
+    """Context manager timing a block. args become the trace event arguments."""
+    tracer = _active
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, cat, args)
+
+def add_io(read=0, written=0):
+    """Adds byte counts to the innermost open span of this thread."""
+    if _active is None:
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1].add(bytes_read=read, bytes_written=written)
+
+def file_io(path, direction):
+    """Adds the current size of path as bytes 'read' or 'written' (stat only when tracing)."""
+    if _active is None:
+        return
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    add_io(**{direction: size})
+
+def enabled():
+    return _active is not None
+
+def start():
+    global _active
+    _active = Tracer()
+    return _active
+
+def stop():
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+def _trace_order(name):
+    """Export order of a trace file name: its time, then its suffix (_2 before _10)."""
+    stem = name[len("trace_"):-len(".json")] # YYYYmmdd_HHMMSS[_n]
+    suffix = stem[16:]
+    return stem[:15], int(suffix) if suffix.isdigit() else 0
+
+class Tracer:
+    KEEP_TRACES = 20 # Older trace files are deleted on export
+
+    def __init__(self):
+        self.events = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+
+    def record(self, span, end, cpu):
+        event = {
+            "name": span.name,
+            "cat": span.cat,
+            "ph": "X",
+            "ts": round((span.start - self.origin) * 1e6, 1),
+            "dur": round((end - span.start) * 1e6, 1),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": dict(span.args, cpu_ms=round(cpu * 1000, 3)),
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def export(self, folder):
+        """Writes trace_<time>.json into folder and returns its path."""
+        os.makedirs(folder, exist_ok=True)
+        traces = [n for n in os.listdir(folder) if n.startswith("trace_") and n.endswith(".json")]
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        # Named after every trace of this second, so it sorts last even once older ones are deleted
+        taken = [suffix for when, suffix in map(_trace_order, traces) if when == stamp]
+        name = f"trace_{stamp}_{max(taken) + 1}.json" if taken else f"trace_{stamp}.json"
+        path = os.path.join(folder, name)
+        with self.lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w") as f:
+            json.dump(data, f)
+        traces = sorted(traces + [name], key=_trace_order)
+        for name in traces[:-self.KEEP_TRACES]:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+        return path
+
+    def totals(self):
+        """Aggregates: wall ms per pipeline stage, command count, subprocess ms and bytes."""
+        stages = {}
+        commands = 0
+        subprocess_ms = 0.0
+        read = written = 0
+        with self.lock:
+            events = list(self.events)
+        for event in events:
+            ms = event["dur"] / 1000
+            if event["cat"] == "pipeline":
+                stages[event["name"]] = stages.get(event["name"], 0.0) + ms
+            elif event["cat"] == "command":
+                commands += event["args"].get("commands", 1)
+            elif event["cat"] == "subprocess":
+                subprocess_ms += ms
+            read += event["args"].get("bytes_read", 0)
+            written += event["args"].get("bytes_written", 0)
+        return {"stages": stages, "commands": commands, "subprocess_ms": subprocess_ms,
+                "bytes_read": read, "bytes_written": written}
+
+    def summary(self):
+        t = self.totals()
+        stages = " | ".join(f"{name} {ms:.1f} ms" for name, ms in t["stages"].items())
+        return (f"{stages} | {t['commands']} commands, subprocess {t['subprocess_ms']:.1f} ms, "
+                f"{t['bytes_read']} B read, {t['bytes_written']} B written")
@@ -14,15 +14,28 @@ from app.core.settings import SettingsHandler
 from app.core.ai_engine.ai_engine import CeilAIEngine
 from app.core.compiler.lexer import CeilLexer
 from app.core.compiler.parser import CeilParser
+from app.core.compiler.stream import CeilStream
+from app.core.compiler.cache import ProgramCache
+from app.core.compiler.plan_format import save_plan, load_plan
 from app.core.security.security import SecurityEngine
 from app.core.executor.executor import CeilExecutor
+from app.core.executor.async_runner import AsyncRunEngine
+from app.core.executor.warm_runner import WarmRunner
+from app.core.executor.run_cache import RunCache
+from app.core.executor.run_limits import RunLimits
 from app.core.chat_manager import ChatManager
+from app.core.sqlite_chat_manager import SqliteChatManager
+from app.core.history_window import DEFAULT_BUDGET
+from app.core import tracing
 import threading
 import time
 import subprocess
 import queue
 
 class SecureIDE(tk.Tk):
+    CHAT_PAGE = 40 # Messages rendered at a time when opening a chat or scrolling up
+    CHAT_WINDOW = 160 # Most messages kept in the chat widget
+
     def __init__(self):
         super().__init__()
         self.title("Marvel Code")
@@ -52,33 +65,73 @@ class SecureIDE(tk.Tk):
         self.all_project_items = [] 
         self.recursion_depth = 0
         self.current_user = None
-        self.current_user_role = None
+        self.session_token = None # Role checks go through db.sessions (see current_user_role)
         self.pending_instructions = None # Mission 3: Staging Area
+        self.pending_plan = None # Parsed plan restored from .marvelcode after a restart
         self.terminal_tabs = {} # Store terminal objects
         self.active_terminal_id = None
         self.chat_manager = None
         self.active_chat_id = "default"
+        # Rendered slice of the active chat: seqs chat_first_seq..chat_last_seq, each
+        # message behind a "msg<seq>" mark; newer ones were dropped if chat_tail_trimmed
+        self.chat_first_seq = 1
+        self.chat_last_seq = 0
+        self.chat_tail_trimmed = False
+        self.chat_page_pending = False # A page load is scheduled
         self.is_ai_processing = False
         self.timer_line_index = None
         
         self.db = SecurityDB()
+        if SettingsHandler.get("bcrypt_rounds") is None:
+            self.db.calibrate_async() # First start: size bcrypt's cost to this machine
         self.lexer = CeilLexer()
         self.parser = CeilParser()
+        self.program_cache = ProgramCache()
         self.sec = SecurityEngine(self.project_path or ".")
-        self.exe = CeilExecutor(self.project_path or ".")
+        # RUN commands stream their output live into the system terminal
+        self.run_output = queue.Queue() # (label, stream, line) from the RUN engine thread
+        self.run_engine = AsyncRunEngine(on_output=self.on_run_output)
+        self.runner = self.run_engine
+        if SettingsHandler.get("warm_run", False):
+            # Opt-in: scripts fork from a pre-warmed interpreter (output shows when the RUN ends)
+            self.runner = WarmRunner(fallback=self.run_engine)
+            self.runner.warm_up()
+        self.exe = CeilExecutor(self.project_path or ".", runner=self.runner)
         self.ai = CeilAIEngine()
         
         self.configure_styles()
         self.create_menu()
         self.setup_layout()
+        self.poll_run_output()
         
         self.editor.bind("<KeyRelease>", self.auto_save)
         
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
         self.withdraw() # Hide until login
         self.perform_login()
         
         self.log("System Ready. Type '@' for Context Palette.", "SYSTEM")
 
+    def destroy(self):
+        """Closing the window (from any launcher, e.g. the notebook) saves what is
+        still queued: chat messages, debounced settings. Then stops the RUN backends."""
+        if getattr(self, "closing", False):
+            return
+        self.closing = True
+        try:
+            if self.chat_manager:
+                self.chat_manager.close()
+        except Exception as e:
+            print(f"Chat history could not be saved: {e}", file=sys.stderr)
+        try:
+            SettingsHandler.flush()
+        except Exception as e:
+            print(f"Settings could not be saved: {e}", file=sys.stderr)
+        if self.runner is not self.run_engine:
+            self.runner.close()
+        self.run_engine.close()
+        super().destroy()
+
     def configure_styles(self):
         style = ttk.Style()
         style.theme_use("clam")
@@ -102,7 +155,7 @@ class SecureIDE(tk.Tk):
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Open Project Folder...", command=self.open_project)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self.destroy)
         menubar.add_cascade(label="File", menu=file_menu)
         self.config(menu=menubar)
 
@@ -186,6 +239,10 @@ class SecureIDE(tk.Tk):
                                      bg="#334155", fg="white", bd=0, font=("Segoe UI", 10, "bold"), cursor="hand2")
         self.btn_add_term.pack(side=tk.RIGHT, padx=5, pady=2)
 
+        self.btn_stop_run = tk.Button(self.term_header, text=" ■ ", command=self.cancel_runs,
+                                     bg="#334155", fg="#f87171", bd=0, font=("Segoe UI", 10, "bold"), cursor="hand2")
+        self.btn_stop_run.pack(side=tk.RIGHT, padx=0, pady=2)
+
         # Content Area for Terminals
         self.term_content = tk.Frame(self.term_container, bg=DeepBlueTheme.BG_TERMINAL)
         self.term_content.pack(fill=tk.BOTH, expand=True)
@@ -233,7 +290,7 @@ class SecureIDE(tk.Tk):
         
         # FIX: Ensure scrollbar is correctly linked to the text widget
         self.chat_scroll = ttk.Scrollbar(chat_scroll_frame, orient="vertical", command=self.chat_history.yview)
-        self.chat_history.configure(yscrollcommand=self.chat_scroll.set)
+        self.chat_history.configure(yscrollcommand=self.on_chat_scroll)
 
         self.chat_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.chat_history.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -411,8 +468,25 @@ class SecureIDE(tk.Tk):
         
         return "break" # Prevent default newline insertion
 
+    @property
+    def current_user_role(self):
+        """Role of the logged-in session: a token lookup, no bcrypt involved."""
+        return self.db.sessions.role(self.session_token)
+
+    def session_alive(self):
+        """False (and back to the login window) once the session expired; called
+        before any action whose audit needs the role."""
+        if self.current_user_role is not None:
+            return True
+        self.log("Session expired after inactivity. Please log in again.", "SYSTEM")
+        self.db.sessions.revoke(self.session_token)
+        self.session_token = None
+        self.withdraw()
+        self.perform_login(relogin=True)
+        return False
+
     # --- HELPERS ---
-    def perform_login(self):
+    def perform_login(self, relogin=False):
         login_win = tk.Toplevel(self)
         login_win.title("MarvelCode - Mission Control Login")
         login_win.state('zoomed') # Mission 1: Professional Maximized State
@@ -435,22 +509,45 @@ class SecureIDE(tk.Tk):
         pass_ent.pack(ipady=10)
         
         def attempt_login(event=None):
+            if str(btn_login['state']) == tk.DISABLED:
+                return # A check is already running
             u, p = user_ent.get(), pass_ent.get()
-            success, role = self.db.authenticate(u, p)
+            btn_login.config(state=tk.DISABLED, text="VERIFYING...")
+            # bcrypt runs on a worker thread so the window keeps repainting meanwhile
+            future = self.db.authenticate_async(u, p)
+
+            def poll():
+                if not future.done():
+                    login_win.after(30, poll)
+                    return
+                try:
+                    success, role, token = future.result()
+                except Exception as e:
+                    success, role, token = False, None, None
+                    self.log(f"Login error: {e}", "ERROR")
+                finish_login(u, success, role, token)
+            poll()
+
+        def finish_login(u, success, role, token):
             if success:
                 self.current_user = u
-                self.current_user_role = role
+                self.session_token = token
                 SettingsHandler.set("current_user", u) # Mission 1: Save State
+                # RUN timeout, rlimits and output caps for this role ("run_limits" setting)
+                self.run_engine.limits = RunLimits.for_role(role)
                 
                 self.deiconify()
                 login_win.destroy()
                 self.log(f"Mission Control: {u} authenticated as {role}", "SUCCESS")
+                if relogin:
+                    return # The project is still open
                 
                 # Mission 1: Auto-Mount
                 last_path = SettingsHandler.get("last_project_path")
                 if last_path and os.path.exists(last_path):
                     self.auto_load_project(last_path)
             else:
+                btn_login.config(state=tk.NORMAL, text="AUTHORIZE ACCESS")
                 messagebox.showerror("Security Alert", "Invalid Credentials. Access Denied.")
 
         btn_login = tk.Button(center_frame, text="AUTHORIZE ACCESS", command=attempt_login, 
@@ -459,21 +556,62 @@ class SecureIDE(tk.Tk):
         btn_login.pack(pady=40, ipady=10)
         
         login_win.bind("<Return>", attempt_login)
-        login_win.protocol("WM_DELETE_WINDOW", self.quit)
+        login_win.protocol("WM_DELETE_WINDOW", self.destroy)
 
     def auto_load_project(self, path):
         self.project_path = path
         # Initialize Chat Manager
-        self.chat_manager = ChatManager(path)
+        if self.chat_manager:
+            self.chat_manager.close() # Writes what the previous project still has queued
+        # "chat_store": "sqlite" keeps chats in .marvelcode/chats.db, with full-text search
+        if SettingsHandler.get("chat_store") == "sqlite":
+            self.chat_manager = SqliteChatManager(path)
+        else:
+            self.chat_manager = ChatManager(path)
         self.refresh_chat_selector()
         
         # Refresh components with new path
         self.ai = CeilAIEngine()
         self.sec = SecurityEngine(path)
-        self.exe = CeilExecutor(path)
+        # Opt-in: reuse RUN output while the project's .py files are unchanged
+        run_cache = RunCache(path) if SettingsHandler.get("run_cache", False) else None
+        self.exe = CeilExecutor(path, runner=self.runner, run_cache=run_cache)
         self.populate_file_tree()
         self.log(f"Auto-Mounting Workspace: {path}", "SUCCESS")
         self.file_tree.heading("#0", text=f"PROJECT: {os.path.basename(path)}")
+        self.restore_pending_plan()
+
+    # --- PENDING PLAN PERSISTENCE ---
+    def pending_plan_path(self):
+        return os.path.join(self.project_path, ".marvelcode", "pending_plan.ceilp")
+
+    def save_pending_plan(self, ceil):
+        """Stores the parsed plan in binary form so it survives a restart without re-lexing."""
+        try:
+            ast = CeilParser().set_tokens(CeilLexer().tokenize(ceil)).parse()
+            save_plan(ast, self.pending_plan_path())
+        except Exception as e:
+            self.after(0, lambda msg=str(e): self.log(f"Could not persist pending plan: {msg}", "ERROR"))
+
+    def restore_pending_plan(self):
+        path = self.pending_plan_path()
+        if not os.path.exists(path): return
+        try:
+            # Read into memory rather than mmap so the file can still be replaced on Windows
+            self.pending_plan = load_plan(path, use_mmap=False)
+        except Exception as e:
+            self.log(f"Discarding unreadable pending plan: {e}", "ERROR")
+            self.discard_pending_plan()
+            return
+        self.pending_instructions = None
+        self.btn_confirm.pack(fill=tk.X, pady=(0, 10))
+        self.log(f"Restored pending plan with {len(self.pending_plan)} commands. Execution Button Enabled.", "SYSTEM")
+
+    def discard_pending_plan(self):
+        try:
+            os.remove(self.pending_plan_path())
+        except OSError:
+            pass
 
     def log(self, message, tag="SYSTEM"):
         if 0 not in self.terminal_tabs: return
@@ -485,6 +623,27 @@ class SecureIDE(tk.Tk):
         text_widget.config(state="disabled")
         text_widget.see(tk.END)
 
+    def on_run_output(self, label, stream, line):
+        """Called from the RUN engine thread for every output line of a running command.
+        Only queues the line: Tk calls from that thread could block it on the Tk thread."""
+        self.run_output.put((label, stream, line))
+
+    def poll_run_output(self):
+        """Polls the RUN output queue and logs the lines."""
+        try:
+            while True:
+                label, stream, line = self.run_output.get_nowait()
+                self.log(f"[{label}] {line}", "ERROR" if stream == 'stderr' else "SYSTEM")
+        except queue.Empty:
+            pass
+        self.after(50, self.poll_run_output)
+
+    def cancel_runs(self):
+        count = self.run_engine.cancel_all()
+        if self.runner is not self.run_engine:
+            count += self.runner.cancel_all() # Warm RUNs
+        self.log(f"Cancelled {count} running command(s)." if count else "No command is running.", "SYSTEM")
+
     def loop_timer(self, start_time, mode, start_ts):
         if not self.is_ai_processing: return
         elapsed = time.time() - start_time
@@ -513,10 +672,17 @@ class SecureIDE(tk.Tk):
         txt.see(tk.END)
 
     def chat_bubble(self, sender, message):
+        if self.chat_tail_trimmed and self.chat_manager:
+            # Scrolled back through old pages: jump to the newest ones, this message included
+            self.chat_manager.add_message(self.active_chat_id, sender, message)
+            self.load_chat_history(self.active_chat_id)
+            return
         self.chat_history.config(state="normal")
         if sender == "PLAN":
             self.chat_history.tag_config("PLAN", foreground="#a78bfa", justify="left")
-        self.chat_history.insert(tk.END, f"[{sender}]\n{message}\n\n", sender)
+        self.insert_chat_messages("end-1c", self.chat_last_seq + 1, [{"sender": sender, "message": message}])
+        self.chat_last_seq += 1
+        self.trim_chat_window(keep="newest")
         self.chat_history.config(state="disabled")
         self.chat_history.see(tk.END)
         
@@ -539,18 +705,97 @@ class SecureIDE(tk.Tk):
         self.load_chat_history(active_id)
 
     def load_chat_history(self, chat_id):
+        # Only the newest page is rendered; older pages load when scrolling up
         self.chat_history.config(state="normal")
         self.chat_history.delete("1.0", tk.END)
+        self.unset_chat_marks(self.chat_first_seq, self.chat_last_seq)
         
-        history = self.chat_manager.get_history(chat_id)
-        for msg in history:
-            sender = msg['sender']
-            message = msg['message']
-            self.chat_history.insert(tk.END, f"[{sender}]\n{message}\n\n", sender)
+        first, page = self.chat_manager.get_page(chat_id, self.CHAT_PAGE)
+        self.insert_chat_messages("1.0", first, page)
+        self.chat_first_seq = first
+        self.chat_last_seq = first + len(page) - 1
+        self.chat_tail_trimmed = False
             
         self.chat_history.config(state="disabled")
         self.chat_history.see(tk.END)
 
+    def insert_chat_messages(self, index, first_seq, messages):
+        """Renders messages (seqs first_seq, first_seq+1, ...) at index."""
+        self.chat_history.mark_set("chat_insert", index)
+        self.chat_history.mark_gravity("chat_insert", tk.RIGHT) # Moves past each insert
+        for seq, msg in enumerate(messages, first_seq):
+            self.chat_history.mark_set(f"msg{seq}", "chat_insert")
+            self.chat_history.mark_gravity(f"msg{seq}", tk.LEFT) # Stays at the message start
+            self.chat_history.insert("chat_insert", f"[{msg['sender']}]\n{msg['message']}\n\n", msg['sender'])
+
+    def unset_chat_marks(self, first_seq, last_seq):
+        names = [f"msg{seq}" for seq in range(first_seq, last_seq + 1)]
+        if names:
+            self.chat_history.mark_unset(*names)
+
+    def trim_chat_window(self, keep):
+        """Drops rendered messages beyond CHAT_WINDOW from the end opposite to keep."""
+        excess = self.chat_last_seq - self.chat_first_seq + 1 - self.CHAT_WINDOW
+        if excess <= 0:
+            return
+        if keep == "newest":
+            cut = self.chat_first_seq + excess
+            self.chat_history.delete("1.0", f"msg{cut}")
+            self.unset_chat_marks(self.chat_first_seq, cut - 1)
+            self.chat_first_seq = cut
+        else:
+            cut = self.chat_last_seq - excess + 1
+            self.chat_history.delete(f"msg{cut}", "end-1c")
+            self.unset_chat_marks(cut, self.chat_last_seq)
+            self.chat_last_seq = cut - 1
+            self.chat_tail_trimmed = True
+
+    def on_chat_scroll(self, first, last):
+        self.chat_scroll.set(first, last)
+        if not self.chat_manager or self.chat_page_pending:
+            return
+        # Only when the content overflows the view, so a short chat never loops
+        if float(first) <= 0.0 and float(last) < 1.0 and self.chat_first_seq > 1:
+            self.chat_page_pending = True
+            self.after_idle(self.load_older_chat_page)
+        elif float(last) >= 1.0 and float(first) > 0.0 and self.chat_tail_trimmed:
+            self.chat_page_pending = True
+            self.after_idle(self.load_newer_chat_page)
+
+    def load_older_chat_page(self):
+        self.chat_page_pending = False
+        if self.chat_first_seq <= 1:
+            return
+        first, page = self.chat_manager.get_page(self.active_chat_id, self.CHAT_PAGE, before=self.chat_first_seq)
+        self.chat_history.config(state="normal")
+        self.chat_history.mark_set("chat_anchor", "@0,0") # Keep the visible line in place
+        old_first = f"msg{self.chat_first_seq}"
+        if self.chat_last_seq >= self.chat_first_seq:
+            self.chat_history.mark_gravity(old_first, tk.RIGHT) # Move below the new page
+        self.insert_chat_messages("1.0", first, page)
+        if self.chat_last_seq >= self.chat_first_seq:
+            self.chat_history.mark_gravity(old_first, tk.LEFT)
+        self.chat_first_seq = first if page else 1
+        self.trim_chat_window(keep="oldest")
+        self.chat_history.config(state="disabled")
+        self.chat_history.yview("chat_anchor")
+
+    def load_newer_chat_page(self):
+        self.chat_page_pending = False
+        if not self.chat_tail_trimmed:
+            return
+        after = self.chat_last_seq + 1
+        first, page = self.chat_manager.get_page(self.active_chat_id, self.CHAT_PAGE, before=after + self.CHAT_PAGE)
+        page = page[max(0, after - first):] # Near the end the page can start before `after`
+        self.chat_history.config(state="normal")
+        self.chat_history.mark_set("chat_anchor", "@0,0")
+        self.insert_chat_messages("end-1c", after, page)
+        self.chat_last_seq += len(page)
+        self.chat_tail_trimmed = len(page) == self.CHAT_PAGE # A short page reached the newest message
+        self.trim_chat_window(keep="newest")
+        self.chat_history.config(state="disabled")
+        self.chat_history.yview("chat_anchor")
+
     def on_chat_selected(self, event):
         selection = self.chat_selector.get()
         # Extract ID from "Name (ID)"
@@ -600,7 +845,9 @@ class SecureIDE(tk.Tk):
             self.btn_confirm.after(0, self.btn_confirm.pack_forget) # Thread-safe UI update
             
             # 1. AI Layer (Blocking call moved to thread)
-            history = self.chat_manager.get_history(self.active_chat_id)
+            # Newest messages within the "history_token_budget" setting, older ones summarized
+            budget = SettingsHandler.get("history_token_budget", DEFAULT_BUDGET)
+            history_summary, history = self.chat_manager.get_context(self.active_chat_id, budget)
             
             # Mission 3: Robust Header Normalization
             # Sometimes AI adds markdown or brackets to headers. We normalize them for easier splitting.
@@ -618,7 +865,9 @@ class SecureIDE(tk.Tk):
                 self.after(0, lambda: self.log(f"Transpiling Figma Data...", "AI_OP"))
                 raw_response = self.ai.figma_to_ceil(prompt)
             else:
-                raw_response = self.ai.generate_instructions(prompt, self.project_path, history=history, log_callback=ai_log)
+                raw_response = self.ai.generate_instructions(prompt, self.project_path, history=history, log_callback=ai_log,
+                                                             chunk_callback=self.make_plan_preview(),
+                                                             history_summary=history_summary)
             
             raw_response = normalize_headers(raw_response)
             self.is_ai_processing = False # Stop Timer Loop
@@ -675,6 +924,8 @@ class SecureIDE(tk.Tk):
             
             if ceil_content:
                 self.pending_instructions = ceil_content
+                self.pending_plan = None
+                self.save_pending_plan(ceil_content)
                 self.after(0, lambda: self.log("AI Instructions Parsed Successfully.", "SUCCESS"))
                 # Only show the confirmation prompt if there are actual commands
                 self.after(0, lambda: self.chat_bubble("AI", "I have prepared the changes. Please review the plan above and click 'CONFIRM & EXECUTE' when ready."))
@@ -687,37 +938,90 @@ class SecureIDE(tk.Tk):
             self.after(0, lambda: self.log(f"Pipeline Fail: {e}"))
             self.after(0, lambda: self.chat_bubble("AI", f"Critical Error: {e}"))
 
+    def make_plan_preview(self):
+        """Returns a chunk callback that parses and audits CEIL commands while the AI is still
+        answering, so the plan can be reviewed before the full response exists."""
+        state = {"tail": "", "stream": None, "stopped": False}
+
+        def on_chunk(text):
+            if state["stopped"]: return
+            try:
+                if state["stream"] is None:
+                    # Wait for the COMMANDS header, which may be split across chunks
+                    seen = state["tail"] + text
+                    idx = seen.rfind("COMMANDS")
+                    if idx == -1:
+                        state["tail"] = seen[-len("COMMANDS"):]
+                        return
+                    state["stream"] = CeilStream()
+                    text = seen[idx + len("COMMANDS"):]
+                for cmd in state["stream"].feed(text):
+                    self.sec.audit_ast([cmd], self.current_user_role)
+                    self.after(0, lambda t=cmd.type, f=cmd.target: self.log(f"Plan Preview: {t} {f}", "AI_OP"))
+            except Exception as e:
+                # Preview is best effort, the full response is parsed again before execution
+                state["stopped"] = True
+                self.after(0, lambda msg=str(e): self.log(f"Plan Preview stopped: {msg}", "ERROR"))
+
+        return on_chunk
+
     def execute_pending(self):
         """Mission 3: The Execution Hook (Async)."""
+        if not self.session_alive():
+            return # The plan stays pending until the user is back
         self.btn_confirm.pack_forget()
         
-        if not self.pending_instructions:
+        if not self.pending_instructions and not self.pending_plan:
             self.log("No CEIL commands found in the AI response. Please ask the AI to provide the COMMANDS section.", "ERROR")
             self.chat_bubble("AI", "⚠️ I proposed a plan but didn't provide the execution commands. Please ask me to 'Provide the CEIL commands for this plan' if you want to proceed.")
             return
         
-        ceil = self.pending_instructions
+        ceil, plan = self.pending_instructions, self.pending_plan
         self.pending_instructions = None
+        self.pending_plan = None
+        self.discard_pending_plan()
         
         # Run execution in background thread
-        threading.Thread(target=self._run_execution_thread, args=(ceil,), daemon=True).start()
+        threading.Thread(target=self._run_execution_thread, args=(ceil, plan), daemon=True).start()
 
-    def _run_execution_thread(self, ceil):
+    def _run_execution_thread(self, ceil, plan=None):
+        # Opt-in pipeline tracing, exported to .marvelcode/traces/
+        tracer = tracing.start() if SettingsHandler.get("tracing", False) else None
+        try:
+            self._execute_instructions(ceil, plan)
+        finally:
+            if tracer is not None:
+                tracing.stop()
+                self.report_trace(tracer)
+
+    def report_trace(self, tracer):
+        try:
+            path = tracer.export(os.path.join(self.project_path, ".marvelcode", "traces"))
+            line = f"Trace: {tracer.summary()} -> {os.path.relpath(path, self.project_path)}"
+            self.after(0, lambda: self.log(line, "SYSTEM"))
+        except Exception as e:
+            self.after(0, lambda msg=str(e): self.log(f"Could not export trace: {msg}", "ERROR"))
+
+    def _execute_instructions(self, ceil, plan=None):
         try:
             self.after(0, lambda: self.log("Executing Authorized Instructions...", "SYSTEM"))
             
-            # 2. Compiler
-            tokens = self.lexer.tokenize(ceil)
-            ast = self.parser.set_tokens(tokens).parse()
-            
-            # 3. Security
-            audited = self.sec.audit_ast(ast, self.current_user_role)
+            if plan is not None:
+                # Restored binary plan: already parsed, only the audit is needed
+                with tracing.span("audit", commands=len(plan)):
+                    audited = self.sec.audit_ast(plan, self.current_user_role)
+            else:
+                # 2. Compiler (skipped when this exact program was already parsed) + 3. Security
+                hits = self.program_cache.hits
+                audited = self.program_cache.compile(ceil, self.current_user_role, self.lexer, self.parser, self.sec)
+                if self.program_cache.hits > hits:
+                    self.after(0, lambda: self.log("Program Cache Hit: reusing parsed instructions.", "SYSTEM"))
             
             # 4. Executor
             # Handle FETCH_FIGMA specially before generic execution
             for cmd in audited:
-                if cmd['type'] == 'FETCH_FIGMA':
-                    url = cmd['url']
+                if cmd.type == 'FETCH_FIGMA':
+                    url = cmd.url
                     self.after(0, lambda: self.log(f"Fetching Design from Figma: {url}", "AI_OP"))
                     figma_data = self.ai.fetch_figma_data(url)
                     if "error" in figma_data:
@@ -728,7 +1032,13 @@ class SecureIDE(tk.Tk):
                         threading.Thread(target=self.process, args=("figma", str(figma_data)), daemon=True).start()
                     return # Exit after triggering figma process
             
-            res_list = self.exe.execute(audited)
+            run_hits = self.exe.run_cache.hits if self.exe.run_cache else 0
+            # Opt-in: per-file groups on a thread pool (only pays off for large I/O-bound plans)
+            res_list = self.exe.execute(audited, optimize=True, parallel=SettingsHandler.get("parallel_run", False))
+            if self.exe.run_cache and self.exe.run_cache.hits > run_hits:
+                stats = self.exe.run_cache.stats()
+                self.after(0, lambda: self.log(f"RUN Cache Hit: output reused for an unchanged tree "
+                                               f"({stats['hits']} hits / {stats['misses']} misses).", "SYSTEM"))
             
             # 5. Receipt (Thread-safe updates)
             for r in res_list: 
@@ -738,7 +1048,7 @@ class SecureIDE(tk.Tk):
             self.after(0, lambda: self.chat_bubble("AI", f"✅ Mission successful. {success_count} operations completed. See logs for details."))
             
             # Self-healing if needed
-            errors = [r for r in res_list if "ERROR" in r or "RUNTIME ERROR" in r]
+            errors = [r for r in res_list if ("ERROR" in r or "RUNTIME ERROR" in r) and not r.startswith("STOPPED")]
             if errors and self.recursion_depth < 3:
                 self.recursion_depth += 1
                 self.after(0, lambda: self.log(f"⚠️ Auto-Fixing: {len(errors)} errors found.", "AUTO-FIX"))
@@ -944,6 +1254,7 @@ class SecureIDE(tk.Tk):
     def send_to_ai(self):
         prompt = self.chat_input.get("1.0", tk.END).strip()
         if not prompt or not self.project_path: return
+        if not self.session_alive(): return # The prompt stays in the input box
         
         self.chat_input.delete("1.0", tk.END)
         self.chat_bubble("USER", prompt)
@@ -0,0 +1,46 @@
+"""create_account in a loop (original SecurityDB) vs SecurityDB.create_accounts.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_bulk_accounts [accounts] [rounds]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import bcrypt
+
+from app.core.security.database import SecurityDB
+from benchmarks.legacy import LegacySecurityDB
+
+def main(accounts=200, rounds=8):
+    # Lower than bcrypt's default cost so the original path finishes in reasonable time
+    real = bcrypt.gensalt
+    bcrypt.gensalt = lambda r=rounds, prefix=b"2b": real(rounds, prefix)
+    base = tempfile.mkdtemp()
+    rows = [(f"user_{i}", f"secret_{i}") for i in range(accounts)]
+    try:
+        legacy = LegacySecurityDB(os.path.join(base, "original.db"))
+        start = time.perf_counter()
+        created = sum(legacy.create_account(u, p) for u, p in rows)
+        original = time.perf_counter() - start
+        assert created == accounts
+
+        db = SecurityDB(os.path.join(base, "bulk.db"))
+        db.rounds = rounds # Also applies inside the hashing processes
+        start = time.perf_counter()
+        results = db.create_accounts(rows + rows[:10]) # With a few duplicates
+        bulk = time.perf_counter() - start
+        assert sum(ok for _, ok in results) == accounts
+        db.close()
+
+        print(f"{accounts} accounts at bcrypt cost {rounds} ({os.cpu_count()} cores)")
+        print(f"{'create_account loop':<22}{original * 1000:>10.0f} ms")
+        print(f"{'create_accounts':<22}{bulk * 1000:>10.0f} ms  ({original / bulk:.1f}x)")
+    finally:
+        bcrypt.gensalt = real
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,61 @@
+"""Searching old chats: scanning every journaled history vs SqliteChatManager.search (FTS5).
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_chat_search [chats] [messages_per_chat]
+"""
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.chat_manager import ChatManager
+from app.core.sqlite_chat_manager import SqliteChatManager
+
+WORDS = ("parser lexer token security patch runner cache plan audit commit session "
+         "window button thread process socket buffer layout figma render").split()
+
+def scan(manager, word, limit=20):
+    hits = []
+    for chat_id in manager.chats["chats"]:
+        for seq, msg in enumerate(manager.get_history(chat_id), 1):
+            if word in msg["message"].lower().split():
+                hits.append((chat_id, seq))
+    return hits[:limit]
+
+def main(chats=50, messages=400):
+    rng = random.Random(7)
+    base = tempfile.mkdtemp()
+    try:
+        journal = ChatManager(base)
+        for c in range(chats):
+            journal.add_chat(f"chat_{c}", f"Chat {c}")
+            for _ in range(messages):
+                journal.add_message(f"chat_{c}", "USER", " ".join(rng.choice(WORDS) for _ in range(30)))
+        journal.add_message("chat_7", "AI", "the quixotic refactor lives here")
+
+        start = time.perf_counter()
+        sqlite = SqliteChatManager(base) # First start imports the journal
+        imported = time.perf_counter() - start
+        start = time.perf_counter()
+        SqliteChatManager(base).close()
+        reopen = time.perf_counter() - start
+
+        timings = {}
+        for name, search in (("scan histories", lambda w: scan(ChatManager(base), w)),
+                             ("fts5 search", lambda w: sqlite.search(w))):
+            start = time.perf_counter()
+            for word in ("quixotic", "parser", "figma"):
+                results = search(word)
+                assert results
+            timings[name] = (time.perf_counter() - start) / 3
+        sqlite.close()
+
+        print(f"{chats} chats x {messages} messages (import {imported * 1000:.0f} ms, reopen {reopen * 1000:.1f} ms)")
+        for name, seconds in timings.items():
+            print(f"{name:<16}{seconds * 1000:>10.1f} ms per query")
+    finally:
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
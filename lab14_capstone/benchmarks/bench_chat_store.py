@@ -0,0 +1,49 @@
+"""Original ChatManager (chats.json rewritten per message) vs the journaled store.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_chat_store [messages]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.chat_manager import ChatManager
+from benchmarks.legacy import LegacyChatManager
+
+MESSAGE = "Refactor the parser so SEARCH blocks may span several lines. " * 8
+
+def run(cls, messages):
+    base = tempfile.mkdtemp()
+    try:
+        manager = cls(base)
+        start = time.perf_counter()
+        for i in range(messages):
+            if i == messages - 100:
+                late_start = time.perf_counter()
+            manager.add_message("default", "USER" if i % 2 else "AI", f"{i}: {MESSAGE}")
+        end = time.perf_counter()
+        if hasattr(manager, "flush"):
+            manager.flush() # Writes still queued count towards the total
+        flushed = time.perf_counter()
+        start_load = time.perf_counter()
+        history = cls(base).get_history("default")
+        load = time.perf_counter() - start_load
+        assert len(history) == messages
+        if hasattr(manager, "close"):
+            manager.close()
+        return end - start, end - late_start, flushed - start, load
+    finally:
+        shutil.rmtree(base)
+
+def main(messages=2000):
+    print(f"{messages} messages of {len(MESSAGE)} chars")
+    # The last 100 show the growth: the original rewrites the whole history each time
+    # "add ms" is the time spent in add_message, "on disk ms" also waits for queued writes
+    print(f"{'':<12}{'add ms':>10}{'last 100 ms':>14}{'on disk ms':>12}{'reload ms':>12}")
+    for name, cls in (("original", LegacyChatManager), ("journaled", ChatManager)):
+        total, late, flushed, load = run(cls, messages)
+        print(f"{name:<12}{total * 1000:>10.0f}{late * 1000:>14.1f}{flushed * 1000:>12.0f}{load * 1000:>12.1f}")
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,41 @@
+"""Throughput benchmark (MB/s) of the legacy rule-by-rule lexer vs the single-pass scanner.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_lexer
+"""
+import sys
+import time
+
+from app.core.compiler.lexer import CeilLexer
+from benchmarks.legacy import LegacyCeilLexer
+from benchmarks.synthetic import make_script, make_large_block_script
+
+def throughput(lexer, code, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lexer.tokenize(code)
+        best = min(best, time.perf_counter() - start)
+    return len(code) / best / (1024 * 1024), best
+
+def same_stream(a, b):
+    return [(t.type, t.value) for t in a] == [(t.type, t.value) for t in b]
+
+def main(sizes_kb=(64, 512, 2048)):
+    legacy, fast = LegacyCeilLexer(), CeilLexer()
+    cases = []
+    for kb in sizes_kb:
+        cases.append((f"mixed script {kb} KB", make_script(kb * 1024)))
+        cases.append((f"single block {kb} KB", make_large_block_script(kb * 1024)))
+
+    print(f"{'case':<26}{'legacy MB/s':>14}{'scanner MB/s':>14}{'speedup':>10}")
+    for name, code in cases:
+        assert same_stream(legacy.tokenize(code), fast.tokenize(code)), f"token mismatch: {name}"
+        repeat = 3 if len(code) < 1024 * 1024 else 1
+        old_mbs, old_t = throughput(legacy, code, repeat)
+        new_mbs, new_t = throughput(fast, code, repeat)
+        print(f"{name:<26}{old_mbs:>14.2f}{new_mbs:>14.2f}{old_t / new_t:>9.1f}x")
+
+if __name__ == "__main__":
+    sizes = tuple(int(a) for a in sys.argv[1:]) or (64, 512, 2048)
+    main(sizes)
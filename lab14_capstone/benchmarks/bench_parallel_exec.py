@@ -0,0 +1,57 @@
+"""Sequential vs optimized vs parallel execution of a synthetic 1,000-file plan.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_parallel_exec [files] [workers]
+"""
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.compiler.nodes import CreateCmd, PatchCmd, RunCmd
+from app.core.executor.executor import CeilExecutor
+from benchmarks.synthetic import make_python_body
+
+def make_plan(files):
+    rng = random.Random(42)
+    plan = []
+    for i in range(files):
+        path = f"pkg_{i % 20}/module_{i}.py"
+        plan.append(CreateCmd(path, make_python_body(rng, 200)))
+        if i % 4 == 0:
+            plan.append(PatchCmd(path, "value_1 =", "value_one ="))
+            plan.append(PatchCmd(path, "value_2 =", "value_two ="))
+    # Barrier in the middle, as AI plans usually end with a RUN
+    plan.insert(len(plan) // 2, RunCmd("missing_entry_point.py"))
+    return plan
+
+def timed(plan, **mode):
+    base = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        results = CeilExecutor(base).execute(plan, **mode)
+        return time.perf_counter() - start, results
+    finally:
+        shutil.rmtree(base)
+
+def main(files=1000, workers=8):
+    plan = make_plan(files)
+    modes = [
+        ("sequential", {}),
+        ("optimized", {"optimize": True}),
+        (f"parallel x{workers}", {"parallel": True, "max_workers": workers}),
+        (f"optimized + parallel x{workers}", {"optimize": True, "parallel": True, "max_workers": workers}),
+    ]
+    baseline, reference = None, None
+    print(f"{len(plan)} commands on {files} files")
+    for name, mode in modes:
+        elapsed, results = timed(plan, **mode)
+        reference = reference or results
+        assert results == reference, f"receipt mismatch in {name}"
+        baseline = baseline or elapsed
+        print(f"{name:<32}{elapsed * 1000:>10.1f} ms{baseline / elapsed:>8.2f}x")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,52 @@
+"""Parse time and AST memory for scripts with thousands of commands:
+legacy dict commands with an if/elif chain vs slotted nodes with a dispatch table.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_parser [commands ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from app.core.compiler.lexer import CeilLexer
+from app.core.compiler.parser import CeilParser
+from benchmarks.legacy import LegacyCeilParser
+
+def make_commands(count):
+    lines = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"CREATE pkg/file_{i}.py <<<x = {i}>>>")
+        elif kind == 1:
+            lines.append(f"PATCH pkg/file_{i - 1}.py SEARCH <<<x>>> REPLACE <<<y>>>")
+        elif kind == 2:
+            lines.append(f"DELETE pkg/old_{i}.py")
+        else:
+            lines.append(f"RUN pkg/file_{i - 3}.py <<< >>>")
+    return "\n".join(lines)
+
+def measure(parser, tokens, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.set_tokens(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    ast = parser.set_tokens(tokens).parse()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ast
+    return best, size
+
+def main(counts=(1000, 10000, 50000)):
+    print(f"{'commands':>10}{'legacy ms':>12}{'nodes ms':>11}{'legacy KB':>12}{'nodes KB':>11}")
+    for count in counts:
+        tokens = CeilLexer().tokenize(make_commands(count))
+        old_t, old_m = measure(LegacyCeilParser(), tokens)
+        new_t, new_m = measure(CeilParser(), tokens)
+        print(f"{count:>10}{old_t * 1000:>12.1f}{new_t * 1000:>11.1f}{old_m / 1024:>12.0f}{new_m / 1024:>11.0f}")
+
+if __name__ == "__main__":
+    counts = tuple(int(a) for a in sys.argv[1:]) or (1000, 10000, 50000)
+    main(counts)
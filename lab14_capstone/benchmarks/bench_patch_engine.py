@@ -0,0 +1,57 @@
+"""Original per-command PATCH vs the multi-pattern PATCH engine on a large file.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_patch_engine [lines] [pairs]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.compiler.nodes import PatchCmd
+from app.core.executor.executor import CeilExecutor
+from benchmarks.legacy import legacy_patch
+from benchmarks.synthetic import make_python_body
+
+def make_pairs(lines, pairs):
+    rng = random.Random(7)
+    picks = rng.sample(range(lines), pairs)
+    return [(f"value_{i} = compute", f"value_{i} = evaluate") for i in picks]
+
+def timed(base, body, run):
+    path = os.path.join(base, "generated.py")
+    with open(path, "w") as f: f.write(body)
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    with open(path, "r") as f: return elapsed, result, f.read()
+
+def main(lines=100000, pairs=30):
+    body = make_python_body(random.Random(1), lines)
+    patches = make_pairs(lines, pairs)
+    plan = [PatchCmd("generated.py", s, r) for s, r in patches]
+    base = tempfile.mkdtemp()
+    try:
+        exe = CeilExecutor(base)
+        runs = [
+            ("original (one read/replace/write per PATCH)",
+             lambda: [legacy_patch(base, {"file": "generated.py", "search": s, "replace": r}) for s, r in patches]),
+            ("engine, sequential executor", lambda: exe.execute(plan)),
+            ("engine, optimized (one scan)", lambda: exe.execute(plan, optimize=True)),
+        ]
+        print(f"{pairs} PATCHes on a {len(body) / 1e6:.1f} MB file")
+        baseline, reference = None, None
+        for name, run in runs:
+            elapsed, result, text = timed(base, body, run)
+            reference = reference or text
+            assert text == reference, f"content mismatch in {name}"
+            baseline = baseline or elapsed
+            print(f"{name:<46}{elapsed * 1000:>9.1f} ms{baseline / elapsed:>8.2f}x")
+        print("receipt:", result[:2], "...")
+    finally:
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
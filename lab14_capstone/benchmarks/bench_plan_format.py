@@ -0,0 +1,43 @@
+"""Load time of a saved binary plan vs re-lexing and re-parsing the CEIL text.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_plan_format [size_mb ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from app.core.compiler.lexer import CeilLexer
+from app.core.compiler.parser import CeilParser
+from app.core.compiler.plan_format import save_plan, load_plan
+from benchmarks.synthetic import make_script
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(sizes_mb=(1, 10, 100)):
+    print(f"{'plan':>8}{'commands':>10}{'re-parse ms':>13}{'load ms':>10}{'mmap ms':>10}{'speedup':>10}")
+    for size in sizes_mb:
+        # Large blocks are what big AI responses consist of
+        code = make_script(size * 1024 * 1024, block_lines=400)
+        ast = CeilParser().set_tokens(CeilLexer().tokenize(code)).parse()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plan.ceilp")
+            save_plan(ast, path)
+            assert load_plan(path) == ast
+            repeat = 3 if size < 50 else 1
+            parse_t = best_of(lambda: CeilParser().set_tokens(CeilLexer().tokenize(code)).parse(), repeat)
+            load_t = best_of(lambda: load_plan(path, use_mmap=False), repeat)
+            mmap_t = best_of(lambda: load_plan(path), repeat)
+        print(f"{size:>6}MB{len(ast):>10}{parse_t * 1000:>13.1f}{load_t * 1000:>10.1f}"
+              f"{mmap_t * 1000:>10.1f}{parse_t / mmap_t:>9.1f}x")
+
+if __name__ == "__main__":
+    sizes = tuple(int(a) for a in sys.argv[1:]) or (1, 10, 100)
+    main(sizes)
@@ -0,0 +1,57 @@
+"""Cold (fresh interpreter) vs warm (fork server) RUN latency.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_run_latency [runs]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from app.core.executor.runner import SubprocessRunner
+from app.core.executor.warm_runner import WarmRunner
+
+SCRIPT = '''import json, re, collections, datetime, sqlite3, asyncio
+data = {"items": [i * i for i in range(100)]}
+print(len(json.dumps(data)))
+'''
+
+def measure(runner, path, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = runner.run_script(path)
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+def report(name, samples, baseline=None):
+    median = statistics.median(samples)
+    speedup = f"{baseline / median:>8.2f}x" if baseline else ""
+    print(f"{name:<8}median {median * 1000:>7.1f} ms   min {min(samples) * 1000:>7.1f} ms{speedup}")
+    return median
+
+def main(runs=20):
+    base = tempfile.mkdtemp()
+    try:
+        path = os.path.join(base, "main.py")
+        with open(path, "w") as f: f.write(SCRIPT)
+        warm = WarmRunner()
+        if not warm.available:
+            print("Fork server not available on this platform; WarmRunner falls back to cold starts.")
+            return
+        warm.warm_up()
+        warm.run_script(path) # First fork pays for connecting to the server
+        cold_samples, cold_result = measure(SubprocessRunner(), path, runs)
+        warm_samples, warm_result = measure(warm, path, runs)
+        assert cold_result == warm_result, (cold_result, warm_result)
+        print(f"{runs} RUNs of a script importing json/re/collections/datetime/sqlite3/asyncio")
+        baseline = report("cold", cold_samples)
+        report("warm", warm_samples, baseline)
+    finally:
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
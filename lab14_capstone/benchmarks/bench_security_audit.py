@@ -0,0 +1,63 @@
+"""Original SecurityEngine.audit_ast vs the compiled path policy on a large AST.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_security_audit [commands]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.compiler.nodes import CreateCmd, PatchCmd, DeleteCmd
+from app.core.security.policy import PathPolicy
+from app.core.security.security import SecurityEngine
+from benchmarks.legacy import LegacySecurityEngine
+
+def make_ast(commands):
+    """Typical AI plans touch a few hundred files in a handful of folders, many several times."""
+    ast = []
+    for i in range(commands):
+        path = f"src/pkg_{i % 25}/module_{i % 2000}.py"
+        kind = i % 4
+        if kind == 0:
+            ast.append(CreateCmd(path, "x = 1\n"))
+        elif kind == 3:
+            ast.append(DeleteCmd(f"build/tmp_{i}.txt"))
+        else:
+            ast.append(PatchCmd(path, "x = 1", "x = 2"))
+    return ast
+
+def best_of(audit, ast, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        audited = audit(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, audited
+
+def main(commands=10000):
+    base = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(base, "src"))
+        ast = make_ast(commands)
+        legacy = LegacySecurityEngine(base)
+        engine = SecurityEngine(base, PathPolicy())
+        print(f"{commands} commands")
+        baseline, reference = None, None
+        for name, audit in [("original", lambda a: legacy.audit_ast(a, "admin")),
+                            ("policy engine", lambda a: engine.audit_ast(a, "admin"))]:
+            elapsed, audited = best_of(audit, ast)
+            reference = reference or audited
+            assert audited == reference
+            baseline = baseline or elapsed
+            print(f"{name:<16}{elapsed * 1000:>9.2f} ms{baseline / elapsed:>8.2f}x")
+        for n in (commands // 10, commands, commands * 10):
+            elapsed, _ = best_of(lambda a: engine.audit_ast(a, "admin"), make_ast(n), repeat=1)
+            print(f"  policy engine, {n:>7} commands: {elapsed * 1000:>9.2f} ms ({elapsed / n * 1e6:.2f} us/command)")
+    finally:
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
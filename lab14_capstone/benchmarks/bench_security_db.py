@@ -0,0 +1,60 @@
+"""Original SecurityDB (a connection per call) vs the pooled WAL SecurityDB.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_security_db [lookups] [threads]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.core.security.database import SecurityDB
+from benchmarks.legacy import LegacySecurityDB
+
+ACCOUNTS = 200
+
+def cheap_hashes():
+    """bcrypt at its minimum cost: the benchmark measures the database, not the hash."""
+    real = bcrypt.gensalt
+    bcrypt.gensalt = lambda rounds=4, prefix=b"2b": real(4, prefix)
+    return real
+
+def run(db, lookups, threads):
+    start = time.perf_counter()
+    for i in range(ACCOUNTS):
+        db.create_account(f"user_{i}", "secret")
+    inserts = time.perf_counter() - start
+
+    names = [f"user_{i % (ACCOUNTS * 2)}" for i in range(lookups)] # Half of them miss
+    start = time.perf_counter()
+    found = sum(db.user_exists(n) for n in names)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        found_threaded = sum(pool.map(db.user_exists, names))
+    threaded = time.perf_counter() - start
+    assert found == found_threaded == lookups // 2
+    return inserts, serial, threaded
+
+def main(lookups=20000, threads=8):
+    real = cheap_hashes()
+    base = tempfile.mkdtemp()
+    try:
+        results = {}
+        for name, cls in (("original", LegacySecurityDB), ("pooled WAL", SecurityDB)):
+            results[name] = run(cls(os.path.join(base, f"{name.replace(' ', '_')}.db")), lookups, threads)
+        print(f"{ACCOUNTS} create_account calls, {lookups} user_exists lookups ({threads} threads for the last column)")
+        print(f"{'':<12}{'inserts/s':>12}{'lookups/s':>12}{'threaded/s':>12}")
+        for name, (inserts, serial, threaded) in results.items():
+            print(f"{name:<12}{ACCOUNTS / inserts:>12.0f}{lookups / serial:>12.0f}{lookups / threaded:>12.0f}")
+    finally:
+        bcrypt.gensalt = real
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,53 @@
+"""Original SettingsHandler (file read per call) vs the cached, debounced one.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_settings [gets] [sets]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.core.settings import SettingsHandler
+from benchmarks.legacy import LegacySettingsHandler
+
+def sample_settings():
+    settings = {"current_user": "admin", "last_project_path": "/work/project", "warm_run": True}
+    settings["path_policy"] = {"allow": ["**"], "deny": [".env", "secrets/**"]}
+    settings.update({f"recent_{i}": f"/work/file_{i}.py" for i in range(50)})
+    return settings
+
+def run(handler, gets, sets):
+    start = time.perf_counter()
+    for i in range(gets):
+        handler.get("warm_run")
+    read = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(sets):
+        handler.set("current_user", f"user_{i}")
+    if hasattr(handler, "flush"):
+        handler.flush() # Count the (single) write too
+    write = time.perf_counter() - start
+    assert handler.get("current_user") == f"user_{sets - 1}"
+    return read, write
+
+def main(gets=20000, sets=500):
+    base = tempfile.mkdtemp()
+    try:
+        results = {}
+        for name, handler in (("original", LegacySettingsHandler), ("cached", SettingsHandler)):
+            handler.SETTINGS_FILE = os.path.join(base, f"{name}.json")
+            with open(handler.SETTINGS_FILE, "w") as f:
+                json.dump(sample_settings(), f, indent=4)
+            results[name] = run(handler, gets, sets)
+        print(f"{gets} get() and {sets} set() calls")
+        print(f"{'':<10}{'get us':>10}{'set us':>10}")
+        for name, (read, write) in results.items():
+            print(f"{name:<10}{read / gets * 1e6:>10.1f}{write / sets * 1e6:>10.1f}")
+    finally:
+        shutil.rmtree(base)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
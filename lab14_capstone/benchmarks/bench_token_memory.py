@@ -0,0 +1,46 @@
+"""Peak memory (tracemalloc) of lexing, parsing and writing one large CREATE,
+legacy copying tokens vs span tokens.
+
+Run from the lab14_capstone folder:
+    python -m benchmarks.bench_token_memory [size_mb ...]
+"""
+import sys
+import tempfile
+import tracemalloc
+
+from app.core.compiler.lexer import CeilLexer
+from app.core.compiler.parser import CeilParser
+from app.core.executor.executor import CeilExecutor
+from benchmarks.legacy import LegacyCeilLexer, LegacyCeilParser, legacy_create
+from benchmarks.synthetic import make_large_block_script
+
+def measure(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main(sizes_mb=(1, 8, 32)):
+    mb = 1024 * 1024
+    print(f"{'block':>8}{'legacy peak':>16}{'span peak':>14}{'legacy copies':>16}{'span copies':>14}")
+    for size in sizes_mb:
+        code = make_large_block_script(size * mb)
+        with tempfile.TemporaryDirectory() as base:
+            def legacy():
+                ast = LegacyCeilParser().set_tokens(LegacyCeilLexer().tokenize(code)).parse()
+                legacy_create(base, ast[0])
+
+            def spans():
+                ast = CeilParser().set_tokens(CeilLexer().tokenize(code)).parse()
+                CeilExecutor(base).execute(ast)
+
+            old, new = measure(legacy), measure(spans)
+            # The CEIL text itself is allocated outside the measurement, so peak / size
+            # approximates how many extra copies of the payload were alive at once
+            print(f"{size:>6}MB{old / mb:>14.1f}MB{new / mb:>12.1f}MB"
+                  f"{old / len(code):>16.2f}{new / len(code):>14.2f}")
+
+if __name__ == "__main__":
+    sizes = tuple(int(a) for a in sys.argv[1:]) or (1, 8, 32)
+    main(sizes)
@@ -0,0 +1,256 @@
+"""Baseline implementations kept verbatim so benchmarks can compare against them."""
+import json
+import os
+import re
+import sqlite3
+import bcrypt
+from app.core.compiler.tokens import Token, TokenType
+
+class LegacyCeilLexer:
+    def __init__(self):
+        self.rules = [
+            (TokenType.CREATE, r'CREATE'),
+            (TokenType.PATCH, r'PATCH'),
+            (TokenType.DELETE, r'DELETE'),
+            (TokenType.RUN, r'RUN'),
+            (TokenType.FETCH_FIGMA, r'FETCH_FIGMA'),
+            (TokenType.SEARCH, r'SEARCH'),
+            (TokenType.REPLACE, r'REPLACE'),
+            (TokenType.BLOCK, r'<<<[\s\S]*?>>>'),
+            (TokenType.STRING, r'"[^"]*"'),
+            (TokenType.STRING, r"'[^']*'"),
+            (TokenType.WORD, r'[a-zA-Z0-9_\./\\-]+'),
+        ]
+
+    def tokenize(self, code):
+        tokens = []
+        pos = 0
+        while pos < len(code):
+            match = None
+            if code[pos].isspace():
+                pos += 1
+                continue
+            for type, pattern in self.rules:
+                regex = re.compile(pattern)
+                match = regex.match(code, pos)
+                if match:
+                    val = match.group(0)
+                    if type in [TokenType.BLOCK, TokenType.STRING]:
+                        # Strip quotes or <<< >>>
+                        if type == TokenType.BLOCK:
+                            val = val[3:-3]
+                        else:
+                            val = val[1:-1]
+                    tokens.append(Token(type, val))
+                    pos = match.end()
+                    break
+            if not match:
+                pos += 1 # Skip unknown
+        tokens.append(Token(TokenType.EOF, None))
+        return tokens
+
+class LegacyCeilParser:
+    def __init__(self):
+        self.tokens = []
+        self.pos = 0
+
+    def set_tokens(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        return self
+
+    def consume(self, expected_type=None):
+        if self.pos >= len(self.tokens):
+            raise Exception("Unexpected EOF")
+        token = self.tokens[self.pos]
+        if expected_type and token.type != expected_type:
+            raise Exception(f"Expected {expected_type}, got {token.type}")
+        self.pos += 1
+        return token
+
+    def consume_string_or_word(self):
+        token = self.tokens[self.pos]
+        if token.type not in [TokenType.STRING, TokenType.WORD]:
+            raise Exception(f"Expected STRING or WORD, got {token.type}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        ast = []
+        while self.pos < len(self.tokens) and self.tokens[self.pos].type != TokenType.EOF:
+            t = self.tokens[self.pos].type
+            if t == TokenType.CREATE:
+                self.consume()
+                ast.append({'type': 'CREATE', 'file': self.consume_string_or_word().value, 'content': self.consume(TokenType.BLOCK).value})
+            elif t == TokenType.PATCH:
+                self.consume()
+                ast.append({
+                    'type': 'PATCH', 
+                    'file': self.consume_string_or_word().value,
+                    'search': (self.consume(TokenType.SEARCH), self.consume(TokenType.BLOCK))[1].value,
+                    'replace': (self.consume(TokenType.REPLACE), self.consume(TokenType.BLOCK))[1].value
+                })
+            elif t == TokenType.DELETE:
+                self.consume()
+                ast.append({'type': 'DELETE', 'file': self.consume_string_or_word().value})
+            elif t == TokenType.RUN:
+                self.consume()
+                ast.append({'type': 'RUN', 'file': self.consume_string_or_word().value})
+            elif t == TokenType.FETCH_FIGMA:
+                self.consume()
+                ast.append({'type': 'FETCH_FIGMA', 'url': self.consume_string_or_word().value})
+            else:
+                self.pos += 1
+        return ast
+
+def legacy_create(base_path, cmd):
+    """The CREATE branch of the original CeilExecutor."""
+    path = os.path.join(base_path, cmd['file'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f: f.write(cmd['content'])
+
+def legacy_patch(base_path, cmd):
+    """The PATCH branch of the original CeilExecutor."""
+    path = os.path.join(base_path, cmd['file'])
+    with open(path, 'r') as f: content = f.read()
+    new_content = content.replace(cmd['search'], cmd['replace'])
+    with open(path, 'w') as f: f.write(new_content)
+
+class LegacySecurityEngine:
+    """The original SecurityEngine (fails on FETCH_FIGMA, which has no file)."""
+    def __init__(self, base_path):
+        self.base_path = os.path.abspath(base_path)
+
+    def audit_ast(self, ast, role="USER"):
+        audited = []
+        for cmd in ast:
+            file_path = os.path.abspath(os.path.join(self.base_path, cmd.file))
+            if not file_path.startswith(self.base_path):
+                raise Exception(f"SECURITY ALERT: Path traversal detected: {cmd.file}")
+
+            if cmd.type == 'RUN' and role != 'admin':
+                raise Exception(f"SECURITY ALERT: Unauthorized RUN command for role {role}")
+
+            audited.append(cmd)
+        return audited
+
+class LegacySecurityDB:
+    """The original SecurityDB: one new connection per call."""
+    def __init__(self, db_path="app_security.db"):
+        self.db_path = db_path
+        self.init_db()
+        # Seed admin account if not exists
+        if not self.user_exists("admin"):
+            self.create_account("admin", "admin123", "admin")
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password_hash BLOB,
+                    role TEXT DEFAULT 'developer'
+                )
+            """)
+            conn.commit()
+
+    def user_exists(self, username):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT 1 FROM users WHERE username=?", (username,)).fetchone() is not None
+
+    def create_account(self, username, password, role='developer'):
+        salt = bcrypt.gensalt()
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", 
+                             (username, hashed, role))
+                conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def authenticate(self, username, password):
+        with sqlite3.connect(self.db_path) as conn:
+            user = conn.execute("SELECT password_hash, role FROM users WHERE username=?", (username,)).fetchone()
+            if user and bcrypt.checkpw(password.encode('utf-8'), user[0]):
+                return True, user[1]
+        return False, None
+
+class LegacySettingsHandler:
+    """The original SettingsHandler: every get/set reads (and set rewrites) the file."""
+    SETTINGS_FILE = "settings.json"
+
+    @staticmethod
+    def load():
+        if os.path.exists(LegacySettingsHandler.SETTINGS_FILE):
+            try:
+                with open(LegacySettingsHandler.SETTINGS_FILE, "r") as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    @staticmethod
+    def save(settings):
+        with open(LegacySettingsHandler.SETTINGS_FILE, "w") as f:
+            json.dump(settings, f, indent=4)
+
+    @staticmethod
+    def get(key, default=None):
+        return LegacySettingsHandler.load().get(key, default)
+
+    @staticmethod
+    def set(key, value):
+        settings = LegacySettingsHandler.load()
+        settings[key] = value
+        LegacySettingsHandler.save(settings)
+
+class LegacyChatManager:
+    """The original ChatManager: chats.json rewritten on every change."""
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.storage_path = os.path.join(project_path, ".marvelcode", "chats.json")
+        self.ensure_storage()
+        self.chats = self.load_chats()
+
+    def ensure_storage(self):
+        os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
+        if not os.path.exists(self.storage_path):
+            with open(self.storage_path, "w") as f:
+                json.dump({"active_chat_id": "default", "chats": {"default": {"name": "Default Chat", "history": []}}}, f)
+
+    def load_chats(self):
+        try:
+            with open(self.storage_path, "r") as f:
+                return json.load(f)
+        except:
+            return {"active_chat_id": "default", "chats": {"default": {"name": "Default Chat", "history": []}}}
+
+    def save_chats(self):
+        with open(self.storage_path, "w") as f:
+            json.dump(self.chats, f, indent=4)
+
+    def add_chat(self, chat_id, name):
+        self.chats["chats"][chat_id] = {"name": name, "history": []}
+        self.save_chats()
+
+    def add_message(self, chat_id, sender, message):
+        if chat_id in self.chats["chats"]:
+            self.chats["chats"][chat_id]["history"].append({"sender": sender, "message": message})
+            self.save_chats()
+
+    def get_history(self, chat_id):
+        return self.chats["chats"].get(chat_id, {}).get("history", [])
+
+    def rename_chat(self, chat_id, new_name):
+        if chat_id in self.chats["chats"]:
+            self.chats["chats"][chat_id]["name"] = new_name
+            self.save_chats()
+
+    def delete_chat(self, chat_id):
+        if chat_id in self.chats["chats"] and len(self.chats["chats"]) > 1:
+            del self.chats["chats"][chat_id]
+            if self.chats["active_chat_id"] == chat_id:
+                self.chats["active_chat_id"] = list(self.chats["chats"].keys())[0]
+            self.save_chats()
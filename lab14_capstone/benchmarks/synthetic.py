@@ -0,0 +1,37 @@
+"""Synthetic CEIL scripts shared by the benchmarks."""
+import random
+
+def make_python_body(rng, lines):
+    out = []
+    for i in range(lines):
+        indent = "    " * rng.randint(0, 2)
+        out.append(f"{indent}value_{i} = compute('item_{i}', {rng.randint(0, 999)})  # step {i}")
+    return "\n".join(out)
+
+def make_script(target_bytes, block_lines=40, seed=1234):
+    """Builds a CEIL script of roughly target_bytes mixing every verb."""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        kind = i % 5
+        if kind in (0, 1):
+            chunk = f"CREATE src/module_{i}.py <<<\n{make_python_body(rng, block_lines)}\n>>>\n"
+        elif kind == 2:
+            chunk = (f"PATCH src/module_{i - 2}.py SEARCH <<<value_1 = >>> "
+                     f"REPLACE <<<value_one = >>>\n")
+        elif kind == 3:
+            chunk = f'DELETE "src/old_{i}.py"\n'
+        else:
+            chunk = f"RUN src/module_{i - 4}.py <<< >>>\n"
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    return "".join(parts)
+
+def make_large_block_script(block_bytes):
+    """One CREATE carrying a single block of roughly block_bytes."""
+    line = "print('Marvel Code synthetic payload line')\n"
+    body = line * max(1, block_bytes // len(line))
+    return f"CREATE big_module.py <<<\n{body}>>>\n"
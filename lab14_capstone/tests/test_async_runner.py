@@ -0,0 +1,65 @@
+import sys
+import threading
+import unittest
+from app.core.executor.async_runner import AsyncRunEngine
+from app.core.executor.run_limits import RunLimits
+
+def python(source):
+    return [sys.executable, "-c", source]
+
+class TestAsyncRunEngine(unittest.TestCase):
+    def setUp(self):
+        self.lines = []
+        self.first_line = threading.Event()
+        self.engine = AsyncRunEngine(on_output=self.on_output)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def on_output(self, label, stream, line):
+        self.lines.append((label, stream, line))
+        self.first_line.set()
+
+    def test_output_is_live(self):
+        future = self.engine.submit(python("import time\nprint('first')\ntime.sleep(3)\nprint('last')"), label="job")
+        self.assertTrue(self.first_line.wait(2.5))
+        self.assertFalse(future.done())
+        self.assertEqual(self.lines, [("job", "stdout", "first")])
+        res = future.result()
+        self.assertEqual((res.stdout, res.returncode), ("first\nlast\n", 0))
+        self.assertEqual(self.lines[-1], ("job", "stdout", "last"))
+
+    def test_lines_split_across_writes(self):
+        source = ("import sys, time\nfor part in ('a\\r', '\\nb', '\\r\\nc\\r', 'd', 'e'):\n"
+                  "    sys.stdout.write(part); sys.stdout.flush(); time.sleep(0.05)\n"
+                  "sys.stderr.write('oops\\n')")
+        res = self.engine.submit(python(source), label="job").result()
+        self.assertEqual(res.stdout, "a\nb\nc\nde")
+        self.assertEqual([line for _, stream, line in self.lines if stream == "stdout"], ["a", "b", "c", "de"])
+        self.assertIn(("job", "stderr", "oops"), self.lines)
+
+    def test_run_many_keeps_order(self):
+        results = self.engine.run_many([python(f"import time; time.sleep({0.3 - i / 10}); print({i})") for i in range(3)])
+        self.assertEqual([r.stdout for r in results], ["0\n", "1\n", "2\n"])
+        self.assertEqual(self.engine.run_shell("exit 4").returncode, 4)
+
+    def test_cancel_all(self):
+        futures = [self.engine.submit(python("import time; print('go'); time.sleep(30)")) for _ in range(2)]
+        self.assertTrue(self.first_line.wait(5))
+        self.assertEqual(self.engine.cancel_all(), 2)
+        for future in futures:
+            res = future.result(5)
+            self.assertEqual((res.returncode, res.stderr), (None, "RUN cancelled by user."))
+        self.assertEqual(self.engine.running(), 0)
+
+    def test_timeout_and_output_cap(self):
+        self.engine.limits = RunLimits(timeout=1, max_output_kb=1)
+        res = self.engine.submit(python("import time\nprint('x' * 5000)\ntime.sleep(30)")).result(10)
+        self.assertTrue(res.timed_out)
+        self.assertIn("bytes truncated", res.stdout)
+        self.assertIn("timed out after 1s", res.stderr)
+
+    def test_closed(self):
+        self.engine.close()
+        with self.assertRaises(Exception):
+            self.engine.submit(python("pass"))
@@ -0,0 +1,137 @@
+import json
+import tempfile
+import unittest
+from app.core.chat_manager import ChatManager
+from app.core.sqlite_chat_manager import SqliteChatManager
+
+class TestChatJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def log_path(self, manager, chat_id="default"):
+        return manager.chat_path(manager.file_of(chat_id), ".jsonl")
+
+    def messages(self, manager, chat_id="default"):
+        return [m["message"] for m in manager.get_history(chat_id)]
+
+    def test_reload(self):
+        manager = ChatManager(self.root)
+        for i in range(5):
+            manager.add_message("default", "USER", f"m{i}")
+        manager.close()
+        self.assertEqual(self.messages(ChatManager(self.root)), [f"m{i}" for i in range(5)])
+
+    def test_replay_after_truncated_write(self):
+        manager = ChatManager(self.root)
+        for i in range(3):
+            manager.add_message("default", "USER", f"m{i}")
+        manager.close()
+        path = self.log_path(manager)
+        with open(path, "ab") as f: # A crash in the middle of the next record
+            f.write(json.dumps({"seq": 4, "sender": "AI", "message": "lost"}).encode()[:20])
+
+        manager = ChatManager(self.root)
+        self.assertEqual(self.messages(manager), ["m0", "m1", "m2"])
+        manager.add_message("default", "AI", "m3") # Must not extend the torn line
+        manager.close()
+        self.assertEqual(self.messages(ChatManager(self.root)), ["m0", "m1", "m2", "m3"])
+
+    def test_replay_after_compaction(self):
+        manager = ChatManager(self.root)
+        manager.COMPACT_EVERY = 4
+        for i in range(10):
+            manager.add_message("default", "USER", f"m{i}")
+        manager.close()
+        with open(self.log_path(manager), "rb") as f:
+            self.assertLess(f.read().count(b"\n"), 4) # Older records were folded into the snapshot
+        self.assertEqual(self.messages(ChatManager(self.root)), [f"m{i}" for i in range(10)])
+
+    def test_stale_records_before_snapshot(self):
+        # A crash between writing the snapshot and emptying the log leaves records it already holds
+        manager = ChatManager(self.root)
+        for i in range(3):
+            manager.add_message("default", "USER", f"m{i}")
+        manager.close()
+        path = self.log_path(manager)
+        with open(path, "rb") as f:
+            log = f.read()
+        manager.compact("default")
+        with open(path, "wb") as f:
+            f.write(log)
+        self.assertEqual(self.messages(ChatManager(self.root)), ["m0", "m1", "m2"])
+
+class TestPaging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check_pages(self, manager):
+        for i in range(7):
+            manager.add_message("default", "USER", f"m{i}")
+        first, page = manager.get_page("default", limit=3)
+        self.assertEqual((first, [m["message"] for m in page]), (5, ["m4", "m5", "m6"]))
+        first, page = manager.get_page("default", limit=3, before=first)
+        self.assertEqual((first, [m["message"] for m in page]), (2, ["m1", "m2", "m3"]))
+        first, page = manager.get_page("default", limit=3, before=first)
+        self.assertEqual((first, [m["message"] for m in page]), (1, ["m0"]))
+        self.assertEqual(manager.get_page("default", limit=3, before=1), (1, []))
+        self.assertEqual(manager.get_page("missing"), (1, []))
+
+    def test_get_page(self):
+        manager = ChatManager(self.tmp.name)
+        self.check_pages(manager)
+        manager.close()
+
+    def test_sqlite_get_page_reads_only_the_page(self):
+        manager = SqliteChatManager(self.tmp.name)
+        self.check_pages(manager)
+        self.assertNotIn("default", manager.loaded)
+        manager.get_history("default")
+        self.assertEqual(manager.get_page("default", limit=2, before=3)[1][-1]["message"], "m1")
+        manager.close()
+
+class TestChatWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = ChatManager(self.tmp.name)
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def test_close_flushes_the_queue(self):
+        for i in range(200):
+            self.manager.add_message("default", "USER", f"m{i}")
+        self.assertEqual(len(self.manager.get_history("default")), 200) # Visible before the write
+        writer = self.manager.writer
+        self.manager.close()
+        self.assertFalse(writer.is_alive())
+        self.assertIsNone(self.manager.writer)
+        reopened = ChatManager(self.tmp.name)
+        self.assertEqual([m["message"] for m in reopened.get_history("default")], [f"m{i}" for i in range(200)])
+        self.manager.close() # A second close is a no-op
+
+    def test_stats(self):
+        for i in range(200):
+            self.manager.add_message("default", "USER", f"m{i}")
+        self.manager.flush()
+        stats = self.manager.stats()
+        self.assertEqual(stats["records"], 200)
+        self.assertGreaterEqual(stats["flushes"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_flush_reports_write_errors(self):
+        def fail(file, lines):
+            raise OSError("disk full")
+        self.manager.append_lines = fail
+        self.manager.add_message("default", "USER", "lost")
+        with self.assertRaises(Exception) as raised:
+            self.manager.flush()
+        self.assertIn("disk full", str(raised.exception))
+        self.manager.flush() # Reported once; the writer is still running
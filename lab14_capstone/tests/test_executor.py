@@ -0,0 +1,88 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from app.core.compiler.nodes import CreateCmd, PatchCmd, DeleteCmd, RunCmd
+from app.core.executor.executor import CeilExecutor
+from app.core.executor.runner import RunResult
+
+FILES = ['sub', 'a.py', './a.py', 'b.txt', 'sub/c.py', 'sub/../b.txt', 'sub/d/e.py']
+TEXTS = ['x', 'xy\r\nz', 'y\rq', '', 'abc\n']
+
+def random_plan(rng):
+    plan = []
+    for _ in range(rng.randint(1, 8)):
+        kind, file = rng.random(), rng.choice(FILES)
+        if kind < 0.35:
+            plan.append(CreateCmd(file, rng.choice(TEXTS) + rng.choice(TEXTS)))
+        elif kind < 0.7:
+            plan.append(PatchCmd(file, rng.choice(['x', 'y', '\n', 'z', 'q']), rng.choice(['X', '\r', '', 'yy', '\r\n'])))
+        else:
+            plan.append(DeleteCmd(file))
+    return plan
+
+def snapshot(root):
+    out = {}
+    for folder, dirs, files in os.walk(root):
+        for name in dirs:
+            out[os.path.relpath(os.path.join(folder, name), root)] = None
+        for name in files:
+            path = os.path.join(folder, name)
+            with open(path, 'rb') as f:
+                out[os.path.relpath(path, root)] = f.read()
+    return out
+
+class TestPlanModes(unittest.TestCase):
+    """Optimized and parallel execution must give the receipts and files of a sequential run."""
+    def run_plan(self, plan, seed_file, **mode):
+        root = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(root, 'sub'))
+            if seed_file:
+                with open(os.path.join(root, 'a.py'), 'w') as f:
+                    f.write('xyz\nq')
+            receipts = CeilExecutor(root).execute(plan, **mode)
+            return [r.replace(root, '<root>') for r in receipts], snapshot(root)
+        finally:
+            shutil.rmtree(root)
+
+    def test_same_as_sequential(self):
+        rng = random.Random(4)
+        for i in range(200):
+            plan = random_plan(rng)
+            expected = self.run_plan(plan, i % 2)
+            for mode in (dict(optimize=True), dict(parallel=True), dict(optimize=True, parallel=True)):
+                self.assertEqual(self.run_plan(plan, i % 2, **mode), expected, (plan, mode))
+
+    def test_symlinked_folder_is_one_target(self):
+        # 'link' and 'sub' are the same folder: their writes must not race or reorder
+        plan = [CreateCmd('sub/a.py', 'one'), PatchCmd('link/a.py', 'one', 'two'),
+                CreateCmd('link/b.py', 'x'), DeleteCmd('sub/b.py'), PatchCmd('sub/a.py', 'two', 'three')]
+        for _ in range(20):
+            root = tempfile.mkdtemp()
+            try:
+                os.makedirs(os.path.join(root, 'sub'))
+                os.symlink(os.path.join(root, 'sub'), os.path.join(root, 'link'))
+                CeilExecutor(root).execute(plan, optimize=True, parallel=True, max_workers=4)
+                self.assertEqual(os.listdir(os.path.join(root, 'sub')), ['a.py'])
+                with open(os.path.join(root, 'sub', 'a.py')) as f:
+                    self.assertEqual(f.read(), 'three')
+            finally:
+                shutil.rmtree(root)
+
+    def test_run_waits_for_earlier_writes(self):
+        seen = []
+        class Runner:
+            def run_script(self, path):
+                with open(path) as f:
+                    seen.append(f.read())
+                return RunResult('', '', 0)
+        root = tempfile.mkdtemp()
+        try:
+            plan = [CreateCmd('a.py', 'x'), CreateCmd('b.py', 'y'), RunCmd('a.py'),
+                    PatchCmd('a.py', 'x', 'z'), RunCmd('a.py')]
+            CeilExecutor(root, runner=Runner()).execute(plan, parallel=True)
+            self.assertEqual(seen, ['x', 'z'])
+        finally:
+            shutil.rmtree(root)
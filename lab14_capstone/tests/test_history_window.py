@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from unittest import mock
+from app.core.chat_manager import ChatManager
+from app.core.history_window import HistoryWindow, estimate_tokens, summary_line
+
+try:
+    from app.core.ai_engine import ai_engine
+except ImportError: # google-generativeai not installed
+    ai_engine = None
+
+def messages(n, words=10):
+    return [{"sender": "USER" if i % 2 == 0 else "AI", "message": f"Message {i}. " + "word " * words} for i in range(n)]
+
+class TestHistoryWindow(unittest.TestCase):
+    def test_fits(self):
+        history = messages(5)
+        self.assertEqual(HistoryWindow().select("c", history, budget=1000), (None, history))
+
+    def test_window_and_summary(self):
+        history = messages(100)
+        summary, recent = HistoryWindow().select("c", history, budget=500)
+        self.assertEqual(recent, history[-len(recent):])
+        self.assertLessEqual(sum(estimate_tokens(m["message"]) for m in recent), 400)
+        folded = 100 - len(recent)
+        self.assertTrue(summary.startswith(f"Summary of the {folded} earlier messages"))
+        self.assertIn(" omitted)", summary) # 80 folded lines do not fit 100 tokens
+        self.assertLessEqual(sum(estimate_tokens(line) for line in summary.split("\n")[1:]), 100)
+        self.assertIn(summary_line(history[folded - 1]), summary)
+
+    def test_incremental_summary_matches_fresh_one(self):
+        history = messages(200)
+        window = HistoryWindow()
+        for n in (60, 61, 120, 200):
+            self.assertEqual(window.select("c", history[:n], budget=300), HistoryWindow().select("c", history[:n], budget=300))
+        self.assertEqual(len(window.tokens["c"]), 200)
+
+    def test_replaced_chat(self):
+        window = HistoryWindow()
+        window.select("c", messages(50), budget=200)
+        other = [{"sender": "USER", "message": "short"}] * 3
+        self.assertEqual(window.select("c", other, budget=200), (None, other))
+
+    def test_summary_line(self):
+        self.assertEqual(summary_line({"sender": "AI", "message": "Done. Then more.\nNext"}), "- AI: Done.")
+        line = summary_line({"sender": "USER", "message": "w " * 100})
+        self.assertTrue(line.endswith(" ..."))
+        self.assertEqual(len(line.split()), 2 + 40 + 1)
+
+    def test_chat_manager_context(self):
+        with tempfile.TemporaryDirectory() as root:
+            manager = ChatManager(root)
+            for msg in messages(60):
+                manager.add_message("default", msg["sender"], msg["message"])
+            summary, recent = manager.get_context("default", budget=300)
+            self.assertIsNotNone(summary)
+            self.assertEqual(recent[-1]["message"], messages(60)[-1]["message"])
+            manager.close()
+
+@unittest.skipIf(ai_engine is None, "google-generativeai is not installed")
+class TestSummaryInjection(unittest.TestCase):
+    def generate(self, **kwargs):
+        engine = ai_engine.CeilAIEngine.__new__(ai_engine.CeilAIEngine)
+        engine.system_instruction = "RULES"
+        engine.build_full_context = lambda path: ""
+        with mock.patch.object(ai_engine, "genai") as genai:
+            genai.GenerativeModel.return_value.start_chat.return_value.send_message.return_value.text = "CHAT\nok"
+            logs = []
+            text = engine.generate_instructions("hi", ".", log_callback=lambda m, kind: logs.append(m), **kwargs)
+        return text, genai, logs
+
+    def test_summary_in_system_instruction(self):
+        history = [{"sender": "USER", "message": "recent"}]
+        text, genai, logs = self.generate(history=history, history_summary="Summary of the 5 earlier messages:\n- USER: a")
+        self.assertEqual(text, "CHAT\nok")
+        instruction = genai.GenerativeModel.call_args.kwargs["system_instruction"]
+        self.assertTrue(instruction.startswith("RULES"))
+        self.assertIn("- USER: a", instruction)
+        turns = genai.GenerativeModel.return_value.start_chat.call_args.kwargs["history"]
+        self.assertEqual(turns, [{"role": "user", "parts": ["recent"]}])
+        self.assertIn("History: Summary of the 5 earlier messages sent as context.", logs)
+
+    def test_no_summary(self):
+        _, genai, logs = self.generate(history=[])
+        self.assertEqual(genai.GenerativeModel.call_args.kwargs["system_instruction"], "RULES")
+        self.assertEqual(logs, [])
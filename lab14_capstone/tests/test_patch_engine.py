@@ -0,0 +1,44 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from app.core.executor import patch_engine
+
+def sequential_replace(text, pairs):
+    counts = []
+    for search, replace in pairs:
+        counts.append(text.count(search))
+        text = text.replace(search, replace)
+    return text, counts
+
+class TestPatchEngine(unittest.TestCase):
+    def random_text(self, rng, n, alphabet='ab\nc'):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, n)))
+
+    def test_apply_pairs_same_as_replace(self):
+        rng = random.Random(5)
+        for _ in range(5000):
+            text = self.random_text(rng, 30)
+            pairs = [(self.random_text(rng, 4) or 'a', self.random_text(rng, 3)) for _ in range(rng.randint(1, 5))]
+            self.assertEqual(patch_engine.apply_pairs(text, pairs), sequential_replace(text, pairs), (text, pairs))
+
+    def test_patch_file_same_as_replace(self):
+        rng = random.Random(6)
+        large_file = patch_engine.LARGE_FILE
+        patch_engine.LARGE_FILE = 1 # Every file takes the mapped path
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'f.py')
+            for _ in range(300):
+                text = self.random_text(rng, 40) + rng.choice(['', 'é']) + self.random_text(rng, 5)
+                pairs = [(self.random_text(rng, 3) or 'a', self.random_text(rng, 3) + rng.choice(['', 'ü']))
+                         for _ in range(rng.randint(1, 4))]
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(text)
+                counts = patch_engine.patch_file(path, pairs)
+                with open(path, encoding='utf-8', newline='') as f:
+                    self.assertEqual((f.read(), counts), sequential_replace(text, pairs), (text, pairs))
+        finally:
+            patch_engine.LARGE_FILE = large_file
+            shutil.rmtree(root)
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from app.core.compiler.lexer import CeilLexer
+from app.core.compiler.parser import CeilParser
+from app.core.compiler.nodes import CreateCmd, PatchCmd, DeleteCmd, RunCmd, FetchFigmaCmd
+from app.core.compiler.plan_format import dump_plan, load_plan_buffer, save_plan, load_plan
+
+class TestPlanFormat(unittest.TestCase):
+    def setUp(self):
+        big = "print('payload é')\n" * 2000 # Large enough to be loaded as a Utf8Span
+        self.plan = [
+            CreateCmd('src/app.py', big, start=0, end=10),
+            PatchCmd('src/app.py', 'payload', 'data\r\n'),
+            DeleteCmd('old file.py'),
+            RunCmd('src/app.py'),
+            FetchFigmaCmd('https://www.figma.com/file/abc'),
+            CreateCmd('empty.py', ''),
+        ]
+
+    def assertSamePlan(self, loaded, plan):
+        self.assertEqual([c.to_dict() for c in loaded], [c.to_dict() for c in plan])
+        self.assertEqual([(c.start, c.end) for c in loaded], [(c.start, c.end) for c in plan])
+
+    def test_buffer_round_trip(self):
+        self.assertSamePlan(load_plan_buffer(dump_plan(self.plan)), self.plan)
+
+    def test_file_round_trip(self):
+        script = "CREATE a.py <<<\nx = 1\n>>>\nPATCH a.py SEARCH <<<1>>> REPLACE <<<2>>>\nRUN a.py <<< >>>\n"
+        parsed = CeilParser().set_tokens(CeilLexer().tokenize(script)).parse()
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'plan.ceilp')
+            for plan in (self.plan, parsed):
+                save_plan(plan, path)
+                self.assertSamePlan(load_plan(path, use_mmap=False), plan)
+                loaded = load_plan(path)
+                self.assertSamePlan(loaded, plan)
+                del loaded # Releases the mapping before the file is replaced
+
+    def test_dump_of_loaded_plan(self):
+        data = dump_plan(self.plan)
+        self.assertEqual(dump_plan(load_plan_buffer(data)), data)
+
+    def test_truncated_plan(self):
+        data = dump_plan(self.plan)
+        for size in (0, 5, len(data) // 2, len(data) - 1):
+            with self.assertRaises(Exception):
+                load_plan_buffer(data[:size])
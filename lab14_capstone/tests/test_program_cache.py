@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.core.compiler.lexer import CeilLexer
+from app.core.compiler.parser import CeilParser
+from app.core.compiler.cache import ProgramCache
+from app.core.security.policy import PathPolicy
+from app.core.security.security import SecurityEngine
+
+class TestProgramCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "proj")
+        self.outside = os.path.join(self.tmp, "outside")
+        os.makedirs(os.path.join(self.root, "sub"))
+        os.makedirs(self.outside)
+        self.sec = SecurityEngine(self.root, policy=PathPolicy())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def compile(self, cache, ceil, role="admin"):
+        return cache.compile(ceil, role, CeilLexer(), CeilParser(), self.sec)
+
+    def test_hit_returns_same_program(self):
+        cache = ProgramCache()
+        ceil = "CREATE a.py <<<x = 1>>>\nPATCH a.py SEARCH <<<1>>> REPLACE <<<2>>>\n"
+        first = self.compile(cache, ceil)
+        second = self.compile(cache, ceil)
+        self.assertEqual(second, first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        second.reverse() # Callers get their own list
+        self.assertEqual(self.compile(cache, ceil), first)
+
+    def test_bounded(self):
+        cache = ProgramCache(max_entries=2, max_chars=100)
+        for i in range(3):
+            self.compile(cache, f"CREATE f{i}.py <<<x>>>\n")
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.compile(cache, "CREATE big.py <<<" + "x" * 200 + ">>>\n") # Larger than max_chars: not kept
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertLessEqual(cache.stats()["chars"], 100)
+
+    # A cached program is audited again: the verdict depends on the disk and the policy
+    def test_symlink_swapped_after_caching(self):
+        cache = ProgramCache()
+        ceil = "CREATE sub/x.py <<<print(1)>>>\n"
+        self.compile(cache, ceil)
+        shutil.rmtree(os.path.join(self.root, "sub"))
+        os.symlink(self.outside, os.path.join(self.root, "sub"))
+        with self.assertRaises(Exception) as raised:
+            self.compile(cache, ceil)
+        self.assertIn("Path traversal detected", str(raised.exception))
+        self.assertEqual(cache.hits, 1)
+
+    def test_policy_changed_after_caching(self):
+        cache = ProgramCache()
+        ceil = "CREATE src/x.py <<<print(1)>>>\n"
+        self.compile(cache, ceil)
+        self.sec = SecurityEngine(self.root, policy=PathPolicy(deny=["src"]))
+        with self.assertRaises(Exception):
+            self.compile(cache, ceil)
+
+    def test_role_checked_on_hit(self):
+        cache = ProgramCache()
+        ceil = "RUN a.py <<< >>>\n"
+        self.assertEqual(len(self.compile(cache, ceil, "admin")), 1)
+        with self.assertRaises(Exception):
+            self.compile(cache, ceil, "developer")
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from app.core.executor.runner import RunResult
+from app.core.executor.run_cache import RunCache
+
+class FakeRunner:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def run_script(self, full_path):
+        self.calls += 1
+        return self.results.pop(0) if self.results else RunResult("out\n", "", 0)
+
+class TestRunCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.main = self.write("main.py", "import util\n")
+        self.write("util.py", "X = 1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel, text):
+        path = os.path.join(self.root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_hit_on_unchanged_tree(self):
+        cache, runner = RunCache(self.root), FakeRunner()
+        first = cache.run_script(self.main, runner)
+        self.assertEqual(cache.run_script(self.main, runner), first)
+        self.assertEqual((runner.calls, cache.hits, cache.misses), (1, 1, 1))
+        self.write("notes.txt", "not code") # Only .py files count
+        self.write(".venv/lib/x.py", "hidden")
+        cache.run_script(self.main, runner)
+        self.assertEqual(runner.calls, 1)
+
+    def test_edit_of_imported_module_misses(self):
+        cache, runner = RunCache(self.root), FakeRunner()
+        cache.run_script(self.main, runner)
+        self.write("util.py", "X = 2\n") # Same size, just written
+        cache.run_script(self.main, runner)
+        self.write("pkg/new.py", "")
+        cache.run_script(self.main, runner)
+        self.assertEqual(runner.calls, 3)
+
+    def test_only_clean_runs_are_recorded(self):
+        results = [RunResult("", "Traceback", 1), RunResult("", "late", -9, True), RunResult("", "cancelled", None)]
+        cache, runner = RunCache(self.root), FakeRunner(*results)
+        for expected in results:
+            self.assertEqual(cache.run_script(self.main, runner), expected)
+        self.assertEqual((runner.calls, cache.stats()["entries"]), (3, 0))
+
+    def test_persisted(self):
+        RunCache(self.root).run_script(self.main, FakeRunner())
+        runner = FakeRunner()
+        self.assertEqual(RunCache(self.root).run_script(self.main, runner), RunResult("out\n", "", 0))
+        self.assertEqual(runner.calls, 0)
+
+    def test_old_failed_entries_dropped_on_load(self):
+        cache = RunCache(self.root)
+        key = cache.key(self.main)
+        os.makedirs(os.path.dirname(cache.path))
+        with open(cache.path, "w") as f:
+            json.dump({"entries": [[key, ["", "boom", 1, False]]], "files": {}}, f)
+        runner = FakeRunner()
+        RunCache(self.root).run_script(self.main, runner)
+        self.assertEqual(runner.calls, 1)
+
+    def test_evicts_least_recently_used(self):
+        cache, runner = RunCache(self.root, max_entries=2), FakeRunner()
+        scripts = [self.write(f"s{i}.py", "") for i in range(3)]
+        # Every new script changes the tree, so write them all before caching
+        for script in scripts:
+            cache.run_script(script, runner)
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.run_script(scripts[0], runner)
+        self.assertEqual(runner.calls, 4)
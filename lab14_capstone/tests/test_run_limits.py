@@ -0,0 +1,99 @@
+import os
+import signal
+import sys
+import tempfile
+import unittest
+from app.core.settings import SettingsHandler
+from app.core.executor.executor import CeilExecutor
+from app.core.executor.runner import RunResult
+from app.core.executor.run_limits import RunLimits, OutputBuffer, limited_result, DEFAULT_LIMITS, RLIMIT_SHIM
+
+class TestOutputBuffer(unittest.TestCase):
+    def buffer(self, limit, *chunks):
+        buffer = OutputBuffer(limit)
+        for chunk in chunks:
+            buffer.write(chunk)
+        return buffer
+
+    def test_unlimited(self):
+        buffer = self.buffer(None, b"abc", b"\r\nd\re")
+        self.assertEqual(buffer.getvalue("utf-8"), "abc\nd\ne")
+        self.assertEqual(buffer.truncated, 0)
+        self.assertFalse(buffer.full())
+
+    def test_fits_after_filling_the_head(self):
+        # Between limit/2 and limit bytes: nothing is cut, so nothing may be decoded apart
+        self.assertEqual(self.buffer(8, 'abcé'.encode() + b'xy').getvalue("utf-8"), "abcéxy")
+        self.assertEqual(self.buffer(8, b'abc\r\nxy').getvalue("utf-8"), "abc\nxy")
+        self.assertEqual(self.buffer(8, b'ab', 'cé'.encode(), b'x').getvalue("utf-8"), "abcéx")
+
+    def test_truncated_keeps_head_and_tail(self):
+        buffer = self.buffer(8, b"0123456789" * 3)
+        self.assertEqual(buffer.truncated, 22)
+        self.assertTrue(buffer.full())
+        self.assertEqual(buffer.getvalue("utf-8"), "0123\n... [22 bytes truncated] ...\n6789")
+
+    def test_truncated_in_small_writes(self):
+        data = bytes(range(48, 58)) * 100
+        buffer = self.buffer(10, *(data[i:i + 3] for i in range(0, len(data), 3)))
+        self.assertEqual(buffer.truncated, len(data) - 10)
+        self.assertTrue(buffer.getvalue("ascii").endswith(data[-5:].decode()))
+
+class TestLimitedResult(unittest.TestCase):
+    def test_notes(self):
+        out, err = OutputBuffer(), OutputBuffer()
+        err.write(b"boom")
+        self.assertEqual(limited_result(out, err, 1, 5, False), RunResult("", "boom", 1, False))
+        self.assertIn("timed out after 5s", limited_result(out, err, -9, 5, True).stderr)
+        self.assertIn("SIGXCPU (CPU time limit)", limited_result(out, err, -signal.SIGXCPU, 5, False).stderr)
+
+    def test_receipts(self):
+        self.assertEqual(CeilExecutor.run_receipt("RUN", "a.py", RunResult("ok\n", "", 0)), "RUN a.py: ok\n")
+        for res in (RunResult("", "killed", -9), RunResult("", "late", -9, True), RunResult("", "cancelled", None)):
+            receipt = CeilExecutor.run_receipt("RUN", "a.py", res)
+            self.assertTrue(receipt.startswith("STOPPED: RUN a.py"), receipt)
+            self.assertNotIn("ERROR", receipt) # Not a code error: no self-healing
+
+class TestRunLimits(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_file = SettingsHandler.SETTINGS_FILE
+        SettingsHandler.flush()
+        SettingsHandler.SETTINGS_FILE = os.path.join(self.tmp.name, "settings.json")
+
+    def tearDown(self):
+        SettingsHandler.flush()
+        SettingsHandler.SETTINGS_FILE = self.settings_file
+        self.tmp.cleanup()
+
+    def test_for_role(self):
+        limits = RunLimits.for_role("admin")
+        self.assertEqual((limits.timeout, limits.gui_timeout), (DEFAULT_LIMITS["timeout"], None))
+        SettingsHandler.set("run_limits", {"default": {"timeout": 60},
+                                           "developer": {"timeout": 30, "memory_mb": 512, "max_output_kb": 4}})
+        self.assertEqual(RunLimits.for_role("admin").timeout, 60)
+        limits = RunLimits.for_role("developer")
+        self.assertEqual((limits.timeout, limits.memory_mb, limits.max_output), (30, 512, 4096))
+
+    def test_gui_scripts_get_gui_timeout(self):
+        limits = RunLimits(timeout=10, gui_timeout=None)
+        scripts = {"gui.py": "import tkinter as tk\n", "turtle_demo.py": "from turtle import *\n",
+                   "qt.py": "  from PyQt5.QtWidgets import QApplication\n",
+                   "plain.py": "print('tkinter')\nimport json\n"}
+        for name, source in scripts.items():
+            with open(os.path.join(self.tmp.name, name), "w") as f:
+                f.write(source)
+        self.assertIsNone(limits.timeout_for(os.path.join(self.tmp.name, "gui.py")))
+        self.assertIsNone(limits.timeout_for(os.path.join(self.tmp.name, "turtle_demo.py")))
+        self.assertIsNone(limits.timeout_for(os.path.join(self.tmp.name, "qt.py")))
+        self.assertEqual(limits.timeout_for(os.path.join(self.tmp.name, "plain.py")), 10)
+        self.assertEqual(limits.timeout_for(os.path.join(self.tmp.name, "missing.py")), 10)
+
+    def test_wrap(self):
+        self.assertEqual(RunLimits(timeout=5).wrap(["python", "a.py"]), (["python", "a.py"], False))
+        if os.name != "posix":
+            return
+        command, shell = RunLimits(cpu_seconds=3).wrap("echo hi", shell=True)
+        self.assertEqual((command, shell), ([sys.executable, RLIMIT_SHIM, "3", "-", "/bin/sh", "-c", "echo hi"], False))
+        command, _ = RunLimits(memory_mb=256).wrap(["python", "a.py"])
+        self.assertEqual(command[2:], ["-", "256", "python", "a.py"])
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app.core.compiler.nodes import CreateCmd, PatchCmd, DeleteCmd, RunCmd, FetchFigmaCmd
+from app.core.security.policy import PathPolicy, PathResolver
+from app.core.security.security import SecurityEngine
+
+class SecurityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "proj")
+        self.outside = os.path.join(self.tmp, "outside")
+        os.makedirs(os.path.join(self.root, "sub"))
+        os.makedirs(self.outside)
+        self.sec = SecurityEngine(self.root, policy=PathPolicy())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def link(self, target, name):
+        os.symlink(target, os.path.join(self.root, name))
+
+    def assertAllowed(self, file, cmd=CreateCmd, role="admin"):
+        self.sec.audit_ast([cmd(file, *["x"] * (len(cmd.fields) - 1))], role)
+
+    def assertRejected(self, file, message="Path traversal detected", cmd=CreateCmd, role="admin"):
+        with self.assertRaises(Exception) as raised:
+            self.assertAllowed(file, cmd, role)
+        self.assertIn(message, str(raised.exception))
+
+class TestPaths(SecurityTestCase):
+    def test_plain_paths(self):
+        for file in ("a.py", "sub/b.py", "./sub/b.py", "sub//b.py", "new/dir/c.py"):
+            self.assertAllowed(file)
+
+    def test_dot_dot_segments(self):
+        self.assertAllowed("sub/../a.py")
+        self.assertAllowed("sub/x/../../a.py")
+        self.assertRejected("../a.py")
+        self.assertRejected("sub/../../a.py")
+        self.assertRejected("../outside/a.py")
+
+    def test_absolute_paths(self):
+        self.assertAllowed(os.path.join(self.root, "sub", "a.py"))
+        self.assertRejected(os.path.join(self.outside, "a.py"))
+
+    def test_sibling_with_root_name_prefix(self):
+        sibling = self.root + "2" # 'proj2' starts with 'proj'
+        os.makedirs(sibling)
+        self.assertRejected("../proj2/a.py")
+        self.assertRejected(os.path.join(sibling, "a.py"))
+        self.link(sibling, "to_sibling")
+        self.assertRejected("to_sibling/a.py")
+
+    def test_symlink_escape(self):
+        self.link(self.outside, "out")
+        self.assertRejected("out")
+        self.assertRejected("out/a.py")
+        self.assertRejected("sub/../out/a.py")
+        self.link(os.path.join(self.outside, "a.py"), "file_link.py")
+        self.assertRejected("file_link.py")
+
+    def test_symlink_inside_root(self):
+        self.link(os.path.join(self.root, "sub"), "alias")
+        self.assertAllowed("alias/a.py")
+        # '..' after a link goes up from its target, like the OS does
+        self.assertAllowed("alias/../a.py")
+
+    def test_dot_dot_after_symlink(self):
+        nested = os.path.join(self.outside, "deep")
+        os.makedirs(nested)
+        self.link(nested, "deep_link")
+        # Textually inside the root, but the OS resolves it to outside/a.py
+        self.assertRejected("deep_link/../a.py")
+
+    def test_dangling_links(self):
+        self.link(os.path.join(self.outside, "missing.py"), "dangling_out.py")
+        self.assertRejected("dangling_out.py")
+        self.link(os.path.join(self.outside, "missing_dir"), "dangling_dir")
+        self.assertRejected("dangling_dir/a.py")
+        self.link(os.path.join(self.root, "sub", "missing.py"), "dangling_in.py")
+        self.assertAllowed("dangling_in.py")
+
+    def test_link_chain(self):
+        os.symlink(self.outside, os.path.join(self.root, "sub", "hop"))
+        self.link("sub/hop", "chain")
+        self.assertRejected("chain/a.py")
+
+    def test_resolver_relative(self):
+        resolver = PathResolver(self.root)
+        self.assertEqual(resolver.relative("sub/b.py"), "sub/b.py")
+        self.assertEqual(resolver.relative("sub/../b.py"), "b.py")
+        self.assertEqual(resolver.relative("."), "")
+        self.assertIsNone(resolver.relative(".."))
+
+class TestPolicy(SecurityTestCase):
+    def test_default_deny(self):
+        self.assertRejected(".marvelcode/chats/index.json", "denied by policy")
+        self.assertRejected("sub/.git/config", "denied by policy")
+
+    def test_allow_and_deny_globs(self):
+        self.sec = SecurityEngine(self.root, policy=PathPolicy(allow=["src/**", "*.md"], deny=["src/secret*"]))
+        self.assertAllowed("src/a.py")
+        self.assertAllowed("docs/readme.md")
+        self.assertRejected("a.py", "denied by policy")
+        self.assertRejected("src/secret.py", "denied by policy")
+
+    def test_role_verbs(self):
+        for cmd in (CreateCmd, PatchCmd, DeleteCmd, RunCmd):
+            self.assertAllowed("a.py", cmd, role="admin")
+        self.assertRejected("a.py", "Unauthorized RUN", cmd=RunCmd, role="developer")
+        self.assertAllowed("a.py", DeleteCmd, role="developer")
+        self.sec.audit_ast([FetchFigmaCmd("https://www.figma.com/file/x")], "developer")
+
+    def test_custom_role_verbs(self):
+        policy = PathPolicy(role_verbs={"admin": ["CREATE", "RUN"], "*": ["CREATE"]})
+        self.sec = SecurityEngine(self.root, policy=policy)
+        self.assertAllowed("a.py", RunCmd, role="admin")
+        self.assertRejected("a.py", "Unauthorized DELETE", cmd=DeleteCmd, role="admin")
+        self.assertRejected("a.py", "Unauthorized PATCH", cmd=PatchCmd, role="developer")
+        self.assertAllowed("a.py", CreateCmd, role="anyone")
@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import bcrypt
+from app.core.settings import SettingsHandler
+from app.core.security.database import SecurityDB, hash_passwords, hash_rounds, calibrate_rounds, MIN_ROUNDS
+
+class SecurityDBTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.settings_file = SettingsHandler.SETTINGS_FILE
+        SettingsHandler.flush()
+        SettingsHandler.SETTINGS_FILE = os.path.join(self.tmp, "settings.json")
+        SettingsHandler.set("bcrypt_rounds", 4) # Cheapest cost: the tests are about the database
+        self.db = SecurityDB(os.path.join(self.tmp, "security.db"))
+
+    def tearDown(self):
+        self.db.close()
+        SettingsHandler.flush()
+        SettingsHandler.SETTINGS_FILE = self.settings_file
+        shutil.rmtree(self.tmp)
+
+class TestSecurityDB(SecurityDBTestCase):
+    def test_seeded_admin(self):
+        self.assertEqual(self.db.authenticate("admin", "admin123"), (True, "admin"))
+        self.assertEqual(self.db.authenticate("admin", "wrong"), (False, None))
+        self.assertEqual(self.db.authenticate("nobody", "admin123"), (False, None))
+
+    def test_create_account(self):
+        self.assertTrue(self.db.create_account("dev", "pw"))
+        self.assertFalse(self.db.create_account("dev", "other"))
+        self.assertEqual(self.db.authenticate("dev", "pw"), (True, "developer"))
+
+    def test_wal_and_pooled_connections(self):
+        with self.db.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        for _ in range(10):
+            self.db.user_exists("admin")
+        self.assertEqual(self.db.pool.opened, 1)
+
+    def test_transaction_rolls_back(self):
+        with self.assertRaises(ValueError):
+            with self.db.transaction() as conn:
+                conn.execute(self.db.SQL_INSERT, ("ghost", b"x", "developer"))
+                raise ValueError
+        self.assertFalse(self.db.user_exists("ghost"))
+
+    def test_concurrent_use(self):
+        errors = []
+        def work(i):
+            try:
+                self.db.create_account(f"user{i}", "pw")
+                for _ in range(5):
+                    self.assertTrue(self.db.user_exists(f"user{i}"))
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(self.db.pool.opened, 4)
+        self.assertEqual(self.db.authenticate("user7", "pw"), (True, "developer"))
+
+class TestBulkAccounts(SecurityDBTestCase):
+    def write_csv(self, text):
+        path = os.path.join(self.tmp, "accounts.csv")
+        with open(path, "w", newline="") as f:
+            f.write(text)
+        return path
+
+    def test_create_accounts(self):
+        accounts = [("a", "pa"), ("admin", "x"), ("b", "pb", "admin"), ("a", "again"), ("c", "pc", "")]
+        self.assertEqual(self.db.create_accounts(accounts, workers=1),
+                         [("a", True), ("admin", False), ("b", True), ("a", False), ("c", True)])
+        self.assertEqual(self.db.authenticate("a", "pa"), (True, "developer"))
+        self.assertEqual(self.db.authenticate("b", "pb"), (True, "admin"))
+        self.assertEqual(self.db.authenticate("c", "pc"), (True, "developer"))
+        self.assertEqual(self.db.authenticate("admin", "admin123"), (True, "admin"))
+
+    def test_parallel_hashing(self):
+        hashes = hash_passwords(["one", "two", "three"], workers=2, rounds=4)
+        self.assertEqual([bcrypt.checkpw(p.encode(), h) for p, h in zip(["one", "two", "three"], hashes)],
+                         [True, True, True])
+        self.assertEqual({hash_rounds(h) for h in hashes}, {4})
+
+    def test_import_csv(self):
+        path = self.write_csv("role,password,username\nadmin,p1,ann\n\n,p2,bob\n")
+        self.assertEqual(self.db.import_accounts_csv(path, workers=1), [("ann", True), ("bob", True)])
+        self.assertEqual(self.db.authenticate("ann", "p1"), (True, "admin"))
+        self.assertEqual(self.db.authenticate("bob", "p2"), (True, "developer"))
+        path = self.write_csv("carl,p3\ndora,p4,admin\n")
+        self.assertEqual(self.db.import_accounts_csv(path, workers=1), [("carl", True), ("dora", True)])
+
+    def test_import_invalid_row(self):
+        path = self.write_csv("carl,p3\n,p4\n")
+        with self.assertRaises(Exception) as raised:
+            self.db.import_accounts_csv(path, workers=1)
+        self.assertIn("row 2", str(raised.exception))
+        self.assertFalse(self.db.user_exists("carl"))
+
+class TestCalibration(SecurityDBTestCase):
+    def stored_hash(self, username):
+        with self.db.pool.connection() as conn:
+            return conn.execute(self.db.SQL_LOOKUP, (username,)).fetchone()[0]
+
+    def test_calibrate_rounds_bounds(self):
+        self.assertEqual(calibrate_rounds(0.001, min_rounds=4, max_rounds=6), 4)
+        self.assertEqual(calibrate_rounds(10 ** 6, min_rounds=4, max_rounds=6), 6)
+
+    def test_calibrate_stores_setting(self):
+        self.assertEqual(self.db.calibrate_async(0.001).result(10), MIN_ROUNDS)
+        self.assertEqual(SettingsHandler.get("bcrypt_rounds"), MIN_ROUNDS)
+        self.assertEqual(self.db.rounds, MIN_ROUNDS)
+
+    def test_rehash_on_login(self):
+        self.db.create_account("dev", "pw")
+        self.assertEqual(hash_rounds(self.stored_hash("dev")), 4)
+        self.db.rounds = 5
+        self.assertEqual(self.db.authenticate("dev", "wrong"), (False, None))
+        self.assertEqual(hash_rounds(self.stored_hash("dev")), 4)
+        self.assertEqual(self.db.authenticate("dev", "pw"), (True, "developer"))
+        self.assertEqual(hash_rounds(self.stored_hash("dev")), 5)
+        self.assertEqual(self.db.authenticate("dev", "pw"), (True, "developer"))
+
+    def test_no_rehash_without_calibration(self):
+        self.db.create_account("dev", "pw")
+        old = self.stored_hash("dev")
+        self.db.rounds = None
+        self.db.authenticate("dev", "pw")
+        self.assertEqual(self.stored_hash("dev"), old)
+
+    def test_rehash_skipped_when_hash_changed(self):
+        self.db.create_account("dev", "pw")
+        old = self.stored_hash("dev")
+        self.db.rounds = 5
+        self.db.create_account("other", "x")
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE users SET password_hash=? WHERE username='dev'", (self.stored_hash("other"),))
+        self.db.rehash("dev", "pw", old) # Password changed meanwhile: keep the new one
+        self.assertEqual(self.stored_hash("dev"), self.stored_hash("other"))
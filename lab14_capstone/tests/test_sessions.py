@@ -0,0 +1,41 @@
+import time
+import unittest
+from app.core.security.sessions import SessionStore
+from tests.test_security_db import SecurityDBTestCase
+
+class TestSessionStore(unittest.TestCase):
+    def test_issue_and_revoke(self):
+        store = SessionStore()
+        token = store.issue("dev", "developer")
+        other = store.issue("dev", "developer")
+        self.assertNotEqual(token, other)
+        self.assertEqual(store.get(token), ("dev", "developer"))
+        self.assertEqual(store.role(token), "developer")
+        store.revoke(token)
+        self.assertIsNone(store.get(token))
+        store.revoke_user("dev")
+        self.assertIsNone(store.role(other))
+        self.assertIsNone(store.get("forged"))
+
+    def test_expiry(self):
+        store = SessionStore(ttl=0.2)
+        token = store.issue("dev", "developer")
+        for _ in range(3): # Each use extends the session
+            time.sleep(0.1)
+            self.assertIsNotNone(store.get(token))
+        time.sleep(0.3)
+        self.assertIsNone(store.get(token))
+        self.assertEqual(store.sessions, {})
+
+class TestLogin(SecurityDBTestCase):
+    def test_authenticate_async(self):
+        future = self.db.authenticate_async("admin", "admin123")
+        success, role, token = future.result(10)
+        self.assertEqual((success, role), (True, "admin"))
+        self.assertEqual(self.db.sessions.get(token), ("admin", "admin"))
+        self.assertEqual(self.db.authenticate_async("admin", "nope").result(10), (False, None, None))
+
+    def test_parallel_logins(self):
+        futures = [self.db.authenticate_async("admin", "admin123") for _ in range(6)]
+        tokens = {f.result(10)[2] for f in futures}
+        self.assertEqual(len(tokens), 6)
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app.core.settings import SettingsHandler
+
+class TestSettingsHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.settings_file = SettingsHandler.SETTINGS_FILE
+        self.debounce = SettingsHandler.DEBOUNCE_SECONDS
+        SettingsHandler.flush()
+        SettingsHandler.SETTINGS_FILE = self.path = os.path.join(self.tmp, "settings.json")
+
+    def tearDown(self):
+        SettingsHandler.flush()
+        SettingsHandler.SETTINGS_FILE = self.settings_file
+        SettingsHandler.DEBOUNCE_SECONDS = self.debounce
+        shutil.rmtree(self.tmp)
+
+    def on_disk(self, path=None):
+        with open(path or self.path) as f:
+            return json.load(f)
+
+    def edit_on_disk(self, settings):
+        with open(self.path, "w") as f:
+            json.dump(settings, f)
+        stat = os.stat(self.path) # A different mtime even on coarse clocks
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_debounced_write(self):
+        SettingsHandler.DEBOUNCE_SECONDS = 0.2
+        SettingsHandler.set("a", 1)
+        SettingsHandler.update({"b": 2, "c": 3})
+        self.assertEqual(SettingsHandler.get("b"), 2) # Visible before the write
+        self.assertFalse(os.path.exists(self.path))
+        time.sleep(0.6)
+        self.assertEqual(self.on_disk(), {"a": 1, "b": 2, "c": 3})
+
+    def test_flush(self):
+        SettingsHandler.set("a", 1)
+        SettingsHandler.flush()
+        self.assertEqual(self.on_disk(), {"a": 1})
+        self.assertEqual([n for n in os.listdir(self.tmp) if n.endswith(".tmp")], [])
+
+    def test_external_edit_is_reloaded(self):
+        SettingsHandler.set("a", 1)
+        SettingsHandler.flush()
+        self.edit_on_disk({"a": 2, "b": 3})
+        self.assertEqual(SettingsHandler.load(), {"a": 2, "b": 3})
+
+    def test_pending_changes_merge_with_external_edit(self):
+        SettingsHandler.set("a", 1)
+        SettingsHandler.flush()
+        SettingsHandler.set("b", 2)
+        self.edit_on_disk({"a": 5, "z": 0})
+        SettingsHandler.flush()
+        self.assertEqual(self.on_disk(), {"a": 5, "z": 0, "b": 2})
+        self.assertEqual(SettingsHandler.get("a"), 5)
+
+    def test_save_replaces_everything(self):
+        SettingsHandler.update({"a": 1, "b": 2})
+        SettingsHandler.save({"c": 3})
+        self.assertEqual(SettingsHandler.load(), {"c": 3})
+        SettingsHandler.flush()
+        self.assertEqual(self.on_disk(), {"c": 3})
+
+    def test_values_are_copies(self):
+        SettingsHandler.set("limits", {"timeout": 1})
+        SettingsHandler.get("limits")["timeout"] = 99
+        SettingsHandler.load()["limits"]["timeout"] = 99
+        self.assertEqual(SettingsHandler.get("limits"), {"timeout": 1})
+
+    def test_switching_files_flushes_the_old_one(self):
+        SettingsHandler.set("a", 1)
+        SettingsHandler.SETTINGS_FILE = other = os.path.join(self.tmp, "other.json")
+        self.assertIsNone(SettingsHandler.get("a"))
+        self.assertEqual(self.on_disk(), {"a": 1})
+        SettingsHandler.set("b", 2)
+        SettingsHandler.flush()
+        self.assertEqual(self.on_disk(other), {"b": 2})
+
+    def test_corrupt_file(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(SettingsHandler.get("a", "default"), "default")
@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from app.core.chat_manager import ChatManager
+from app.core.sqlite_chat_manager import SqliteChatManager
+
+class TestSqliteChatManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.manager = SqliteChatManager(self.root)
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def fill(self):
+        self.manager.add_chat("other", "Other chat")
+        for i in range(12):
+            self.manager.add_message("default", "USER", f"fix the parser bug {i}")
+        self.manager.add_message("default", "AI", "the lexer is fine")
+        self.manager.add_message("other", "USER", "parser crash on BLOCK tokens")
+
+    def test_reload(self):
+        self.fill()
+        self.manager.rename_chat("other", "Renamed")
+        self.manager.close()
+        self.manager = SqliteChatManager(self.root)
+        self.assertEqual(self.manager.chats["chats"]["other"], {"name": "Renamed"})
+        self.assertEqual(len(self.manager.get_history("default")), 13)
+        self.assertEqual(self.manager.get_history("other")[0]["message"], "parser crash on BLOCK tokens")
+
+    def test_search(self):
+        self.fill()
+        hits = self.manager.search("parser")
+        self.assertEqual(len(hits), 13)
+        self.assertEqual({h["chat_id"] for h in hits}, {"default", "other"})
+        hit, = self.manager.search("PARSER block")
+        self.assertEqual((hit["chat_name"], hit["seq"], hit["sender"]), ("Other chat", 1, "USER"))
+        self.assertIn("[parser]", hit["snippet"])
+        self.assertEqual(self.manager.search("   "), [])
+
+    def test_search_paging(self):
+        self.fill()
+        pages = [self.manager.search("parser", limit=5, offset=offset) for offset in (0, 5, 10, 15)]
+        self.assertEqual([len(p) for p in pages], [5, 5, 3, 0])
+        found = [(h["chat_id"], h["seq"]) for page in pages for h in page]
+        self.assertEqual(len(set(found)), 13)
+
+    def test_query_syntax_is_text(self):
+        self.manager.add_message("default", "USER", 'say "hi" AND NOT bye -x*')
+        for query in ('"hi"', "AND", "NOT", "-x*", "NEAR(", 'hi" OR "bye', "(", "*"):
+            self.manager.search(query) # Never an FTS5 syntax error
+        self.assertEqual(len(self.manager.search('"hi" AND')), 1)
+        self.assertEqual(self.manager.search("OR"), [])
+
+    def test_like_fallback(self):
+        self.fill()
+        self.manager.fts = False
+        self.assertEqual(len(self.manager.search("parser bug", limit=50)), 12)
+        self.assertEqual(len(self.manager.search("parser", limit=5, offset=10)), 3)
+        self.manager.add_message("default", "USER", "100%_done")
+        self.assertEqual(len(self.manager.search("0%_")), 1)
+        self.assertEqual(self.manager.search("%"), [self.manager.search("0%_")[0]])
+
+    def test_deleted_chat_leaves_the_index(self):
+        self.fill()
+        self.manager.delete_chat("other")
+        self.assertEqual(self.manager.search("block"), [])
+        self.assertEqual(len(self.manager.search("parser", limit=50)), 12)
+
+    def test_import_json_chats(self):
+        self.manager.close()
+        self.tmp.cleanup()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        source = ChatManager(self.root)
+        source.add_chat("old", "Old chat")
+        source.add_message("old", "USER", "imported message")
+        source.close()
+        self.manager = SqliteChatManager(self.root)
+        self.assertIn("old", self.manager.chats["chats"])
+        self.assertEqual(self.manager.search("imported")[0]["chat_id"], "old")
@@ -0,0 +1,56 @@
+import random
+import unittest
+from app.core.compiler.lexer import CeilLexer
+from app.core.compiler.parser import CeilParser
+from app.core.compiler.stream import CeilStream
+
+SCRIPT = (
+    "CREATE src/app.py <<<\nprint('hello é')\r\n>>>\n"
+    "PATCH src/app.py SEARCH <<<hello>>> REPLACE <<<bye>>>\n"
+    'DELETE "old file.py"\n'
+    "RUN src/app.py <<< >>>\n"
+)
+
+def tokens(toks):
+    return [(t.type, t.value) for t in toks]
+
+def chunks(text, rng):
+    pos = 0
+    while pos < len(text):
+        n = rng.randint(1, 7)
+        yield text[pos:pos + n]
+        pos += n
+
+class TestStreamingLexer(unittest.TestCase):
+    def stream_tokens(self, text, rng):
+        lexer = CeilLexer()
+        out = []
+        for chunk in chunks(text, rng):
+            out += lexer.feed(chunk)
+        return out + lexer.close()
+
+    def test_script_in_chunks(self):
+        rng = random.Random(1)
+        expected = tokens(CeilLexer().tokenize(SCRIPT))
+        for _ in range(50):
+            self.assertEqual(tokens(self.stream_tokens(SCRIPT, rng)), expected)
+
+    def test_random_input(self):
+        alphabet = ['CREATE', 'PATCH', 'DELETE', 'RUN', 'SEARCH', 'REPLACE', '<<<', '>>>', '<', '>',
+                    '"', "'", ' ', '\n', '\r', 'a', 'b.py', 'x/y', '-', '\\', 'é']
+        rng = random.Random(2)
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            self.assertEqual(tokens(self.stream_tokens(text, rng)), tokens(CeilLexer().tokenize(text)), repr(text))
+
+class TestStreamingParser(unittest.TestCase):
+    def test_same_commands_as_batch(self):
+        expected = CeilParser().set_tokens(CeilLexer().tokenize(SCRIPT)).parse()
+        rng = random.Random(3)
+        for _ in range(50):
+            stream = CeilStream()
+            out = []
+            for chunk in chunks(SCRIPT, rng):
+                out += stream.feed(chunk)
+            out += stream.close()
+            self.assertEqual([c.to_dict() for c in out], [c.to_dict() for c in expected])
@@ -0,0 +1,63 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from app.core import tracing
+from app.core.compiler.nodes import CreateCmd, PatchCmd
+from app.core.executor.executor import CeilExecutor
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        tracing.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_disabled(self):
+        self.assertFalse(tracing.enabled())
+        with tracing.span("lex") as s:
+            tracing.add_io(read=10)
+        self.assertIs(s, tracing.NULL_SPAN)
+
+    def test_spans(self):
+        tracer = tracing.start()
+        with tracing.span("parse", tokens=3):
+            with tracing.span("x.py", cat="command"):
+                tracing.add_io(read=5)
+                tracing.add_io(read=2, written=1)
+        with self.assertRaises(ValueError):
+            with tracing.span("audit"):
+                raise ValueError
+        self.assertIs(tracing.stop(), tracer)
+        inner, outer, failed = tracer.events
+        self.assertEqual((inner["name"], inner["args"]["bytes_read"], inner["args"]["bytes_written"]), ("x.py", 7, 1))
+        self.assertNotIn("bytes_read", outer["args"])
+        self.assertEqual(outer["args"]["tokens"], 3)
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertEqual(failed["args"]["error"], "ValueError")
+        totals = tracer.totals()
+        self.assertEqual((set(totals["stages"]), totals["commands"], totals["bytes_read"]), ({"parse", "audit"}, 1, 7))
+
+    def test_executor_commands(self):
+        tracer = tracing.start()
+        CeilExecutor(self.tmp).execute([CreateCmd("a.py", "hello"), PatchCmd("a.py", "hello", "bye")])
+        names = [(e["cat"], e["name"]) for e in tracer.events]
+        self.assertIn(("command", "CREATE a.py"), names)
+        self.assertIn(("command", "PATCH a.py"), names)
+        self.assertIn(("pipeline", "execute"), names)
+        self.assertGreater(tracer.totals()["bytes_written"], 0)
+
+    def test_export(self):
+        tracer = tracing.start()
+        with tracing.span("lex"):
+            pass
+        folder = os.path.join(self.tmp, "traces")
+        paths = [tracer.export(folder) for _ in range(tracer.KEEP_TRACES + 2)]
+        self.assertEqual(len(set(paths)), len(paths))
+        self.assertEqual(len(os.listdir(folder)), tracer.KEEP_TRACES)
+        with open(paths[-1]) as f:
+            data = json.load(f)
+        self.assertEqual(data["traceEvents"][0]["ph"], "X")
+        self.assertIn("lex", tracer.summary())
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from app.core.executor.runner import SubprocessRunner
+from app.core.executor.run_limits import RunLimits
+from app.core.executor.warm_runner import WarmRunner
+
+@unittest.skipUnless(WarmRunner().available, "needs fork and socket.send_fds")
+class TestWarmRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.runner = WarmRunner(preload=("random", "json", "csv"), limits=RunLimits(timeout=10))
+        self.runner.warm_up()
+
+    def tearDown(self):
+        self.runner.close()
+        self.tmp.cleanup()
+
+    def write(self, name, source):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+        return path
+
+    def test_output_and_exit_code(self):
+        res = self.runner.run_script(self.write("main.py", "import sys\nprint('hi')\nsys.exit(3)\n"))
+        self.assertEqual((res.stdout, res.returncode), ("hi\n", 3))
+        res = self.runner.run_script(self.write("bad.py", "x = 1\nraise ValueError('boom')\n"))
+        self.assertEqual(res.returncode, 1)
+        self.assertIn("ValueError: boom", res.stderr)
+        self.assertNotIn("runpy", res.stderr)
+
+    def test_fresh_globals(self):
+        path = self.write("main.py", "import json\nprint(hasattr(json, 'seen'))\njson.seen = True\n")
+        self.assertEqual(self.runner.run_script(path).stdout, "False\n")
+        self.assertEqual(self.runner.run_script(path).stdout, "False\n")
+
+    def test_project_module_shadows_preloaded(self):
+        self.write("csv.py", "print('local csv')\n")
+        path = self.write("main.py", "import csv\n")
+        self.assertEqual(self.runner.run_script(path).stdout, "local csv\n")
+
+    def test_same_imports_as_cold_run(self):
+        # Unless a startup hook (.pth) already imported it, a cold run picks the project's random.py
+        self.write("random.py", "print('local random')\n")
+        path = self.write("main.py", "import random\n")
+        self.assertEqual(self.runner.run_script(path).stdout, SubprocessRunner().run_script(path).stdout)
+
+    def test_project_package_shadows_preloaded(self):
+        self.write("json/__init__.py", "from .codec import NAME\n")
+        self.write("json/codec.py", "NAME = 'local json'\n")
+        self.assertEqual(self.runner.run_script(self.write("main.py", "import json\nprint(json.NAME)\n")).stdout,
+                         "local json\n")
+
+    def test_namespace_folder_does_not_shadow(self):
+        os.makedirs(os.path.join(self.tmp.name, "random"))
+        path = self.write("main.py", "import random\nprint(hasattr(random, 'randint'))\n")
+        self.assertEqual(self.runner.run_script(path).stdout, "True\n")
+
+    def test_timeout(self):
+        self.runner.limits = RunLimits(timeout=1)
+        res = self.runner.run_script(self.write("main.py", "import time\nprint('start')\ntime.sleep(30)\n"))
+        self.assertTrue(res.timed_out)
+        self.assertIn("start", res.stdout)
+
+    def test_cancel_all(self):
+        path = self.write("main.py", "import time\ntime.sleep(30)\n")
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.runner.run_script(path)))
+        thread.start()
+        deadline = time.monotonic() + 10
+        while not self.runner.cancel_all() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        thread.join(10)
+        self.assertEqual(results[0].returncode, None)
+        self.assertIn("cancelled", results[0].stderr)